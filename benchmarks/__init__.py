@@ -0,0 +1,10 @@
+"""
+Performance benchmarks for schemazoid.
+
+These are not part of the test suite. Run a benchmark module from the root of
+the repository, for example ``python -m benchmarks.memory``.
+
+``python -m benchmarks`` runs the suite in :mod:`benchmarks.suite`, which
+covers the hot paths across several model schemas, and can save its results
+as JSON and compare them with an earlier run to catch regressions.
+"""
@@ -0,0 +1,67 @@
+"""
+Run the benchmark suite, optionally saving the results as JSON and comparing
+them with the results of an earlier run.
+
+    python -m benchmarks --output before.json
+    (make changes)
+    python -m benchmarks --baseline before.json --threshold 0.1
+
+With ``--baseline``, the exit status is 1 if any case is slower than the
+baseline by more than the threshold, so a CI job can fail on regressions.
+Timings are noisy on shared machines; use a threshold to match.
+"""
+from __future__ import print_function
+
+import argparse
+import json
+import sys
+
+from .common import print_table
+from .suite import compare, run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description=__doc__.split('\n\n')[0])
+    parser.add_argument('-k', dest='pattern',
+                        help='only run cases matching this regular expression')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='runs of each case; the best is kept '
+                             '(default 5)')
+    parser.add_argument('--output', help='write the results to this file')
+    parser.add_argument('--baseline',
+                        help='compare with the results in this file')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='the slowdown that counts as a regression, '
+                             'as a fraction (default 0.1)')
+    args = parser.parse_args(argv)
+
+    def report(name, result):
+        print('%-28s %10.3f us/op' % (name, result['us_per_op']))
+        sys.stdout.flush()
+
+    results = run(args.pattern, args.repeat, report)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        rows, regressions = compare(results, baseline, args.threshold)
+        print()
+        print_table(('case', 'baseline (us)', 'current (us)', 'change'),
+                    [(name, '%.3f' % old, '%.3f' % new,
+                      '%+.1f%%' % (change * 100))
+                     for name, old, new, change in rows])
+        if regressions:
+            print()
+            print('%d regression(s) over %.0f%%: %s' % (
+                len(regressions), args.threshold * 100,
+                ', '.join(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Compare building models one record at a time with ``Model.from_records``.
+
+Run with ``python -m benchmarks.bulk``.
+"""
+from schemazoid import micromodels as m
+
+from .common import best_time, print_table
+
+COUNT = 100000
+
+
+class Offer(m.Model):
+    name = m.CharField()
+    price = m.FloatField()
+    priceCurrency = m.CharField()
+    availability = m.CharField()
+    inventoryLevel = m.IntegerField()
+
+
+class DatedOffer(Offer):
+    validFrom = m.DateField()
+
+
+def make_data(i):
+    return {
+        'name': 'Offer %d' % i,
+        'price': str(i * 0.01),
+        'priceCurrency': 'USD',
+        'availability': 'InStock',
+        'inventoryLevel': i,
+        'validFrom': '2014-08-09',
+    }
+
+
+def main():
+    records = [make_data(i) for i in range(COUNT)]
+    rows = []
+    for cls in (Offer, DatedOffer):
+        one_by_one = best_time(lambda: [cls(record) for record in records])
+        bulk = best_time(lambda: cls.from_records(records))
+        rows.append((cls.__name__, COUNT, '%.3f' % one_by_one,
+                     '%.3f' % bulk, '%.2fx' % (one_by_one / bulk)))
+    print_table(('class', 'records', 'constructor (s)', 'from_records (s)',
+                 'speedup'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Helpers shared by the benchmark modules.
+"""
+from __future__ import print_function
+
+import gc
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:  # Python < 3.4
+    tracemalloc = None
+
+
+def best_time(func, number=1, repeat=3):
+    """Return the best time, in seconds, of ``repeat`` runs of calling
+    ``func`` ``number`` times.
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat))
+
+
+def bytes_per_object(factory, count):
+    """Return the average number of bytes allocated by each of ``count``
+    calls to ``factory``, while all of the results are kept alive.
+    """
+    if tracemalloc is None:
+        raise RuntimeError("Memory benchmarks require tracemalloc")
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [factory(i) for i in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    # Don't charge the list holding the objects to the objects themselves.
+    overhead = len(objects) * 8
+    return (after - before - overhead) / float(count)
+
+
+def print_table(headers, rows):
+    """Print rows of values as a plain text table."""
+    rows = [[str(value) for value in row] for row in rows]
+    widths = [max(len(row[i]) for row in [headers] + rows)
+              for i in range(len(headers))]
+    line = '  '.join('%%-%ds' % width for width in widths)
+    print(line % tuple(headers))
+    print(line % tuple('-' * width for width in widths))
+    for row in rows:
+        print(line % tuple(row))
@@ -0,0 +1,33 @@
+"""
+Compare building models with the validating constructor with
+``Model.construct`` on trusted data, both serial and native, for each of the
+suite's schemas.
+
+Run with ``python -m benchmarks.construct``.
+"""
+from .common import best_time, print_table
+from .schemas import SCHEMAS
+
+
+def main():
+    rows = []
+    for name in sorted(SCHEMAS):
+        cls, make, count = SCHEMAS[name][:3]
+        models = [cls(make(i)) for i in range(count)]
+        serial = [model.to_serial() for model in models]
+        native = [model.to_dict() for model in models]
+        validating = best_time(lambda: [cls(record) for record in serial])
+        trusted = best_time(lambda: [cls.construct(record)
+                                     for record in serial])
+        from_native = best_time(lambda: [cls.construct(record, native=True)
+                                         for record in native])
+        rows.append((name, count, '%.3f' % validating, '%.3f' % trusted,
+                     '%.1fx' % (validating / trusted),
+                     '%.3f' % from_native,
+                     '%.1fx' % (validating / from_native)))
+    print_table(('schema', 'models', 'validating (s)', 'trusted (s)',
+                 'speedup', 'native (s)', 'speedup'), rows)
+
+
+if __name__ == '__main__':
+    main()
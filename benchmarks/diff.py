@@ -0,0 +1,48 @@
+"""
+Compare syncing nested models by sending the whole serialized model with
+sending the patch from ``Model.diff``, after a small change.
+
+Run with ``python -m benchmarks.diff``.
+"""
+import json
+
+from .common import best_time, print_table
+from .serialize import Product, make_product
+
+COUNT = 5000
+
+
+def main():
+    records = [make_product(i) for i in range(COUNT)]
+    olds = [Product(record) for record in records]
+    news = [Product(record) for record in records]
+    for new in news:
+        new.offers[1].price = 9.99
+
+    targets = [Product(record) for record in records]
+
+    def full():
+        for new in news:
+            Product(json.loads(json.dumps(new.to_serial())))
+
+    def send_patches():
+        return [json.dumps(old.diff(new)) for old, new in zip(olds, news)]
+
+    patches = send_patches()
+
+    def receive_patches():
+        # Patches are idempotent, so every run does the same work.
+        for target, patch in zip(targets, patches):
+            target.apply_patch(json.loads(patch))
+
+    full_size = sum(len(json.dumps(new.to_serial())) for new in news)
+    patch_size = sum(len(patch) for patch in patches)
+    patch_time = best_time(send_patches) + best_time(receive_patches)
+    print_table(
+        ('method', 'bytes sent', 'time (s)'),
+        [('to_serial and construct', full_size, '%.3f' % best_time(full)),
+         ('diff and apply_patch', patch_size, '%.3f' % patch_time)])
+
+
+if __name__ == '__main__':
+    main()
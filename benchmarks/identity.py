@@ -0,0 +1,78 @@
+"""
+Compare building records that embed a few repeated nested objects with and
+without an identity scope, which shares one model per identity.
+
+Run with ``python -m benchmarks.identity``.
+"""
+from schemazoid import micromodels as m
+from schemazoid.micromodels import identity
+
+from .common import best_time, bytes_per_object, print_table
+
+COUNT = 50000
+PUBLISHERS = 20
+AUTHORS = 500
+
+
+class Organization(m.Model):
+    url = m.CharField()
+    name = m.CharField()
+    foundingDate = m.DateField()
+
+
+class Person(m.Model):
+    url = m.CharField()
+    name = m.CharField()
+    worksFor = m.ModelField(Organization, identity='url')
+
+
+class Article(m.Model):
+    headline = m.CharField()
+    publisher = m.ModelField(Organization, identity='url')
+    author = m.ModelField(Person, identity='url')
+
+
+def make_record(i):
+    publisher = i % PUBLISHERS
+    return {
+        'headline': 'Headline %d' % i,
+        'publisher': {'url': 'http://example.com/org/%d' % publisher,
+                      'name': 'Publisher %d' % publisher,
+                      'foundingDate': '1999-01-01'},
+        'author': {'url': 'http://example.com/person/%d' % (i % AUTHORS),
+                   'name': 'Author %d' % (i % AUTHORS),
+                   'worksFor': {'url': 'http://example.com/org/%d' % publisher,
+                                'name': 'Publisher %d' % publisher,
+                                'foundingDate': '1999-01-01'}},
+    }
+
+
+def build(records, scoped=False):
+    if not scoped:
+        return [Article(record) for record in records]
+    with identity.scope():
+        return [Article(record) for record in records]
+
+
+def main():
+    records = [make_record(i) for i in range(COUNT)]
+
+    def factory(i):
+        return Article(records[i])
+
+    rows = [('no scope', bytes_per_object(factory, COUNT),
+             best_time(lambda: build(records), repeat=3))]
+    with identity.scope() as identity_map:
+        size = bytes_per_object(factory, COUNT)
+    rows.append(('identity scope', size,
+                 best_time(lambda: build(records, scoped=True), repeat=3)))
+    print_table(('method', 'bytes per record', 'build time (s)'),
+                [(label, '%.0f' % size, '%.3f' % seconds)
+                 for label, size, seconds in rows])
+    info = identity_map.info()
+    print('\nIdentity map: %d models, %d hits, %d misses, hit rate %.3f' % (
+        info.currsize, info.hits, info.misses, identity_map.hit_rate()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Time imports in a fresh interpreter, to guard the start-up cost of
+short-lived processes. Importing the Schema.org namespace must not load any
+types until they are used.
+
+Run with ``python -m benchmarks.imports``. With ``--budget``, the exit
+status is 1 if importing the namespace takes longer than that many
+milliseconds.
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import subprocess
+import sys
+
+from .common import print_table
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Name: the statements to time.
+IMPORTS = [
+    ('micromodels', 'import schemazoid.micromodels'),
+    ('schemaorg', 'import schemazoid.schemaorg'),
+    ('schemaorg_type', 'import schemazoid.schemaorg as s; s.Article'),
+    ('schemaorg_all', 'from schemazoid.schemaorg import *'),
+]
+
+_TIMER = '''
+from timeit import default_timer
+start = default_timer()
+%s
+print(default_timer() - start)
+'''
+
+
+def import_time(statements, repeat=5):
+    """Return the best time, in seconds, of ``repeat`` runs of the
+    ``statements`` in a new interpreter, leaving out its start-up.
+    """
+    times = []
+    for _ in range(repeat):
+        output = subprocess.check_output(
+            [sys.executable, '-c', _TIMER % statements], cwd=ROOT)
+        times.append(float(output.decode('ascii').split()[-1]))
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.imports',
+                                     description=__doc__.split('\n\n')[0])
+    parser.add_argument('--budget', type=float,
+                        help='the most milliseconds importing the Schema.org '
+                             'namespace may take')
+    args = parser.parse_args(argv)
+    times = dict((name, import_time(statements))
+                 for name, statements in IMPORTS)
+    print_table(('import', 'time (ms)'),
+                [(name, '%.2f' % (times[name] * 1e3)) for name, _ in IMPORTS])
+    if args.budget is not None and times['schemaorg'] * 1e3 > args.budget:
+        print('\nImporting schemazoid.schemaorg took %.2f ms, over the '
+              'budget of %.2f ms' % (times['schemaorg'] * 1e3, args.budget))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+Compare the memory used by models whose CharFields repeat a few values, with
+and without ``intern=True``, and report the bytes the pool saved.
+
+Run with ``python -m benchmarks.intern``.
+"""
+import json
+
+from schemazoid import micromodels as m
+
+from .common import best_time, bytes_per_object, print_table
+
+COUNT = 100000
+LANGUAGES = ['en', 'en-US', 'fr', 'de', 'es', 'it', 'ja', 'zh-Hans']
+COUNTRIES = ['US', 'GB', 'FR', 'DE', 'ES', 'IT', 'JP', 'CN', 'CA', 'AU']
+
+
+class Article(m.Model):
+    compact = True
+    name = m.CharField()
+    inLanguage = m.CharField()
+    countryCode = m.CharField()
+    keywords = m.ListField(of_type=m.CharField())
+
+
+class InternedArticle(m.Model):
+    compact = True
+    name = m.CharField()
+    inLanguage = m.CharField(intern=True)
+    countryCode = m.CharField(intern=True)
+    keywords = m.ListField(of_type=m.CharField(intern=True))
+
+
+def make_line(i):
+    return json.dumps({
+        'name': 'Article %d' % i,
+        'inLanguage': LANGUAGES[i % len(LANGUAGES)],
+        'countryCode': COUNTRIES[i % len(COUNTRIES)],
+        'keywords': ['news', 'sport' if i % 2 else 'weather', 'local'],
+    })
+
+
+def main():
+    # Parsed as they would be read from a file, so that every record has
+    # its own copy of each string.
+    lines = [make_line(i) for i in range(COUNT)]
+    rows = []
+    for cls in (Article, InternedArticle):
+        m.CharField.default_pool.clear()
+        size = bytes_per_object(lambda i: cls(json.loads(lines[i])), COUNT)
+        seconds = best_time(lambda: [cls(json.loads(line))
+                                     for line in lines], repeat=3)
+        rows.append((cls.__name__, '%.0f' % size, '%.3f' % seconds))
+    print_table(('class', 'bytes per model', 'build time (s)'), rows)
+    m.CharField.default_pool.clear()
+    for line in lines:
+        InternedArticle(json.loads(line))
+    info = m.CharField.default_pool.info()
+    print('\nPool: %d strings, %d hits, %d misses, %d bytes saved' % (
+        info.currsize, info.hits, info.misses, info.bytes_saved))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Compare ``Model.dump_jsonl`` with writing models one ``json.dumps`` at a
+time, and ``Model.iter_jsonl`` with reading them back one line at a time.
+
+Run with ``python -m benchmarks.jsonl``.
+"""
+import json
+import os
+import tempfile
+
+from .bulk import Offer, make_data
+from .common import best_time, print_table
+
+COUNT = 100000
+
+
+def naive_dump(models, path):
+    with open(path, 'w') as fileobj:
+        for model in models:
+            fileobj.write(json.dumps(model.to_serial()) + '\n')
+
+
+def bulk_dump(models, path):
+    with open(path, 'w') as fileobj:
+        Offer.dump_jsonl(models, fileobj)
+
+
+def naive_load(path):
+    with open(path) as fileobj:
+        return [Offer(json.loads(line)) for line in fileobj]
+
+
+def bulk_load(path):
+    with open(path) as fileobj:
+        return list(Offer.iter_jsonl(fileobj))
+
+
+def main():
+    models = [Offer(make_data(i)) for i in range(COUNT)]
+    handle, path = tempfile.mkstemp(suffix='.jsonl')
+    os.close(handle)
+    try:
+        rows = []
+        for label, naive, bulk in (
+                ('write', lambda: naive_dump(models, path),
+                 lambda: bulk_dump(models, path)),
+                ('read', lambda: naive_load(path), lambda: bulk_load(path))):
+            naive_time = best_time(naive)
+            bulk_time = best_time(bulk)
+            rows.append((label, '%.0f' % (COUNT / naive_time),
+                         '%.0f' % (COUNT / bulk_time),
+                         '%.2fx' % (naive_time / bulk_time)))
+    finally:
+        os.remove(path)
+    print_table(('operation', 'naive (models/s)', 'jsonl (models/s)',
+                 'speedup'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Compare the memory used by dict-backed models with compact (slotted) models.
+
+Run with ``python -m benchmarks.memory``.
+"""
+from schemazoid import micromodels as m
+
+from .common import bytes_per_object, print_table
+
+COUNT = 100000
+
+
+FIELDS = {
+    'name': m.CharField(),
+    'price': m.FloatField(),
+    'priceCurrency': m.CharField(),
+    'availability': m.CharField(),
+    'inventoryLevel': m.IntegerField(),
+}
+
+# A compact class must not derive from a dict-backed one, so the two classes
+# are built side by side from the same fields.
+Offer = type(m.Model)('Offer', (m.Model,), dict(FIELDS))
+CompactOffer = type(m.Model)('CompactOffer', (m.Model,),
+                             dict(FIELDS, compact=True))
+
+
+def make_data(i):
+    return {
+        'name': 'Offer %d' % i,
+        'price': i * 0.01,
+        'priceCurrency': 'USD',
+        'availability': 'InStock',
+        'inventoryLevel': i,
+    }
+
+
+def main():
+    records = [make_data(i) for i in range(COUNT)]
+    rows = []
+    for cls in (Offer, CompactOffer):
+        size = bytes_per_object(lambda i: cls(records[i]), COUNT)
+        rows.append((cls.__name__, '%.1f' % size))
+    print_table(('class', 'bytes per instance'), rows)
+
+
+if __name__ == '__main__':
+    main()
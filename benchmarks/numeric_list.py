@@ -0,0 +1,38 @@
+"""
+Compare the list, array and NumPy storage of numeric ListFields: memory per
+item, conversion, and summing the items.
+
+Run with ``python -m benchmarks.numeric_list``.
+"""
+from schemazoid import micromodels as m
+from schemazoid.micromodels.fields.complex import numpy
+
+from .common import best_time, bytes_per_object, print_table
+
+SIZE = 100000
+COUNT = 20
+
+
+def main():
+    # Strings, as from a CSV file, so that every item is a new float.
+    data = [str(i * 0.5) for i in range(SIZE)]
+    storages = [None, 'array']
+    if numpy is not None:
+        storages.append('numpy')
+
+    rows = []
+    for storage in storages:
+        field = m.ListField(of_type=m.FloatField(), storage=storage)
+        size = bytes_per_object(lambda i: field.to_python(data), COUNT)
+        items = field.to_python(data)
+        convert = best_time(lambda: field.to_python(data))
+        total = best_time(lambda: sum(items))
+        serial = best_time(lambda: field.to_serial(items))
+        rows.append((storage or 'list', '%.1f' % (size / SIZE),
+                     '%.4f' % convert, '%.4f' % total, '%.4f' % serial))
+    print_table(('storage', 'bytes per item', 'to_python (s)', 'sum (s)',
+                 'to_serial (s)'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Compare building models in this process with ``Model.parse_many`` across a
+pool of worker processes, returning models or serialized dictionaries.
+
+Run with ``python -m benchmarks.parallel``.
+"""
+import multiprocessing
+
+from .bulk import DatedOffer, make_data
+from .common import best_time, print_table
+
+COUNT = 200000
+
+
+def main():
+    records = [make_data(i) for i in range(COUNT)]
+    workers = multiprocessing.cpu_count()
+
+    def parse(**kwargs):
+        return lambda: list(DatedOffer.parse_many(records, **kwargs))
+
+    rows = []
+    base = best_time(lambda: DatedOffer.from_records(records), repeat=3)
+    rows.append(('from_records', '-', '%.3f' % base, '1.00x'))
+    for label, kwargs in [
+            ('models', {}),
+            ('serial', {'serial': True}),
+            ('serial, unordered', {'serial': True, 'ordered': False})]:
+        elapsed = best_time(parse(workers=workers, **kwargs), repeat=3)
+        rows.append((label, workers, '%.3f' % elapsed,
+                     '%.2fx' % (base / elapsed)))
+    print_table(('method', 'workers', 'time (s)', 'speedup'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Model schemas of different shapes for the benchmark suite, with functions to
+make records for them.
+
+* ``flat``: a handful of simple fields.
+* ``wide``: fifty fields of mixed types.
+* ``deep``: models nested four levels deep, through ModelFields and
+  ListFields of them.
+"""
+from schemazoid import micromodels as m
+
+
+class Flat(m.Model):
+    name = m.CharField()
+    price = m.FloatField()
+    currency = m.CharField()
+    available = m.BooleanField()
+    stock = m.IntegerField()
+    validFrom = m.DateField()
+
+
+def make_flat(i):
+    return {
+        'name': 'Offer %d' % i,
+        'price': str(i * 0.01),
+        'currency': 'USD',
+        'available': 'true',
+        'stock': i,
+        'validFrom': '2014-08-09',
+    }
+
+
+# Field types for the wide schema, with a raw value for each.
+_WIDE_KINDS = [
+    (m.CharField, lambda i: 'text %d' % i),
+    (m.IntegerField, lambda i: str(i)),
+    (m.FloatField, lambda i: i * 0.5),
+    (m.BooleanField, lambda i: i % 2),
+    (m.DateField, lambda i: '2014-08-%02d' % (i % 28 + 1)),
+]
+WIDE_FIELDS = 50
+
+Wide = type(m.Model)('Wide', (m.Model,), dict(
+    ('field%02d' % n, _WIDE_KINDS[n % len(_WIDE_KINDS)][0]())
+    for n in range(WIDE_FIELDS)))
+
+
+def make_wide(i):
+    return dict(('field%02d' % n, _WIDE_KINDS[n % len(_WIDE_KINDS)][1](i))
+                for n in range(WIDE_FIELDS))
+
+
+class Leaf(m.Model):
+    name = m.CharField()
+    value = m.IntegerField()
+    when = m.DateTimeField()
+
+
+class Branch(m.Model):
+    name = m.CharField()
+    leaf = m.ModelField(Leaf)
+    leaves = m.ListField(of_type=m.ModelField(Leaf))
+
+
+class Trunk(m.Model):
+    name = m.CharField()
+    branch = m.ModelField(Branch)
+    branches = m.ListField(of_type=m.ModelField(Branch))
+
+
+class Deep(m.Model):
+    name = m.CharField()
+    trunk = m.ModelField(Trunk)
+    tags = m.ListField(of_type=m.CharField())
+
+
+def _make_leaf(i):
+    return {'name': 'leaf %d' % i, 'value': str(i),
+            'when': '2014-08-09T12:21:00Z'}
+
+
+def _make_branch(i):
+    return {'name': 'branch %d' % i, 'leaf': _make_leaf(i),
+            'leaves': [_make_leaf(i + n) for n in range(3)]}
+
+
+def make_deep(i):
+    return {
+        'name': 'tree %d' % i,
+        'trunk': {'name': 'trunk %d' % i, 'branch': _make_branch(i),
+                  'branches': [_make_branch(i + n) for n in range(2)]},
+        'tags': ['a', 'b', 'c'],
+    }
+
+
+# name: (model class, record factory, number of records per run, name of a
+# field to set in the update benchmarks, with a raw value for it)
+SCHEMAS = {
+    'flat': (Flat, make_flat, 20000, 'price', '1.5'),
+    'wide': (Wide, make_wide, 2000, 'field01', '7'),
+    'deep': (Deep, make_deep, 2000, 'name', 'renamed'),
+}
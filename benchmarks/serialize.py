@@ -0,0 +1,65 @@
+"""
+Time serializing flat and nested models with ``to_dict`` and ``to_serial``,
+and selecting a few fields with ``include`` against filtering the whole
+serialized dictionary.
+
+Run with ``python -m benchmarks.serialize``.
+"""
+from __future__ import print_function
+
+from schemazoid import micromodels as m
+
+from .bulk import DatedOffer, make_data
+from .common import best_time, print_table
+
+COUNT = 20000
+
+
+class Product(m.Model):
+    name = m.CharField()
+    sku = m.CharField()
+    releaseDate = m.DateField()
+    offers = m.ListField(of_type=m.ModelField(DatedOffer))
+    tags = m.ListField(of_type=m.CharField())
+
+
+def make_product(i):
+    return {
+        'name': 'Product %d' % i,
+        'sku': 'SKU-%d' % i,
+        'releaseDate': '2014-01-01',
+        'offers': [make_data(i + j) for j in range(3)],
+        'tags': ['a', 'b', 'c'],
+    }
+
+
+def main():
+    offers = [DatedOffer(make_data(i)) for i in range(COUNT)]
+    products = [Product(make_product(i)) for i in range(COUNT)]
+    rows = []
+    for label, models in (('flat', offers), ('nested', products)):
+        native = best_time(lambda: [model.to_dict() for model in models])
+        serial = best_time(lambda: [model.to_serial() for model in models])
+        rows.append((label, COUNT, '%.3f' % native, '%.3f' % serial))
+    print_table(('models', 'count', 'to_dict (s)', 'to_serial (s)'), rows)
+    print()
+
+    include = ['name', 'releaseDate', 'offers.price']
+
+    def filtered(product):
+        serial = product.to_serial()
+        return {'name': serial['name'],
+                'releaseDate': serial['releaseDate'],
+                'offers': [{'price': offer['price']}
+                           for offer in serial['offers']]}
+
+    whole = best_time(lambda: [filtered(model) for model in products])
+    projected = best_time(
+        lambda: [model.to_serial(include=include) for model in products])
+    print_table(('selecting %s' % ', '.join(include), 'time (s)'),
+                [('to_serial, then filter', '%.3f' % whole),
+                 ('to_serial(include=...)', '%.3f' % projected)])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,280 @@
+"""
+The benchmark suite: timings of the micromodels hot paths, for comparing
+runs and catching performance regressions.
+
+Each case is a function, registered with :func:`case`, that prepares its
+data and returns a function to time along with the number of operations
+that function performs. A function with a true ``times_itself`` attribute
+returns its own time in seconds instead, for work that has to be timed
+elsewhere, such as imports in a new interpreter. Run the suite with
+``python -m benchmarks``.
+"""
+import datetime
+import platform
+import re
+import sys
+
+from schemazoid import __version__, micromodels as m
+
+from .common import best_time
+from .imports import IMPORTS, import_time
+from .schemas import SCHEMAS
+
+# name: setup function, in the order registered.
+CASES = []
+
+LIST_SIZE = 100000
+PARSE_COUNT = 20000
+
+
+def case(name):
+    """Register a benchmark case under ``name``."""
+    def register(setup):
+        CASES.append((name, setup))
+        return setup
+    return register
+
+
+def _register_schema_cases(schema):
+    cls, make, count, field, value = SCHEMAS[schema]
+
+    def records():
+        return [make(i) for i in range(count)]
+
+    def models():
+        return [cls(record) for record in records()]
+
+    @case(schema + '.construct')
+    def construct():
+        data = records()
+        return lambda: [cls(record) for record in data], count
+
+    @case(schema + '.from_records')
+    def from_records():
+        data = records()
+        return lambda: cls.from_records(data), count
+
+    @case(schema + '.construct_trusted')
+    def construct_trusted():
+        data = [instance.to_serial() for instance in models()]
+        return lambda: [cls.construct(record) for record in data], count
+
+    @case(schema + '.construct_native')
+    def construct_native():
+        data = [instance.to_dict() for instance in models()]
+        return (lambda: [cls.construct(record, native=True)
+                         for record in data], count)
+
+    @case(schema + '.validate_raw')
+    def validate_raw():
+        data = records()
+        return lambda: [cls.validate_raw(record) for record in data], count
+
+    @case(schema + '.update')
+    def update():
+        instances = models()
+        data = records()
+
+        def run():
+            for instance, record in zip(instances, data):
+                instance.update(record)
+        return run, count
+
+    @case(schema + '.setattr')
+    def set_field():
+        instances = models()
+
+        def run():
+            for instance in instances:
+                setattr(instance, field, value)
+        return run, count
+
+    @case(schema + '.to_dict')
+    def to_dict():
+        instances = models()
+        return lambda: [instance.to_dict() for instance in instances], count
+
+    @case(schema + '.to_serial')
+    def to_serial():
+        instances = models()
+        return (lambda: [instance.to_serial() for instance in instances],
+                count)
+
+
+for _schema in sorted(SCHEMAS):
+    _register_schema_cases(_schema)
+
+
+@case('list.to_python')
+def list_to_python():
+    field = m.ListField(of_type=m.IntegerField())
+    data = [str(i) for i in range(LIST_SIZE)]
+    return lambda: field.to_python(data), LIST_SIZE
+
+
+@case('list.to_python_lazy')
+def list_to_python_lazy():
+    field = m.ListField(of_type=m.IntegerField(), lazy=True)
+    data = [str(i) for i in range(LIST_SIZE)]
+    return lambda: field.to_python(data), LIST_SIZE
+
+
+@case('list.to_python_array')
+def list_to_python_array():
+    field = m.ListField(of_type=m.IntegerField(), storage='array')
+    data = [str(i) for i in range(LIST_SIZE)]
+    return lambda: field.to_python(data), LIST_SIZE
+
+
+@case('list.append')
+def list_append():
+    field = m.ListField(of_type=m.IntegerField())
+
+    def run():
+        items = field.to_python([])
+        for i in range(LIST_SIZE):
+            items.append(i)
+    return run, LIST_SIZE
+
+
+@case('list.iterate')
+def list_iterate():
+    items = m.ListField(of_type=m.IntegerField()).to_python(
+        range(LIST_SIZE))
+    return lambda: sum(items), LIST_SIZE
+
+
+@case('list.getitem')
+def list_getitem():
+    items = m.ListField(of_type=m.IntegerField()).to_python(
+        range(LIST_SIZE))
+
+    def run():
+        for i in range(LIST_SIZE):
+            items[i]
+    return run, LIST_SIZE
+
+
+@case('list.to_serial')
+def list_to_serial():
+    field = m.ListField(of_type=m.DateField())
+    items = field.to_python(['2014-08-09'] * LIST_SIZE)
+    return lambda: field.to_serial(items), LIST_SIZE
+
+
+def _register_parse_case(name, field, values):
+    @case(name)
+    def parse():
+        data = list(values) * (PARSE_COUNT // len(values))
+        to_python = field.to_python
+        return lambda: [to_python(value) for value in data], len(data)
+
+
+# Each way the date and time fields parse their input.
+_register_parse_case('datetime.iso', m.DateTimeField(),
+                     ['2010-07-13T14:02:00-05:00'])
+_register_parse_case('datetime.iso_basic', m.DateTimeField(),
+                     ['20100713T140200Z'])
+_register_parse_case('datetime.dateutil', m.DateTimeField(),
+                     ['Tue, 13 Jul 2010 14:02:00'])
+_register_parse_case('datetime.format',
+                     m.DateTimeField(format='%d/%m/%Y %H:%M'),
+                     ['13/07/2010 14:02'])
+# 100 distinct values, each repeated, as in real data.
+_register_parse_case('datetime.cached', m.DateTimeField(cache=True),
+                     ['2010-07-13T14:%02d:00Z' % (i % 60) for i in range(100)])
+_register_parse_case('datetime.native', m.DateTimeField(),
+                     [datetime.datetime(2010, 7, 13, 14, 2)])
+_register_parse_case('date.iso', m.DateField(), ['2010-07-13'])
+_register_parse_case('date.dateutil', m.DateField(), ['July 13, 2010'])
+_register_parse_case('time.iso', m.TimeField(), ['09:33:30'])
+_register_parse_case('time.dateutil', m.TimeField(), ['9:33 pm'])
+
+
+@case('datetime.to_serial')
+def datetime_to_serial():
+    field = m.DateTimeField()
+    values = [datetime.datetime(2010, 7, 13, 14, 2)] * PARSE_COUNT
+    return lambda: [field.to_serial(value) for value in values], PARSE_COUNT
+
+
+@case('datetime.to_serial_format')
+def datetime_to_serial_format():
+    field = m.DateTimeField(serial_format='%d/%m/%Y %H:%M')
+    values = [datetime.datetime(2010, 7, 13, 14, 2)] * PARSE_COUNT
+    return lambda: [field.to_serial(value) for value in values], PARSE_COUNT
+
+
+def _register_import_case(name, statements):
+    @case('import.' + name)
+    def time_import():
+        def run():
+            return import_time(statements, repeat=1)
+        run.times_itself = True
+        return run, 1
+
+
+for _name, _statements in IMPORTS:
+    _register_import_case(_name, _statements)
+
+
+def run(pattern=None, repeat=5, report=None):
+    """Run the cases whose names match the regular expression ``pattern``,
+    or every case, and return the results as a dictionary that can be
+    serialized as JSON.
+
+    ``report``, if given, is called with the name and result of each case
+    as it finishes.
+    """
+    results = {}
+    for name, setup in CASES:
+        if pattern and not re.search(pattern, name):
+            continue
+        func, ops = setup()
+        if getattr(func, 'times_itself', False):
+            seconds = min(func() for _ in range(repeat))
+        else:
+            seconds = best_time(func, repeat=repeat)
+        results[name] = {
+            'seconds': seconds,
+            'ops': ops,
+            'us_per_op': seconds * 1e6 / ops,
+        }
+        if report is not None:
+            report(name, results[name])
+    return {
+        'meta': {
+            'schemazoid': __version__,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'argv': sys.argv[1:],
+            'date': datetime.datetime.utcnow().isoformat() + 'Z',
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Compare the results of two runs of the suite.
+
+    Returns a list of ``(name, baseline us, current us, change)`` rows for
+    the cases found in both, where ``change`` is the relative change in time
+    per operation, and a list of the names of the cases that are slower
+    than the baseline by more than ``threshold``, a fraction such as 0.1
+    for 10%.
+    """
+    rows = []
+    regressions = []
+    current = results['results']
+    for name, before in sorted(baseline['results'].items()):
+        if name not in current:
+            continue
+        old = before['us_per_op']
+        new = current[name]['us_per_op']
+        change = (new - old) / old if old else 0.0
+        rows.append((name, old, new, change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
@@ -0,0 +1,52 @@
+"""
+Compare the date and time fields' dedicated ISO 8601 parsers with the
+dateutil parsing they replace.
+
+Run with ``python -m benchmarks.temporal``.
+"""
+import datetime
+
+from dateutil.parser import parse as parse_datetime
+
+from schemazoid import micromodels as m
+
+from .common import best_time, print_table
+
+COUNT = 20000
+
+
+def dateutil_datetime(value):
+    return parse_datetime(value)
+
+
+def dateutil_time(value):
+    # How TimeField parsed times before it had its own parser.
+    today = datetime.datetime.now().date().isoformat()
+    return parse_datetime(today + ' at ' + value).time()
+
+
+CASES = [
+    ('DateTimeField', '2010-07-13T14:02:00-05:00', m.DateTimeField(),
+     dateutil_datetime),
+    ('DateField', '2010-07-13', m.DateField(),
+     lambda value: dateutil_datetime(value).date()),
+    ('TimeField', '09:33:30', m.TimeField(), dateutil_time),
+    ('TimeField', '093330', m.TimeField(), dateutil_time),
+]
+
+
+def main():
+    rows = []
+    for name, value, field, old in CASES:
+        values = [value] * COUNT
+        old_time = best_time(lambda: [old(v) for v in values])
+        new_time = best_time(lambda: [field.to_python(v) for v in values])
+        rows.append((name, value, '%.2f' % (old_time * 1e6 / COUNT),
+                     '%.2f' % (new_time * 1e6 / COUNT),
+                     '%.1fx' % (old_time / new_time)))
+    print_table(('field', 'input', 'dateutil (us)', 'field (us)', 'speedup'),
+                rows)
+
+
+if __name__ == '__main__':
+    main()
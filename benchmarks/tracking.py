@@ -0,0 +1,57 @@
+"""
+Compare serializing long-lived models again after a small change, with and
+without the ``track_changes`` option, and the cost of the option when
+building models.
+
+Run with ``python -m benchmarks.tracking``.
+"""
+from __future__ import print_function
+
+from schemazoid import micromodels as m
+
+from .bulk import DatedOffer
+from .common import best_time, print_table
+from .serialize import Product, make_product
+
+COUNT = 5000
+ROUNDS = 10
+
+TrackedOffer = type(m.Model)('TrackedOffer', (DatedOffer,),
+                             {'track_changes': True})
+TrackedProduct = type(m.Model)('TrackedProduct', (Product,), {
+    'track_changes': True,
+    'offers': m.ListField(of_type=m.ModelField(TrackedOffer)),
+})
+
+
+def main():
+    records = [make_product(i) for i in range(COUNT)]
+    rows = []
+    for cls in (Product, TrackedProduct):
+        build = best_time(lambda: [cls(record) for record in records])
+        products = [cls(record) for record in records]
+
+        def change_top_level():
+            for i in range(ROUNDS):
+                for product in products:
+                    product.sku = i
+                    product.to_serial()
+
+        def change_nested():
+            for i in range(ROUNDS):
+                for product in products:
+                    product.offers[0].inventoryLevel = i
+                    product.to_serial()
+
+        rows.append((cls.__name__, '%.3f' % build,
+                     '%.3f' % best_time(change_top_level, repeat=3),
+                     '%.3f' % best_time(change_nested, repeat=3)))
+    print()
+    summary = '%d products, each changed and serialized %d times'
+    print(summary % (COUNT, ROUNDS))
+    print_table(('class', 'build (s)', 'change sku (s)',
+                 'change an offer (s)'), rows)
+
+
+if __name__ == '__main__':
+    main()
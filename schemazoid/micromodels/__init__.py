@@ -1,3 +1,4 @@
+from .cache import LRUCache, StringPool
 from .models import Model
 from .fields import Field, CharField, IntegerField, FloatField,\
     BooleanField, DateTimeField, DateField, TimeField, ModelField,\
@@ -0,0 +1,173 @@
+"""
+A size-bounded cache for the results of field conversions, and a pool for
+sharing repeated strings.
+"""
+import collections
+import sys
+import threading
+
+CacheInfo = collections.namedtuple(
+    'CacheInfo', 'hits misses evictions maxsize currsize')
+PoolInfo = collections.namedtuple(
+    'PoolInfo', 'hits misses bytes_saved maxsize currsize')
+
+# Positions of the fields in each link of the cache's linked list.
+_PREV, _NEXT, _KEY, _VALUE = 0, 1, 2, 3
+
+
+class LRUCache(object):
+    """A mapping of at most ``maxsize`` entries that evicts the least
+    recently used entry to make room for a new one.
+
+    A pickled cache is restored empty, with the same ``maxsize``.
+
+    Only :meth:`get` and :meth:`put` count towards the statistics reported
+    by :meth:`info`. All methods are safe to call from several threads.
+    """
+    def __init__(self, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._links = {}
+        # The root of a circular doubly linked list of links, ordered from
+        # least (root[_NEXT]) to most (root[_PREV]) recently used.
+        self._root = root = []
+        root[:] = [root, root, None, None]
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def __reduce__(self):
+        # Locks can't be pickled, and the entries are only a cache, so a
+        # pickled LRUCache comes back empty.
+        return (LRUCache, (self.maxsize,))
+
+    def __len__(self):
+        return len(self._links)
+
+    def __contains__(self, key):
+        return key in self._links
+
+    def get(self, key, default=None):
+        """Return the value cached for ``key``, marking it as the most
+        recently used, or ``default`` if there is none.
+        """
+        with self._lock:
+            link = self._links.get(key)
+            if link is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            link_prev, link_next = link[_PREV], link[_NEXT]
+            link_prev[_NEXT] = link_next
+            link_next[_PREV] = link_prev
+            root = self._root
+            last = root[_PREV]
+            last[_NEXT] = root[_PREV] = link
+            link[_PREV] = last
+            link[_NEXT] = root
+            return link[_VALUE]
+
+    def put(self, key, value):
+        """Cache ``value`` for ``key``, evicting the least recently used
+        entry if the cache is full.
+        """
+        with self._lock:
+            links = self._links
+            root = self._root
+            if key in links:
+                links[key][_VALUE] = value
+                return
+            if len(links) >= self.maxsize:
+                oldest = root[_NEXT]
+                root[_NEXT] = oldest[_NEXT]
+                oldest[_NEXT][_PREV] = root
+                del links[oldest[_KEY]]
+                self.evictions += 1
+            last = root[_PREV]
+            link = [last, root, key, value]
+            last[_NEXT] = root[_PREV] = links[key] = link
+
+    def clear(self):
+        """Remove every entry and reset the statistics."""
+        with self._lock:
+            self._links.clear()
+            root = self._root
+            root[:] = [root, root, None, None]
+            self.hits = self.misses = self.evictions = 0
+
+    def hit_rate(self):
+        """Return the fraction of calls to :meth:`get` that found a value,
+        or 0.0 if there were none.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return self.hits / float(lookups) if lookups else 0.0
+
+    def info(self):
+        """Return a named tuple of ``hits``, ``misses``, ``evictions``,
+        ``maxsize`` and ``currsize`` describing the cache.
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions,
+                             self.maxsize, len(self._links))
+
+
+class StringPool(object):
+    """A pool of at most ``maxsize`` distinct strings, which replaces
+    strings equal to one already in the pool with the pooled copy, so that
+    repeated values share a single object.
+
+    Once the pool is full, new strings are returned as they are rather
+    than evicting pooled ones, which models may still share. A pickled pool
+    is restored empty, with the same ``maxsize``.
+
+    :meth:`info` reports ``bytes_saved``, the total size of the duplicate
+    strings replaced by pooled copies. The pool is safe to use from several
+    threads, though the statistics may then undercount.
+    """
+    def __init__(self, maxsize=10000):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        # Each string, mapped to itself and its size in bytes.
+        self._strings = {}
+        self.hits = self.misses = self.bytes_saved = 0
+
+    def __reduce__(self):
+        return (StringPool, (self.maxsize,))
+
+    def __len__(self):
+        return len(self._strings)
+
+    def __contains__(self, value):
+        return value in self._strings
+
+    def intern(self, value):
+        """Return the pooled string equal to ``value``, adding ``value`` to
+        the pool if there is none and the pool is not full.
+        """
+        entry = self._strings.get(value)
+        if entry is not None:
+            self.hits += 1
+            # Interning the pooled string itself again saves nothing.
+            if entry[0] is not value:
+                self.bytes_saved += entry[1]
+            return entry[0]
+        self.misses += 1
+        strings = self._strings
+        if len(strings) < self.maxsize:
+            # setdefault, in case another thread has just added it.
+            return strings.setdefault(value, (value, sys.getsizeof(value)))[0]
+        return value
+
+    def clear(self):
+        """Remove every string and reset the statistics."""
+        self._strings.clear()
+        self.hits = self.misses = self.bytes_saved = 0
+
+    def info(self):
+        """Return a named tuple of ``hits``, ``misses``, ``bytes_saved``,
+        ``maxsize`` and ``currsize`` describing the pool.
+        """
+        return PoolInfo(self.hits, self.misses, self.bytes_saved,
+                        self.maxsize, len(self._strings))
@@ -1,8 +1,24 @@
+import collections
+import copy
 import datetime
 import six
 
 from dateutil.parser import parse as parse_datetime
 
+from . import iso8601
+from ..cache import LRUCache, StringPool
+
+# Marks a missing value where None would be ambiguous.
+_MISSING = object()
+
+# A value that a field cannot convert, found by check_raw. ``path`` is a
+# tuple of the field names, list indexes and dictionary keys leading to it.
+FieldError = collections.namedtuple('FieldError', 'path value error')
+
+# The exceptions check_raw reports as a FieldError. OverflowError comes
+# from numbers too big to convert, such as int(float('inf')).
+CONVERSION_ERRORS = (TypeError, ValueError, OverflowError)
+
 
 # * Django fields contain no instance data, only validation.
 # * Django fields contain a reference to their model and their own name within
@@ -38,16 +54,175 @@ class Field(object):
         """
         return data
 
+    def is_serial(self, data):
+        """Returns True if ``data`` is exactly what
+        ``to_serial(to_python(data))`` would return, so that it can be
+        serialized as it is without being converted.
+
+        The default is True only for fields that override neither
+        ``to_python`` nor ``to_serial``. Subclasses that can recognize their
+        own serial form cheaply should override this method.
+        """
+        return not any(overrides(self, name)
+                       for name in ('to_python', 'to_serial'))
+
+    def check_raw(self, data, path, errors, fail_fast=False):
+        """Checks that ``data`` can be converted by
+        :meth:`~schemazoid.micromodels.Field.to_python`, without keeping the
+        result, appending a ``FieldError`` to the list ``errors`` for each
+        value that cannot be. ``path`` is the path of ``data`` within the
+        record. Used by :meth:`~schemazoid.micromodels.Model.validate_raw`.
+
+        Fields of nested values check each of them, and stop at the first
+        error if ``fail_fast`` is True. The default calls ``to_python``.
+        """
+        try:
+            self.to_python(data)
+        except CONVERSION_ERRORS as e:
+            errors.append(FieldError(path, data, e))
+
+    def tracks_changes(self):
+        """Returns True if the values of this field can only change by
+        setting the field again, or report their changes to the models that
+        hold them. A model with the ``track_changes`` option only caches the
+        serialized values of such fields.
+
+        The default is False, since the values of a plain Field may be
+        anything. Fields of immutable values should override this method.
+        """
+        return False
+
+    def diff(self, old, new):
+        """Returns a patch that turns the value ``old`` of this field into
+        ``new`` when given to
+        :meth:`~schemazoid.micromodels.Field.apply_patch`, or an empty
+        dictionary if they are the same.
+
+        The default compares the serialized values, and if they differ
+        returns ``{'value': serial}``, which replaces the whole value with
+        the serialized ``new``. Fields holding structured values override
+        this to describe only what changed.
+        """
+        if old is new:
+            return {}
+        old = self.to_serial(old)
+        new = self.to_serial(new)
+        if type(old) is type(new) and old == new:
+            return {}
+        return {'value': new}
+
+    def apply_patch(self, value, patch):
+        """Returns ``value`` changed as described by ``patch``, from
+        :meth:`~schemazoid.micromodels.Field.diff`. Structured values are
+        changed in place where possible, in which case ``value`` itself is
+        returned. If ``value`` is None, fields holding structured values
+        apply the changes to a new, empty value instead.
+        """
+        if 'value' not in patch:
+            raise ValueError("Cannot apply patch %r to a %s" %
+                             (patch, self.__class__.__name__))
+        return self.to_python(patch['value'])
+
+    def projection(self, serial, include, exclude):
+        """Return a function that converts a value of this field to the
+        dictionary form of the models it holds, with only the fields selected
+        by the ``include`` and ``exclude`` paths, which are as for
+        :meth:`~schemazoid.micromodels.Model.to_dict`. The dictionaries are
+        serial if ``serial`` is True.
+
+        Only fields that hold models can do this. The default raises
+        :exc:`ValueError`.
+        """
+        raise ValueError("Cannot select fields within a %s" %
+                         self.__class__.__name__)
+
+    def trusted_converter(self, native):
+        """Return a function that converts data known to be valid to the
+        value of this field, without the checks made by
+        :meth:`~schemazoid.micromodels.Field.to_python`, or None if such
+        data is already the value. Used by
+        :meth:`~schemazoid.micromodels.Model.construct`.
+
+        Trusted data is in the serial form returned by
+        :meth:`~schemazoid.micromodels.Field.to_serial`, or if ``native``
+        is True, the form held by models and returned by
+        :meth:`~schemazoid.micromodels.Model.to_dict`. The default is
+        ``to_python`` for fields that override it, and None otherwise.
+        """
+        if overrides(self, 'to_python'):
+            return self.to_python
+        return None
+
+
+def overrides(field, name):
+    """Return True if the class of ``field`` overrides the method of the
+    given name defined by :class:`Field`.
+    """
+    return (six.get_unbound_function(getattr(field.__class__, name)) is not
+            six.get_unbound_function(getattr(Field, name)))
+
 
 class CharField(Field):
-    """Field to represent a simple Unicode string value."""
+    """Field to represent a simple Unicode string value.
+
+    Fields whose values repeat a few strings many times, such as language
+    or country codes, can save memory by sharing one copy of each value.
+    Pass ``intern=True`` to pool the values in the
+    :class:`~schemazoid.micromodels.StringPool` in the ``default_pool``
+    class attribute, which all such fields share, or pass a ``StringPool``
+    for the field to use. The pool's ``info()`` method reports how many
+    bytes were saved::
+
+        >>> from schemazoid import micromodels as m
+        >>> field = m.ListField(of_type=m.CharField(intern=True))
+        >>> codes = field.to_python(''.join(['e', 'n']) for i in range(3))
+        >>> codes[0] is codes[2]
+        True
+    """
+    default_pool = StringPool()
+
+    def __init__(self, intern=False, **kwargs):
+        super(CharField, self).__init__(**kwargs)
+        if not (intern is None or isinstance(intern, (bool, StringPool))):
+            raise TypeError("intern must be True, False or a StringPool")
+        # An empty pool is false, so test for False explicitly.
+        self._pool = None if intern is False else intern
+
+    @property
+    def pool(self):
+        """The StringPool used by this field, or None."""
+        pool = self._pool
+        if pool is True:
+            return self.default_pool
+        return pool
 
     def to_python(self, data):
         if data is None:
             return six.u('')
         elif hasattr(data, 'isoformat'):
-            return data.isoformat()
-        return str(data) + six.u('')  # probably dangerous
+            result = data.isoformat()
+        else:
+            result = str(data) + six.u('')  # probably dangerous
+        pool = self._pool
+        if pool is not None:
+            if pool is True:
+                pool = self.default_pool
+            return pool.intern(result)
+        return result
+
+    def is_serial(self, data):
+        return type(data) is six.text_type
+
+    def tracks_changes(self):
+        return True
+
+    def trusted_converter(self, native):
+        if self._pool is not None and not native:
+            return self._intern
+        return None
+
+    def _intern(self, data):
+        return self.pool.intern(data)
 
 
 class IntegerField(Field):
@@ -58,6 +233,15 @@ class IntegerField(Field):
             return 0
         return int(data)
 
+    def is_serial(self, data):
+        return type(data) in six.integer_types
+
+    def tracks_changes(self):
+        return True
+
+    def trusted_converter(self, native):
+        return None
+
 
 class FloatField(Field):
     """Field to represent a floating point value"""
@@ -67,6 +251,15 @@ class FloatField(Field):
             return 0.0
         return float(data)
 
+    def is_serial(self, data):
+        return type(data) is float
+
+    def tracks_changes(self):
+        return True
+
+    def trusted_converter(self, native):
+        return None
+
 
 class BooleanField(Field):
     """Field to represent a boolean.
@@ -82,22 +275,91 @@ class BooleanField(Field):
                 return False
         return bool(data)
 
+    def is_serial(self, data):
+        return type(data) is bool
+
+    def tracks_changes(self):
+        return True
+
+    def trusted_converter(self, native):
+        return None
+
+
+# The parser in C for the output of isoformat(), in Python 3.7 and later.
+_fromisoformat = getattr(datetime.datetime, 'fromisoformat', None)
+
+
+def _parse_isoformat(data):
+    """Parse the output of :meth:`datetime.datetime.isoformat` with
+    ``datetime.fromisoformat``, giving aware values the same tzinfo as
+    the ISO 8601 parser does.
+    """
+    result = _fromisoformat(data)
+    if result.tzinfo is not None:
+        offset = data[-6:]
+        if offset[0] not in '+-':
+            raise ValueError("Unexpected UTC offset in %r" % data)
+        result = result.replace(tzinfo=iso8601.parse_offset(offset))
+    return result
+
 
 class DateTimeField(Field):
     """Field to represent a datetime
 
     The ``format`` parameter dictates the format of the input strings, and is
     used in the construction of the :class:`~datetime.datetime` object.
+    Without it, input strings are parsed as ISO 8601. The common ISO 8601
+    formats are handled by a fast dedicated parser, and anything else by
+    ``dateutil.parser.parse``.
 
     The ``serial_format`` parameter is a strftime formatted string for
     serialization. If ``serial_format`` isn't specified, an ISO formatted
     string will be returned.
 
+    Data that repeats the same strings can avoid parsing them again by
+    caching the results in an :class:`~schemazoid.micromodels.LRUCache`.
+    The ``cache`` parameter may be an ``LRUCache`` (which several fields can
+    share), an integer giving the size of a new cache for this field alone,
+    ``True`` for a new cache of the default size, or ``False`` for no cache.
+    By default fields use the cache in the ``default_cache`` class
+    attribute, which is None, meaning no cache. Set it to enable caching
+    for every date, datetime and time field at once, and back to None to
+    disable it again::
+
+        >>> from schemazoid import micromodels as m
+        >>> m.DateTimeField.default_cache = m.LRUCache(maxsize=10000)
+        >>> m.DateTimeField.default_cache = None
+
+    The cache's ``info()`` method reports hits, misses and evictions.
+    Cached values are immutable :mod:`datetime` objects, including their
+    tzinfo, so it is safe for many models to share them.
     """
-    def __init__(self, format=None, serial_format=None, **kwargs):
+    default_cache = None
+    # A fast parser for the output of isoformat(), which gives the same
+    # values as to_python, where Python has one.
+    _fromisoformat = None if _fromisoformat is None else staticmethod(
+        _parse_isoformat)
+
+    def __init__(self, format=None, serial_format=None, cache=None,
+                 **kwargs):
         super(DateTimeField, self).__init__(**kwargs)
         self.format = format
         self.serial_format = serial_format
+        if cache is True:
+            cache = LRUCache()
+        elif isinstance(cache, six.integer_types) and cache is not False:
+            cache = LRUCache(cache)
+        self._cache = cache
+
+    @property
+    def cache(self):
+        """The LRUCache used by this field, or None."""
+        cache = self._cache
+        if cache is None:
+            return self.default_cache
+        elif cache is False:
+            return None
+        return cache
 
     def to_python(self, data):
         if data is None:
@@ -106,12 +368,63 @@ class DateTimeField(Field):
         # don't parse data that is already native
         if isinstance(data, datetime.datetime):
             return data
-        elif self.format is None:
-            # parse as iso8601
-            return parse_datetime(data)
+        return self._parse_cached(data)
+
+    def _parse_cached(self, data):
+        """Return the result of :meth:`_parse`, using the cache if there
+        is one.
+        """
+        cache = self._cache
+        if cache is None:
+            cache = self.default_cache
+        uncached = cache is None or cache is False
+        if uncached or not isinstance(data, six.string_types):
+            return self._parse(data)
+        # Shared caches may hold results for other kinds of fields, or
+        # other formats.
+        key = (self.__class__, self.format, data)
+        result = cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = self._parse(data)
+            cache.put(key, result)
+        return result
+
+    def _parse(self, data):
+        """Convert a string to the native value of this field."""
+        if self.format is None:
+            # parse as iso8601, trying the fast parser for the common formats
+            # before falling back to dateutil's much slower general one
+            result = iso8601.parse_datetime(data)
+            if result is None:
+                result = parse_datetime(data)
+            return result
         else:
             return datetime.datetime.strptime(data, self.format)
 
+    def tracks_changes(self):
+        return True
+
+    def trusted_converter(self, native):
+        if native:
+            return None
+        if self.serial_format == self.format:
+            to_python = self.to_python
+        else:
+            # Serial data is in the serial format, not the input format.
+            field = copy.copy(self)
+            field.format = self.serial_format
+            to_python = field.to_python
+        parse = self._fromisoformat
+        if parse is None or self.serial_format is not None:
+            return to_python
+
+        def convert(data):
+            try:
+                return parse(data)
+            except (TypeError, ValueError):
+                return to_python(data)
+        return convert
+
     def to_serial(self, time_obj):
         if not self.serial_format:
             return time_obj.isoformat()
@@ -120,18 +433,28 @@ class DateTimeField(Field):
 
 class DateField(DateTimeField):
     """Field to represent a :class:`datetime.date`"""
+    _fromisoformat = getattr(datetime.date, 'fromisoformat', None)
 
     def to_python(self, data):
         # don't parse data that is already native
         if isinstance(data, datetime.date) or data is None:
             return data
+        return self._parse_cached(data)
 
-        dt = super(DateField, self).to_python(data)
-        return dt.date()
+    def _parse(self, data):
+        return super(DateField, self)._parse(data).date()
 
 
 class TimeField(DateTimeField):
-    """Field to represent a :class:`datetime.time`"""
+    """Field to represent a :class:`datetime.time`
+
+    Without a ``format``, ISO 8601 times of day such as ``09:33:30`` or
+    ``093330`` are handled by a fast dedicated parser, and anything else by
+    ``dateutil.parser.parse``. Values are naive times: any UTC offset in
+    the input is dropped, as it is when taking the time from a
+    :class:`~datetime.datetime`.
+    """
+    _fromisoformat = getattr(datetime.time, 'fromisoformat', None)
 
     def to_python(self, data):
         # don't parse data that is already native
@@ -141,12 +464,18 @@ class TimeField(DateTimeField):
             return data.time()
         elif data is None:
             return data
-        elif self.format is None:
+        return self._parse_cached(data)
+
+    def _parse(self, data):
+        if self.format is None:
+            result = iso8601.parse_time(data)
+            if result is not None:
+                return result
             # If there are no time delimeters, dateutil misconstrues numbers
             # as the date rather than the time. To ensure it is interpretted
-            # as a time, place a parseable date in front of it.
+            # as a time, place a parseable date in front of it. Any date will
+            # do, since only the time is kept.
             # See TimeFieldTestCase.test_iso8601_without_delimiters
-            today = datetime.datetime.now().date().isoformat()
-            return parse_datetime(today + ' at ' + data).time()
+            return parse_datetime('2000-01-01 at ' + data).time()
         else:
             return datetime.datetime.strptime(data, self.format).time()
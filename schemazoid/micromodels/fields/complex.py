@@ -1,53 +1,290 @@
+import array
 import six
 from collections import MutableSequence
-from .basic import Field
+from .basic import (CONVERSION_ERRORS, Field, FieldError, FloatField,
+                    IntegerField, overrides)
+from .. import identity, tracking
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Array type codes for the item fields that can use array storage. Python 2
+# has no 'q', but its 'l' is 64 bits on most platforms.
+_INTEGER_TYPECODE = 'q' if 'q' in getattr(array, 'typecodes', '') else 'l'
+_TYPECODES = [(IntegerField, _INTEGER_TYPECODE), (FloatField, 'd')]
+_DTYPES = {_INTEGER_TYPECODE: 'int64', 'd': 'float64'}
 
 
 class TypedList(MutableSequence):
-    def __init__(self, field, *args):
+    """A list whose items are converted by a
+    :class:`~schemazoid.micromodels.Field` as they are added.
+
+    With ``lazy`` set, the initial ``items`` are not converted up front.
+    Each is converted the first time it is read, and the converted value
+    replaces it. Reading a slice converts only the items in the slice.
+    Comparing or printing the list converts every item. With ``converted``
+    set, the initial ``items`` are taken to be converted already.
+    """
+    # Changes to a list held by a model with the track_changes option are
+    # reported to the model, see the tracking module.
+    _watchable = True
+    _observers = None
+
+    def __init__(self, field, items=(), lazy=False, converted=False):
         super(TypedList, self).__init__()
         self._field = field
-        self._list = [self._field.to_python(item) for item in list(*args)]
+        if converted:
+            self._list = list(items)
+            self._pending = None
+        elif lazy:
+            self._list = list(items)
+            # A flag for each item, set while it is still unconverted. None
+            # when no item needs converting.
+            self._pending = bytearray(b'\x01') * len(self._list)
+        else:
+            to_python = field.to_python
+            self._list = [to_python(item) for item in items]
+            self._pending = None
+
+    def _convert(self, index):
+        value = self._field.to_python(self._list[index])
+        self._list[index] = value
+        self._pending[index] = 0
+        return value
+
+    def _convert_all(self):
+        pending = self._pending
+        if pending is not None:
+            for index, flag in enumerate(pending):
+                if flag:
+                    self._convert(index)
+            self._pending = None
 
     def __getitem__(self, index):
+        pending = self._pending
+        if pending is None:
+            return self._list[index]
+        if isinstance(index, slice):
+            for i in range(*index.indices(len(pending))):
+                if pending[i]:
+                    self._convert(i)
+            return self._list[index]
+        if pending[index]:
+            return self._convert(index)
         return self._list[index]
 
     def __setitem__(self, index, value):
-        self._list[index] = self._field.to_python(value)
+        observed = self._observers
+        if observed:
+            removed = self._items_at(index)
+        if isinstance(index, slice):
+            to_python = self._field.to_python
+            values = [to_python(item) for item in value]
+            self._list[index] = values
+            if self._pending is not None:
+                self._pending[index] = bytearray(len(values))
+        else:
+            values = [self._field.to_python(value)]
+            self._list[index] = values[0]
+            if self._pending is not None:
+                self._pending[index] = 0
+        if observed:
+            self._changed(removed, values)
 
     def __delitem__(self, index):
+        observed = self._observers
+        if observed:
+            removed = self._items_at(index)
         del self._list[index]
+        if self._pending is not None:
+            del self._pending[index]
+        if observed:
+            self._changed(removed)
 
     def __len__(self):
         return len(self._list)
 
+    def __iter__(self):
+        if self._pending is None:
+            return iter(self._list)
+        return self._iter_pending()
+
+    def _iter_pending(self):
+        index = 0
+        while index < len(self._list):
+            yield self[index]
+            index += 1
+
     def insert(self, index, value):
-        self._list.insert(index, self._field.to_python(value))
+        value = self._field.to_python(value)
+        self._list.insert(index, value)
+        if self._pending is not None:
+            self._pending.insert(index, 0)
+        if self._observers:
+            self._changed(added=[value])
+
+    def _items_at(self, index):
+        """Return a list of the stored items at an index or slice."""
+        if isinstance(index, slice):
+            return list(self._list[index])
+        return [self._list[index]]
+
+    def _start_watching(self):
+        # Called when the list gets its first observer, so that changes to
+        # the models in it are reported too.
+        for item in self._list:
+            if tracking.is_watchable(item):
+                tracking.watch(item, self, None)
+
+    def _changed(self, removed=(), added=()):
+        """Report a change to the observers of the list, after ``removed``
+        items were replaced by or ``added`` items were added.
+        """
+        for item in removed:
+            if tracking.is_watchable(item):
+                tracking.unwatch(item, self, None)
+        for item in added:
+            if tracking.is_watchable(item):
+                tracking.watch(item, self, None)
+        tracking.changed(self)
+
+    def _child_changed(self, key):
+        tracking.changed(self)
+
+    def __getstate__(self):
+        # Observers are not pickled; the unpickled list's owner watches it
+        # again.
+        state = self.__dict__.copy()
+        state.pop('_observers', None)
+        return state
+
+    def _as_list(self):
+        """Return the items as a list, converting them all first."""
+        self._convert_all()
+        return self._list
 
     # not abstract, but comparisons fail if not done
     def __eq__(self, *args):
-        return self._list.__eq__(*args)
+        return self._as_list().__eq__(*args)
 
     def __ne__(self, *args):
-        return self._list.__ne__(*args)
+        return self._as_list().__ne__(*args)
 
     def __le__(self, *args):
-        return self._list.__le__(*args)
+        return self._as_list().__le__(*args)
 
     def __ge__(self, *args):
-        return self._list.__ge__(*args)
+        return self._as_list().__ge__(*args)
 
     def __lt__(self, *args):
-        return self._list.__lt__(*args)
+        return self._as_list().__lt__(*args)
 
     def __gt__(self, *args):
-        return self._list.__gt__(*args)
+        return self._as_list().__gt__(*args)
 
     def __repr__(self, *args):
-        return self._list.__repr__(*args)
+        return self._as_list().__repr__(*args)
 
     def __str__(self, *args):
-        return self._list.__str__(*args)
+        return self._as_list().__str__(*args)
+
+
+class ArrayList(TypedList):
+    """A :class:`TypedList` of numbers, stored in a compact
+    :class:`array.array` with the given type code rather than as a list of
+    Python objects.
+
+    Reading items returns ordinary Python numbers. Numbers too big for the
+    array type raise :exc:`OverflowError`.
+    """
+    def __init__(self, field, items=(), typecode='d'):
+        # Skip TypedList.__init__, which would build a list.
+        super(TypedList, self).__init__()
+        self._field = field
+        self._pending = None
+        to_python = field.to_python
+        self._list = self._make_array(typecode,
+                                      [to_python(item) for item in items])
+
+    def _make_array(self, typecode, values):
+        return array.array(typecode, values)
+
+    @property
+    def array(self):
+        """The array holding the items."""
+        return self._list
+
+    def tolist(self):
+        """Return the items as a list of Python numbers."""
+        return self._list.tolist()
+
+    _as_list = tolist
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._list[index].tolist()
+        return self._list[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            # Assign through a list, which handles every kind of slice, and
+            # rebuild the storage from it.
+            to_python = self._field.to_python
+            values = self.tolist()
+            values[index] = [to_python(item) for item in value]
+            self._list = self._make_array(self._typecode(), values)
+        else:
+            self._list[index] = self._field.to_python(value)
+        if self._observers:
+            tracking.changed(self)
+
+    def __iter__(self):
+        return iter(self._list)
+
+    def _typecode(self):
+        return self._list.typecode
+
+
+class NumpyList(ArrayList):
+    """An :class:`ArrayList` storing its items in a NumPy array, which
+    requires NumPy to be installed.
+
+    Inserting or deleting items copies the whole array, so this storage is
+    best for lists that are mostly read.
+    """
+    def _make_array(self, typecode, values):
+        return numpy.array(values, dtype=_DTYPES[typecode])
+
+    def _typecode(self):
+        for typecode, dtype in _DTYPES.items():
+            if self._list.dtype == dtype:
+                return typecode
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._list[index].tolist()
+        return self._list[index].item()
+
+    def __delitem__(self, index):
+        indexes = range(len(self._list))[index]
+        self._list = numpy.delete(self._list, indexes)
+        if self._observers:
+            tracking.changed(self)
+
+    def insert(self, index, value):
+        # Clamp the index as list.insert does.
+        length = len(self._list)
+        if index < 0:
+            index = max(0, length + index)
+        self._list = numpy.insert(self._list, min(index, length),
+                                  self._field.to_python(value))
+        if self._observers:
+            tracking.changed(self)
+
+    def __iter__(self):
+        return iter(self._list.tolist())
 
 
 class ListField(Field):
@@ -93,33 +330,178 @@ class ListField(Field):
 
     In the above example, the DateField is used both to convert and to
     serialize the data items in the list.
+
+    Pass ``lazy=True`` to convert the items of the list only as they are
+    read, rather than all at once when the field is set. This saves work
+    on long lists of which only a few items are used. Errors in an item are
+    then raised when the item is read.
+
+    Long lists of numbers take much less memory stored in an array than as
+    Python objects. Pass ``storage='array'`` with an ``of_type`` of
+    :class:`~schemazoid.micromodels.IntegerField` or
+    :class:`~schemazoid.micromodels.FloatField` to store the items in a
+    64 bit :class:`array.array`, or ``storage='numpy'`` for a NumPy array,
+    which raises ``ImportError`` if NumPy is not installed. The list still
+    behaves as a mutable sequence of Python numbers, and its ``array``
+    attribute gives the underlying array.
     """
-    def __init__(self, of_type=None, **kwargs):
+    def __init__(self, of_type=None, lazy=False, storage=None, **kwargs):
         super(ListField, self).__init__(**kwargs)
         self._itemfield = Field()
         if isinstance(of_type, Field):
             self._itemfield = of_type
-
-    def to_python(self, data):
+        # Whether items need converting to serialize them.
+        self._serialize_items = overrides(self._itemfield, 'to_serial')
+        self._lazy = lazy
+        self._storage = storage
+        if storage is not None:
+            self._typecode = self._storage_typecode(storage)
+
+    def _storage_typecode(self, storage):
+        if storage not in ('array', 'numpy'):
+            raise ValueError("storage must be 'array' or 'numpy'")
+        if storage == 'numpy' and numpy is None:
+            raise ImportError("numpy storage requires NumPy")
+        if self._lazy:
+            raise ValueError("lazy lists cannot use %s storage" % storage)
+        for field_class, typecode in _TYPECODES:
+            if isinstance(self._itemfield, field_class):
+                return typecode
+        raise ValueError("%s storage requires IntegerField or FloatField "
+                         "items" % storage)
+
+    def _items(self, data):
+        """Return the iterable of items ``data`` gives the list."""
         # Dictionaries and strings are both iterable, but should not be
         # treated as arrays for this purpose.
         if isinstance(data, dict):
-            result = [data]
+            return [data]
         elif isinstance(data, six.string_types):
-            result = [data]
+            return [data]
         elif hasattr(data, '__iter__'):
-            result = list(data)
+            # TypedList makes its own copy.
+            return data
         elif data is None:
-            result = []
-        else:
-            result = [data]
+            return []
+        return [data]
 
-        if self._itemfield:
-            return TypedList(self._itemfield, result)
-        return result
+    def to_python(self, data):
+        result = self._items(data)
+        if self._storage == 'array':
+            return ArrayList(self._itemfield, result, self._typecode)
+        elif self._storage == 'numpy':
+            return NumpyList(self._itemfield, result, self._typecode)
+        return TypedList(self._itemfield, result, lazy=self._lazy)
 
     def to_serial(self, items):
-        return [self._itemfield.to_serial(item) for item in items]
+        if self._serialize_items:
+            to_serial = self._itemfield.to_serial
+            return [to_serial(item) for item in items]
+        # The items serialize as themselves.
+        if isinstance(items, ArrayList):
+            return items.tolist()
+        return list(items)
+
+    def check_raw(self, data, path, errors, fail_fast=False):
+        if self._storage is not None:
+            # Numbers may also be too big for the array.
+            try:
+                self.to_python(data)
+            except CONVERSION_ERRORS as e:
+                errors.append(FieldError(path, data, e))
+            return
+        itemfield = self._itemfield
+        if overrides(itemfield, 'check_raw'):
+            check = itemfield.check_raw
+            for index, item in enumerate(self._items(data)):
+                check(item, path + (index,), errors, fail_fast)
+                if fail_fast and errors:
+                    return
+        elif overrides(itemfield, 'to_python'):
+            # Inlines Field.check_raw.
+            to_python = itemfield.to_python
+            for index, item in enumerate(self._items(data)):
+                try:
+                    to_python(item)
+                except CONVERSION_ERRORS as e:
+                    errors.append(FieldError(path + (index,), item, e))
+                    if fail_fast:
+                        return
+
+    def tracks_changes(self):
+        # Items of a lazy list may be converted to models after the list is
+        # watched, which would then go unwatched.
+        return not self._lazy and self._itemfield.tracks_changes()
+
+    def diff(self, old, new):
+        if old is new:
+            return {}
+        itemfield = self._itemfield
+        common = min(len(old), len(new))
+        items = {}
+        for index in range(common):
+            patch = itemfield.diff(old[index], new[index])
+            if patch:
+                items[index] = patch
+        if len(items) > len(new) // 2:
+            # Cheaper to send the whole list, as when items were inserted
+            # or removed near the start.
+            return super(ListField, self).diff(old, new)
+        patch = {}
+        if items:
+            patch['items'] = items
+        if len(new) < len(old):
+            patch['length'] = len(new)
+        elif len(new) > len(old):
+            patch['append'] = [itemfield.to_serial(item)
+                               for item in new[common:]]
+        return patch
+
+    def apply_patch(self, value, patch):
+        if 'value' in patch:
+            return super(ListField, self).apply_patch(value, patch)
+        if value is None:
+            value = self.to_python(None)
+        itemfield = self._itemfield
+        for index, item_patch in six.iteritems(patch.get('items', {})):
+            # Keys are strings if the patch has been through JSON.
+            index = int(index)
+            if index >= len(value):
+                raise ValueError("Cannot patch item %d of a list of %d" %
+                                 (index, len(value)))
+            item = value[index]
+            patched = itemfield.apply_patch(item, item_patch)
+            if patched is not item:
+                value[index] = patched
+        if 'length' in patch:
+            del value[patch['length']:]
+        value.extend(patch.get('append', ()))
+        return value
+
+    def projection(self, serial, include, exclude):
+        project = self._itemfield.projection(serial, include, exclude)
+        return lambda items: [project(item) for item in items]
+
+    def trusted_converter(self, native):
+        if self._lazy or self._storage is not None:
+            # Converting these is cheap already.
+            return self.to_python
+        itemfield = self._itemfield
+        convert = itemfield.trusted_converter(native)
+
+        def construct(data):
+            if data is None:
+                return TypedList(itemfield)
+            if convert is not None:
+                data = [convert(item) for item in data]
+            return TypedList(itemfield, data, converted=True)
+        return construct
+
+    def is_serial(self, data):
+        if type(data) is not list:
+            return False
+        is_serial = self._itemfield.is_serial
+        return all(is_serial(item) for item in data)
 
 
 class DictField(Field):
@@ -139,6 +521,44 @@ class DictField(Field):
             return {}
         return dict(data)
 
+    def is_serial(self, data):
+        return type(data) is dict
+
+    def diff(self, old, new):
+        if old is new:
+            return {}
+        if not isinstance(old, dict) or not isinstance(new, dict):
+            return super(DictField, self).diff(old, new)
+        keys = {}
+        for key, value in six.iteritems(new):
+            if key not in old:
+                keys[key] = {'value': value}
+                continue
+            patch = self.diff(old[key], value)
+            if patch:
+                keys[key] = patch
+        for key in old:
+            if key not in new:
+                keys[key] = {'unset': True}
+        return {'keys': keys} if keys else {}
+
+    def apply_patch(self, value, patch):
+        if 'keys' not in patch:
+            return super(DictField, self).apply_patch(value, patch)
+        if value is None:
+            value = {}
+        for key, key_patch in six.iteritems(patch['keys']):
+            if key_patch.get('unset'):
+                value.pop(key, None)
+            elif 'keys' in key_patch:
+                nested = value.get(key)
+                if not isinstance(nested, dict):
+                    nested = {}
+                value[key] = self.apply_patch(nested, key_patch)
+            else:
+                value[key] = key_patch['value']
+        return value
+
 
 class ModelField(Field):
     """Field containing a model instance.
@@ -175,16 +595,192 @@ class ModelField(Field):
         >>> m.second_item.nested_item
         u'Some nested value'
 
+    Pass ``deferred=True`` to put off building nested models from
+    dictionaries until they are used. The field then holds a
+    :class:`~schemazoid.micromodels.fields.complex.DeferredModel` standing
+    in for the nested model, which builds it the first time one of its
+    attributes is read or set. A nested model that is never used costs
+    almost nothing, and serializes as the original dictionary, unchanged.
+    That dictionary is kept and returned as it is, not copied, so it must
+    not be modified while the nested model is unbuilt, nor once serialized.
+    Any conversion errors are raised when the nested model is built, rather
+    than when the field is set.
+
+    Where many records embed the same object, pass ``identity`` to name the
+    key that identifies it, such as ``'@id'`` or ``'url'``. Dictionaries
+    with the same value for that key then give the same model, built from
+    the first of them, for as long as a scope of the
+    :mod:`~schemazoid.micromodels.identity` module is in effect. Pass an
+    :class:`~schemazoid.micromodels.LRUCache` as ``identity_map`` to share
+    models through it at all times instead. Since the models are shared,
+    changing one changes it in every record.
     """
-    def __init__(self, wrapped_class, **kwargs):
+    def __init__(self, wrapped_class, deferred=False, identity=None,
+                 identity_map=None, **kwargs):
         self._wrapped_class = wrapped_class
+        self._deferred = deferred
+        self._identity = identity
+        self._identity_map = identity_map
         super(ModelField, self).__init__(**kwargs)
 
     def to_python(self, data):
         if isinstance(data, self._wrapped_class) or data is None:
             return data
+        elif self._identity is not None:
+            return self._shared(data, self._build)
+        elif self._deferred and isinstance(data, dict):
+            return DeferredModel(self._wrapped_class, data)
         else:
             return self._wrapped_class(data)
 
+    def _build(self, data):
+        if self._deferred and isinstance(data, dict):
+            return DeferredModel(self._wrapped_class, data)
+        return self._wrapped_class(data)
+
+    def _shared(self, data, build):
+        """Return the model for ``data`` from the identity map, or the
+        result of ``build(data)``, which is added to the map.
+        """
+        identity_map = self._identity_map
+        if identity_map is None:
+            identity_map = identity.current()
+        key = data.get(self._identity) if isinstance(data, dict) else None
+        if identity_map is None or key is None:
+            return build(data)
+        try:
+            key = (self._wrapped_class, key)
+            model = identity_map.get(key)
+        except TypeError:
+            # An identity that can't be a dictionary key.
+            return build(data)
+        if model is None:
+            model = build(data)
+            identity_map.put(key, model)
+        return model
+
     def to_serial(self, model_instance):
         return model_instance.to_serial()
+
+    def diff(self, old, new):
+        same_class = old.__class__ is new.__class__
+        if old is None or new is None or not same_class:
+            return super(ModelField, self).diff(old, new)
+        patch = old.diff(new)
+        return {'fields': patch} if patch else {}
+
+    def apply_patch(self, value, patch):
+        if 'fields' not in patch:
+            return super(ModelField, self).apply_patch(value, patch)
+        if value is None:
+            value = self._wrapped_class()
+        value.apply_patch(patch['fields'])
+        return value
+
+    def check_raw(self, data, path, errors, fail_fast=False):
+        if data is not None and not isinstance(data, self._wrapped_class):
+            # Deferred or not, the data would make a model.
+            self._wrapped_class.check_raw(data, path, errors, fail_fast)
+
+    def tracks_changes(self):
+        # A DeferredModel only becomes watchable once it is built, and a
+        # model only hears about changes to all of its fields if every one
+        # of them tracks changes.
+        if self._deferred:
+            return False
+        wrapped = self._wrapped_class
+        return all(getattr(wrapped, option, False)
+                   for option in ('_track_changes', '_fully_tracked'))
+
+    def projection(self, serial, include, exclude):
+        # Compile the projection of the model class now, so that paths to
+        # fields it doesn't have are reported even if no model turns up.
+        self._wrapped_class._projection(serial, include, exclude)
+
+        def project(model_instance):
+            if model_instance is None:
+                return None
+            return model_instance.to_dict(serial, include, exclude)
+        return project
+
+    def trusted_converter(self, native):
+        if self._deferred and not native:
+            # The model is built later, from the data as it is.
+            return self.to_python
+        wrapped = self._wrapped_class
+
+        def build(data):
+            return wrapped.construct(data, native=native)
+
+        def construct(data):
+            if data is None:
+                return None
+            if isinstance(data, wrapped):
+                # The model belongs to the data, so copy it, and the models
+                # nested in it.
+                return data.__class__.construct(data.to_dict(), native=True)
+            if self._identity is not None:
+                return self._shared(data, build)
+            return build(data)
+        return construct
+
+
+class DeferredModel(object):
+    """Stands in for a model that has not been built yet.
+
+    Used by a :class:`~schemazoid.micromodels.ModelField` with the
+    ``deferred`` option. The model is built from the dictionary of data the
+    first time any of its attributes are read or set, and from then on the
+    DeferredModel passes everything through to it. Its ``__class__`` is the
+    model class, so :func:`isinstance` treats it as a model.
+    """
+    __slots__ = ('_deferred_class', '_deferred_data', '_deferred_model')
+
+    def __init__(self, wrapped_class, data):
+        object.__setattr__(self, '_deferred_class', wrapped_class)
+        object.__setattr__(self, '_deferred_data', data)
+        object.__setattr__(self, '_deferred_model', None)
+
+    @property
+    def __class__(self):
+        return self._deferred_class
+
+    def _deferred_build(self):
+        model = self._deferred_model
+        if model is None:
+            model = self._deferred_class(self._deferred_data)
+            object.__setattr__(self, '_deferred_model', model)
+            object.__setattr__(self, '_deferred_data', None)
+        return model
+
+    def __getattr__(self, name):
+        return getattr(self._deferred_build(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._deferred_build(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._deferred_build(), name)
+
+    def __reduce__(self):
+        # A built model is pickled as itself. Otherwise the stand-in is
+        # pickled, and the model is still built on first use.
+        model = self._deferred_model
+        if model is not None:
+            return model.__reduce_ex__(2)
+        return (DeferredModel, (self._deferred_class, self._deferred_data))
+
+    def __repr__(self):
+        if self._deferred_model is None:
+            return '<deferred %s>' % self._deferred_class.__name__
+        return repr(self._deferred_model)
+
+    def to_serial(self, include=None, exclude=None):
+        """Returns the serialized model, or the original dictionary itself
+        if the model has not been built and no fields are selected. It is
+        shared with the model's data, so it must not be modified.
+        """
+        if include is None and exclude is None:
+            if self._deferred_model is None:
+                return self._deferred_data
+        return self._deferred_build().to_serial(include, exclude)
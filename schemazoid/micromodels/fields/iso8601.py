@@ -0,0 +1,105 @@
+"""
+Fast parsing of the common ISO 8601 date and time formats.
+
+dateutil's parser understands almost any date format, but it is slow. The
+functions here understand only the strict ISO 8601 shapes that make up
+nearly all real data, and return None for anything else so that the caller
+can fall back to dateutil.
+"""
+import datetime
+import re
+import six
+
+from dateutil.tz import tzoffset, tzutc
+
+UTC = tzutc()
+
+# Date, in extended (2010-07-13) or basic (20100713) format, optionally
+# followed by a time of day in either format, with optional seconds,
+# fraction and UTC offset.
+_DATETIME_RE = re.compile(
+    r'(\d{4})(-?)(\d{2})\2(\d{2})'
+    r'(?:[T ](\d{2})(:?)(\d{2})(?:\6(\d{2})(?:[.,](\d+))?)?'
+    r'(Z|[+-]\d{2}(?::?\d{2})?)?)?\Z')
+
+# Time of day, in extended (09:33:30) or basic (093330) format, with
+# optional seconds, fraction and UTC offset.
+_TIME_RE = re.compile(
+    r'T?(\d{2})(:?)(\d{2})(?:\2(\d{2})(?:[.,](\d+))?)?'
+    r'(Z|[+-]\d{2}(?::?\d{2})?)?\Z')
+
+# tzinfo instances by offset string, such as '-05:00'.
+_offsets = {'Z': UTC}
+
+
+def parse_offset(offset):
+    """Return a tzinfo for an ISO 8601 UTC offset string, such as ``Z``,
+    ``+05``, ``-0530`` or ``-05:30``.
+    """
+    tzinfo = _offsets.get(offset)
+    if tzinfo is None:
+        digits = offset[1:].replace(':', '')
+        seconds = int(digits[:2]) * 3600 + int(digits[2:] or 0) * 60
+        if offset[0] == '-':
+            seconds = -seconds
+        tzinfo = UTC if seconds == 0 else tzoffset(None, seconds)
+        _offsets[offset] = tzinfo
+    return tzinfo
+
+
+def parse_microseconds(fraction):
+    """Return the microseconds in the digits of a decimal fraction of a
+    second. As with dateutil, digits beyond the sixth are ignored.
+    """
+    return int(fraction[:6].ljust(6, '0'))
+
+
+def parse_datetime(value):
+    """Return the :class:`~datetime.datetime` for an ISO 8601 date or date
+    and time string, or None if ``value`` is not in a format handled here
+    (or is not a valid date).
+
+    The results match those of ``dateutil.parser.parse``: a date alone
+    gives midnight, times without an offset give naive datetimes, and UTC
+    offsets give dateutil tzinfo instances.
+    """
+    if not isinstance(value, six.string_types):
+        return None
+    match = _DATETIME_RE.match(value)
+    if match is None:
+        return None
+    (year, _, month, day, hour, _, minute, second, fraction,
+     offset) = match.groups()
+    try:
+        return datetime.datetime(
+            int(year), int(month), int(day),
+            int(hour) if hour else 0,
+            int(minute) if minute else 0,
+            int(second) if second else 0,
+            parse_microseconds(fraction) if fraction else 0,
+            parse_offset(offset) if offset else None)
+    except ValueError:
+        return None
+
+
+def parse_time(value):
+    """Return the :class:`~datetime.time` for an ISO 8601 time of day
+    string, such as ``09:33``, ``09:33:30.25-05:00`` or ``093330Z``, or None
+    if ``value`` is not in a format handled here (or is not a valid time).
+
+    A UTC offset is accepted but, as with a time taken from a datetime, the
+    result is the naive wall-clock time.
+    """
+    if not isinstance(value, six.string_types):
+        return None
+    match = _TIME_RE.match(value)
+    if match is None:
+        return None
+    hour, _, minute, second, fraction, _ = match.groups()
+    try:
+        return datetime.time(
+            int(hour), int(minute),
+            int(second) if second else 0,
+            parse_microseconds(fraction) if fraction else 0)
+    except ValueError:
+        return None
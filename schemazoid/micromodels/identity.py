@@ -0,0 +1,56 @@
+"""
+Identity maps, which let a :class:`~schemazoid.micromodels.ModelField` with
+the ``identity`` option share one nested model between all the records that
+embed the same object.
+
+Sharing only happens inside a scope, so that models built at other times
+stay independent::
+
+    >>> from schemazoid import micromodels as m
+    >>> from schemazoid.micromodels import identity
+    >>> class Publisher(m.Model):
+    ...     url = m.CharField()
+    >>> class Article(m.Model):
+    ...     publisher = m.ModelField(Publisher, identity='url')
+    >>> data = {'publisher': {'url': 'http://example.com/'}}
+    >>> with identity.scope() as identity_map:
+    ...     first, second = Article(data), Article(data)
+    >>> first.publisher is second.publisher
+    True
+    >>> identity_map.hit_rate()
+    0.5
+
+Each scope has its own :class:`~schemazoid.micromodels.LRUCache`, which
+bounds the number of models it keeps alive. Scopes belong to the thread
+that entered them.
+"""
+import contextlib
+import threading
+
+from .cache import LRUCache
+
+_local = threading.local()
+
+
+def current():
+    """Return the identity map of the innermost scope entered by this
+    thread, or None outside any scope.
+    """
+    return getattr(_local, 'identity_map', None)
+
+
+@contextlib.contextmanager
+def scope(maxsize=10000, identity_map=None):
+    """A context manager that shares nested models by identity for the
+    duration of the ``with`` block, in ``identity_map``, or in a new
+    :class:`~schemazoid.micromodels.LRUCache` of ``maxsize`` models, which
+    it returns.
+    """
+    if identity_map is None:
+        identity_map = LRUCache(maxsize)
+    previous = current()
+    _local.identity_map = identity_map
+    try:
+        yield identity_map
+    finally:
+        _local.identity_map = previous
@@ -0,0 +1,153 @@
+"""
+Streaming models in and out of `JSON Lines <http://jsonlines.org/>`_ files,
+one JSON object per line.
+
+These functions back the :meth:`~schemazoid.micromodels.Model.iter_jsonl`
+and :meth:`~schemazoid.micromodels.Model.dump_jsonl` class methods, which
+are the usual way to call them.
+"""
+import collections
+import io
+import json
+import six
+
+# Bytes (or characters) to read from or write to a file at a time.
+CHUNK_SIZE = 1 << 16
+
+# Shared by all writes. JSONEncoder keeps no state between calls to encode.
+_encoder = json.JSONEncoder(separators=(',', ':'))
+
+LineError = collections.namedtuple('LineError', 'line_number line error')
+
+
+def iter_lines(fileobj, chunk_size=CHUNK_SIZE):
+    """Yield ``(line_number, line)`` for each non-blank line of ``fileobj``.
+
+    The file is read ``chunk_size`` at a time, rather than a line at a time,
+    and may be opened in either text or binary mode. Line numbers start at 1.
+    """
+    pending = []
+    newline = None
+    line_number = 0
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        if newline is None:
+            newline = b'\n' if isinstance(chunk, six.binary_type) else u'\n'
+        lines = chunk.split(newline)
+        if len(lines) == 1:
+            # No line ends in this chunk, hold on to it for the next.
+            pending.append(chunk)
+            continue
+        if pending:
+            pending.append(lines[0])
+            lines[0] = chunk[:0].join(pending)
+        pending = [lines.pop()]
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+
+    if pending:
+        line = pending[0][:0].join(pending)
+        if line.strip():
+            yield line_number + 1, line
+
+
+def _parse(line):
+    if not isinstance(line, six.string_types):
+        line = line.decode('utf-8')
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise TypeError("Expected a JSON object, got %s" %
+                        type(record).__name__)
+    return record
+
+
+def _build(cls, batch, skip, errors):
+    """Return the models built from a batch of parsed lines.
+
+    The whole batch goes through ``from_records``. If that fails and bad
+    lines are being skipped, the batch is built again a record at a time to
+    find the lines at fault.
+    """
+    try:
+        return cls.from_records(record for _, _, record in batch)
+    except (TypeError, ValueError):
+        if not skip:
+            raise
+
+    models = []
+    for line_number, line, record in batch:
+        try:
+            models.append(cls(record))
+        except (TypeError, ValueError) as e:
+            if errors is not None:
+                errors.append(LineError(line_number, line, e))
+    return models
+
+
+def iter_models(cls, fileobj, batch_size=1000, skip_errors=False,
+                errors=None, chunk_size=CHUNK_SIZE):
+    """Yield an instance of the Model class ``cls`` for each line of
+    ``fileobj``. See :meth:`~schemazoid.micromodels.Model.iter_jsonl`.
+    """
+    skip = skip_errors or errors is not None
+    batch = []
+    for line_number, line in iter_lines(fileobj, chunk_size):
+        try:
+            record = _parse(line)
+        except (TypeError, ValueError) as e:
+            if not skip:
+                raise
+            if errors is not None:
+                errors.append(LineError(line_number, line, e))
+            continue
+        batch.append((line_number, line, record))
+        if len(batch) >= batch_size:
+            for model in _build(cls, batch, skip, errors):
+                yield model
+            batch = []
+
+    if batch:
+        for model in _build(cls, batch, skip, errors):
+            yield model
+
+
+def _is_binary(fileobj):
+    if isinstance(fileobj, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+    return 'b' in getattr(fileobj, 'mode', '')
+
+
+def dump_models(models, fileobj, buffer_size=CHUNK_SIZE):
+    """Write each model in ``models`` to ``fileobj`` as a line of JSON, and
+    return the number written. See
+    :meth:`~schemazoid.micromodels.Model.dump_jsonl`.
+    """
+    encode = _encoder.encode
+    binary = _is_binary(fileobj)
+    buffered = []
+    size = 0
+    count = 0
+    for model in models:
+        line = encode(model.to_serial())
+        buffered.append(line)
+        size += len(line) + 1
+        count += 1
+        if size >= buffer_size:
+            _write(fileobj, buffered, binary)
+            buffered = []
+            size = 0
+    if buffered:
+        _write(fileobj, buffered, binary)
+    return count
+
+
+def _write(fileobj, lines, binary):
+    lines.append(u'')
+    text = u'\n'.join(lines)
+    if binary:
+        text = text.encode('utf-8')
+    fileobj.write(text)
@@ -1,6 +1,27 @@
+import collections
 import six
 
+from . import jsonl, parallel, profiling, tracking
 from .fields import Field
+from .fields.basic import CONVERSION_ERRORS, FieldError, overrides
+
+
+FieldCacheInfo = collections.namedtuple('FieldCacheInfo',
+                                        'hits misses version')
+
+# Marks a missing value where None would be ambiguous.
+_MISSING = object()
+
+# Names of the per-instance state Model keeps in attributes.
+_STATE = frozenset(['_instance_fields', '_raw', '_serial_cache',
+                    '_observers'])
+
+# The class options of Model, each kept in an attribute of the same name
+# with a leading underscore once the class is created.
+_OPTIONS = ('compact', 'lazy', 'track_changes')
+
+# The most projections of to_dict compiled for a class to keep at once.
+_PROJECTION_CACHE_SIZE = 256
 
 
 class MetaModel(type):
@@ -8,12 +29,26 @@ class MetaModel(type):
 
     The main function of this metaclass
     is to move all of fields into the ``_clsfields`` variable on the class.
+    For classes with the ``compact`` option, it also declares ``__slots__``
+    for the fields.
     """
     def __new__(cls, name, bases, attrs):
         fields = {}
+        added = {}
         for base in bases[::-1]:
             if hasattr(base, '_clsfields'):
                 fields.update(base._clsfields)
+                added.update(base._added_fields)
+
+        options = dict((option, _option(option, bases, attrs))
+                       for option in _OPTIONS)
+        if options['compact'] and '__slots__' not in attrs:
+            state = ['_instance_fields']
+            if options['lazy']:
+                state.append('_raw')
+            if options['track_changes']:
+                state.extend(['_serial_cache', '_observers'])
+            attrs = _slotted_attrs(bases, attrs, fields, state)
 
         # Somehow if you iterate over attrs before creating the class, the
         # class docstring gets lost. So we create the class first and
@@ -30,8 +65,492 @@ class MetaModel(type):
             delattr(newclass, name)
 
         newclass._clsfields = fields
+        # The options, read from these rather than the public attributes,
+        # which a field of the same name would hide on instances.
+        for option, value in six.iteritems(options):
+            setattr(newclass, '_' + option, value)
+        # The fields given to add_class_field, including those inherited
+        # from bases. Pickled instances carry them along, since a class in
+        # another process only has the fields it was defined with.
+        newclass._added_fields = added
+        newclass._slot_names = _slot_names(newclass)
+        if newclass._lazy and not hasattr(newclass, '__getattr__'):
+            newclass.__getattr__ = _lazy_getattr
+        newclass._watchable = bool(newclass._track_changes)
+        newclass._custom_setattr = _overrides_setattr(newclass)
+        # Bumped by add_class_field, so that merged field maps cached on
+        # instances can tell when they have gone stale.
+        newclass._fields_version = 0
+        newclass._field_cache_stats = {'hits': 0, 'misses': 0}
+        newclass._compile()
         return newclass
 
+    def _compile(cls):
+        """Build the methods specialized for the current fields of the class.
+
+        Called when the class is created, and again whenever
+        :meth:`~schemazoid.micromodels.Model.add_class_field` changes it.
+        """
+        fields = cls._clsfields
+        # The fields whose values can only change in ways the model hears
+        # about, which makes it safe to cache their serialized values.
+        cls._cached_fields = frozenset(
+            name for name, field in six.iteritems(fields)
+            if field.tracks_changes())
+        cls._fully_tracked = len(cls._cached_fields) == len(fields)
+        # What get_all_fields returns for instances without instance fields.
+        cls._all_fields = _FieldMap(fields)
+        # Each field's to_python, looked up once, and wrapped to record its
+        # calls while the profiling module is enabled.
+        cls._to_python = dict(
+            (name, profiling.converter(cls, name, 'to_python',
+                                       field.to_python))
+            for name, field in six.iteritems(fields))
+        cls._compiled_update = _compile_update(cls._to_python,
+                                               cls._track_changes)
+        # For validate_raw, the check_raw of each field that overrides it,
+        # and the to_python of the other fields that can find errors.
+        cls._raw_checks = dict(
+            (name, field.check_raw) for name, field in six.iteritems(fields)
+            if overrides(field, 'check_raw'))
+        cls._raw_converters = dict(
+            (name, field.to_python) for name, field in six.iteritems(fields)
+            if name not in cls._raw_checks and overrides(field, 'to_python'))
+        cls._compiled_to_dict = _compile_plan(_plan(fields, False, owner=cls))
+        serial_plan = _plan(fields, True, owner=cls)
+        if cls._track_changes:
+            cls._compiled_to_serial = _compile_cached_plan(
+                serial_plan, cls._cached_fields, cls._fields_version)
+        else:
+            cls._compiled_to_serial = _compile_plan(serial_plan)
+        # Projections and constructors compiled for the old fields are no
+        # use with the new.
+        cls._projections = {}
+        cls._constructors = {}
+
+    def _add_missing_fields(cls, added):
+        """Add the fields in ``added``, which were given to
+        :meth:`~schemazoid.micromodels.Model.add_class_field` in another
+        process, unless the class has already been given fields by those
+        names.
+        """
+        for name, field in six.iteritems(added):
+            if name not in cls._added_fields:
+                cls.add_class_field(name, field)
+
+
+def _overrides_setattr(cls):
+    """Return True if the model class ``cls`` has a ``__setattr__`` other
+    than the one defined by :class:`Model`, the root of its model bases.
+    """
+    models = [klass for klass in cls.__mro__ if isinstance(klass, MetaModel)]
+    for klass in cls.__mro__:
+        if '__setattr__' in vars(klass):
+            return klass is not models[-1]
+    return False
+
+
+def _compile_update(converters, tracked=False):
+    """Return an update function specialized for the given fields, which
+    are given as a dictionary of their ``to_python`` functions by name.
+
+    Converted values are stored directly rather than passing through
+    ``Model.__setattr__``, or through :func:`_set_tracked` if ``tracked`` is
+    True. The returned function takes the model instance, a dictionary of
+    data, and a dictionary of keyword overrides.
+    """
+    get_converter = converters.get
+    setter = _set_tracked if tracked else object.__setattr__
+
+    def update(self, data, kwargs):
+        if kwargs:
+            data = dict(data, **kwargs) if data else kwargs
+        for name, value in six.iteritems(data):
+            to_python = get_converter(name)
+            if to_python is not None:
+                setter(self, name, to_python(value))
+
+    return update
+
+
+def _allocator(cls):
+    """Return the function that creates an instance of the model class
+    ``cls`` without initializing it, when called with ``cls``. That is
+    ``object.__new__`` unless the class or Model.__new__ has work to do.
+    """
+    if cls is not Model and cls.__new__ is Model.__new__:
+        return object.__new__
+    return cls.__new__
+
+
+def _compile_construct(cls, native):
+    """Return a function that builds an instance of the model class ``cls``
+    from a dictionary of trusted data, see
+    :meth:`~schemazoid.micromodels.Model.construct`.
+
+    Values of fields whose ``trusted_converter`` is None are stored as they
+    are. The rest are converted, and stored through :func:`_set_tracked`
+    on classes with the ``track_changes`` option, so that nested models
+    and lists are watched.
+    """
+    copied = set()
+    converters = {}
+    for name, field in six.iteritems(cls._clsfields):
+        convert = field.trusted_converter(native)
+        if convert is None:
+            copied.add(name)
+        else:
+            converters[name] = profiling.converter(cls, name, 'construct',
+                                                   convert)
+    copied = frozenset(copied)
+    get_converter = converters.get
+    state = ['_instance_fields']
+    if cls._lazy:
+        state.append('_raw')
+    if cls._track_changes:
+        state.extend(['_serial_cache', '_observers'])
+    new = _allocator(cls)
+    setter = object.__setattr__
+    converted_setter = _set_tracked if cls._track_changes else setter
+
+    def construct(data):
+        instance = new(cls)
+        for name in state:
+            setter(instance, name, None)
+        for name, value in six.iteritems(data):
+            if name in copied:
+                setter(instance, name, value)
+            else:
+                convert = get_converter(name)
+                if convert is not None:
+                    converted_setter(instance, name, convert(value))
+        return instance
+
+    return construct
+
+
+def _set_tracked(model, name, value):
+    """Set the field ``name`` of a model with the ``track_changes`` option
+    to a converted ``value``, or delete it if ``value`` is ``_MISSING``, and
+    mark the field as changed.
+
+    If the field's serialized value is cached, the model stops watching the
+    old value for changes and watches the new one.
+    """
+    if name in model._cached_fields:
+        if model._lazy:
+            # Don't let __getattr__ convert a raw value.
+            try:
+                old = object.__getattribute__(model, name)
+            except AttributeError:
+                old = None
+        else:
+            # Much faster than catching the AttributeError ourselves.
+            old = getattr(model, name, None)
+        if tracking.is_watchable(old):
+            tracking.unwatch(old, model, name)
+        if tracking.is_watchable(value):
+            tracking.watch(value, model, name)
+    if value is _MISSING:
+        object.__delattr__(model, name)
+    else:
+        object.__setattr__(model, name, value)
+    model._child_changed(name)
+
+
+def _split_paths(paths):
+    """Return a dictionary mapping each name at the start of the dotted
+    ``paths`` to a frozenset of the rest of the paths below it, or to None
+    where the whole name is given. Returns None if ``paths`` is None.
+    """
+    if paths is None:
+        return None
+    tree = {}
+    for path in paths:
+        name, _, rest = path.partition('.')
+        if not rest:
+            tree[name] = None
+        elif tree.get(name, ()) is not None:
+            tree[name] = tree.get(name, frozenset()) | frozenset([rest])
+    return tree
+
+
+def _plan(fields, serial, include=None, exclude=None, owner=None):
+    """Return the steps for building the dictionary of a model with the
+    given fields, as a list of ``(name, field, convert, projected)`` tuples.
+
+    ``convert`` is the function applied to the value of the field, or None
+    if the value is copied as it is. It is the field's ``to_serial`` if
+    ``serial`` is True and the field overrides ``Field.to_serial``, which
+    returns its argument unchanged. ``projected`` is True if ``convert``
+    selects parts of the value according to dotted ``include`` and
+    ``exclude`` paths, see :meth:`~schemazoid.micromodels.Model.to_dict`.
+    ``owner`` is the model class the plan is for, whose conversions are
+    recorded while the profiling module is enabled.
+
+    Raises :exc:`ValueError` if ``include`` or ``exclude`` names a field
+    that isn't in ``fields``.
+    """
+    include = _split_paths(include)
+    exclude = _split_paths(exclude) or {}
+    unknown = set(include or ()).union(exclude).difference(fields)
+    if unknown:
+        raise ValueError("No such field: %s" % ', '.join(sorted(unknown)))
+    plan = []
+    for name, field in six.iteritems(fields):
+        sub_include = sub_exclude = None
+        if include is not None:
+            if name not in include:
+                continue
+            sub_include = include[name]
+        if name in exclude:
+            sub_exclude = exclude[name]
+            if sub_exclude is None:
+                continue
+        if sub_include or sub_exclude:
+            convert = field.projection(serial, sub_include, sub_exclude)
+            if owner is not None:
+                convert = profiling.converter(owner, name, 'projection',
+                                              convert)
+            plan.append((name, field, convert, True))
+        elif serial and overrides(field, 'to_serial'):
+            convert = field.to_serial
+            if owner is not None:
+                convert = profiling.converter(owner, name, 'to_serial',
+                                              convert)
+            plan.append((name, field, convert, False))
+        else:
+            plan.append((name, field, None, False))
+    return plan
+
+
+def _compile_plan(plan):
+    """Return a ``to_dict`` function specialized for the steps of a
+    :func:`_plan`, which takes the model instance and returns its
+    dictionary.
+
+    The conversion functions are looked up once, here, rather than once per
+    attribute per object, and values that are copied as they are don't go
+    through a function call at all.
+    """
+    copied = tuple(name for name, _, convert, _ in plan if convert is None)
+    converted = tuple((name, convert) for name, _, convert, _ in plan
+                      if convert is not None)
+
+    def to_dict(self):
+        result = {}
+        for name in copied:
+            value = getattr(self, name, _MISSING)
+            if value is not _MISSING:
+                result[name] = value
+        for name, convert in converted:
+            value = getattr(self, name, _MISSING)
+            if value is not _MISSING:
+                result[name] = convert(value)
+        return result
+
+    return to_dict
+
+
+class _SerialCache(dict):
+    """The serialized values of the fields of a model with the
+    ``track_changes`` option, keyed by name, along with the version of the
+    class fields they were serialized with.
+
+    ``complete`` is True while every cacheable field that is set has its
+    serialized value in the cache.
+    """
+    __slots__ = ('version', 'complete')
+
+    def __init__(self, version):
+        super(_SerialCache, self).__init__()
+        self.version = version
+        self.complete = False
+
+
+def _compile_cached_plan(plan, cached, version):
+    """Return a ``to_dict`` function like :func:`_compile_plan`, for models
+    with the ``track_changes`` option.
+
+    The serialized values of the fields named in ``cached`` are kept in the
+    model's ``_serial_cache`` and only serialized again after the field
+    changes. ``version`` is the version of the class fields the plan was
+    made from; a cache from other fields is discarded.
+    """
+    cacheable = tuple((name, convert) for name, _, convert, _ in plan
+                      if name in cached)
+    uncached = tuple((name, convert) for name, _, convert, _ in plan
+                     if name not in cached)
+
+    def to_dict(self):
+        cache = self._serial_cache
+        if cache is None or cache.version != version:
+            cache = _SerialCache(version)
+            object.__setattr__(self, '_serial_cache', cache)
+        if not cache.complete:
+            for name, convert in cacheable:
+                if name not in cache:
+                    value = getattr(self, name, _MISSING)
+                    if value is not _MISSING:
+                        cache[name] = (value if convert is None
+                                       else convert(value))
+            cache.complete = True
+        result = dict(cache)
+        for name, convert in uncached:
+            value = getattr(self, name, _MISSING)
+            if value is not _MISSING:
+                result[name] = value if convert is None else convert(value)
+        return result
+
+    return to_dict
+
+
+def _paths(paths):
+    """Return a frozenset of dotted paths given as an iterable or a single
+    string, to use in a cache key.
+    """
+    if type(paths) is frozenset:
+        return paths
+    if isinstance(paths, six.string_types):
+        paths = (paths,)
+    return frozenset(paths)
+
+
+def _lazy_getattr(self, name):
+    """The ``__getattr__`` method of lazy models.
+
+    It is only called when an attribute is not found, which is when a lazy
+    model converts a field from the raw data. Other models do without it,
+    because defining ``__getattr__`` slows down every attribute lookup.
+    """
+    if name not in _STATE:
+        raw = self._raw
+        if raw and name in raw:
+            to_python = self._converter(name)
+            if to_python is not None:
+                value = to_python(raw[name])
+                if self._track_changes:
+                    _set_tracked(self, name, value)
+                else:
+                    object.__setattr__(self, name, value)
+                del raw[name]
+                return value
+    raise AttributeError("'%s' object has no attribute '%s'" %
+                         (self.__class__.__name__, name))
+
+
+def _option(name, bases, attrs):
+    """Return the value of a class option, which may be inherited. A field
+    that has the name of an option is a field, and leaves the option as it
+    is.
+    """
+    value = attrs.get(name)
+    if name in attrs and not isinstance(value, Field):
+        return bool(value)
+    for base in bases:
+        # Model classes keep the resolved value; other bases, such as
+        # mixins, may declare the option itself.
+        value = getattr(base, '_' + name, None)
+        if value is None:
+            value = getattr(base, name, None)
+        if value and not isinstance(value, Field):
+            return True
+    return False
+
+
+def _slotted_attrs(bases, attrs, fields, state):
+    """Return a copy of the class attributes declaring ``__slots__``.
+
+    Field instances are moved from the attributes into ``fields``, since a
+    slot may not share its name with a class attribute. Slots are declared
+    for every field not already given one by a base class, and for the
+    names in ``state``, the per-instance state kept by ``Model``.
+    """
+    attrs = dict(attrs)
+    for key, value in list(attrs.items()):
+        if isinstance(value, Field):
+            fields[key] = attrs.pop(key)
+
+    taken = set()
+    for base in bases:
+        for klass in base.__mro__:
+            slots = klass.__dict__.get('__slots__', ())
+            if isinstance(slots, six.string_types):
+                slots = (slots,)
+            taken.update(slots)
+
+    wanted = set(fields)
+    wanted.update(state)
+    attrs['__slots__'] = tuple(sorted(wanted - taken))
+    return attrs
+
+
+def _slot_names(cls):
+    """Return the names of all the slots declared by ``cls`` and its
+    bases, other than ``__dict__`` and ``__weakref__``.
+    """
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+        if isinstance(slots, six.string_types):
+            slots = (slots,)
+        names.extend(name for name in slots
+                     if name not in ('__dict__', '__weakref__'))
+    return tuple(names)
+
+
+def _reconstruct(cls, added):
+    """Return an empty instance of the Model class ``cls``, for unpickling.
+
+    ``added`` holds the fields that were added to the class with
+    ``add_class_field`` where it was pickled. Any the class has not been
+    given yet are added first.
+    """
+    cls._add_missing_fields(added)
+    return cls.__new__(cls)
+
+
+class _FieldMap(dict):
+    """A read-only dictionary of fields, as returned by
+    :meth:`~schemazoid.micromodels.Model.get_all_fields`, which shares it
+    between calls. Changing it raises ``TypeError``; ``dict(fields)`` makes
+    a copy that can be changed.
+    """
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("The dictionary returned by get_all_fields cannot be "
+                        "modified; copy it with dict() first")
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class _InstanceFields(dict):
+    """The fields added to a single model instance with ``add_field``.
+
+    It also caches the merge of these fields with the class fields, along
+    with the version of the class fields that merge was built from.
+    """
+    __slots__ = ('merged', 'version')
+
+    def __init__(self, *args, **kwargs):
+        super(_InstanceFields, self).__init__(*args, **kwargs)
+        self.merged = None
+        self.version = None
+
+    def __setitem__(self, key, value):
+        super(_InstanceFields, self).__setitem__(key, value)
+        self.merged = None
+
+    def __reduce__(self):
+        # The merged map is rebuilt on demand, so there's no need to pickle
+        # it.
+        return (_InstanceFields, (dict(self),))
+
 
 # TODO Add model-level validation to support cross-field dependencies.
 @six.add_metaclass(MetaModel)
@@ -66,26 +585,191 @@ class Model(object):
         >>> thing.description
         u"Stick it in me, I'm done."
 
+    Setting ``compact = True`` on a Model subclass stores its fields in
+    ``__slots__`` instead of an instance ``__dict__``, which makes each
+    instance considerably smaller. The option is inherited by subclasses.
+    All the bases of a compact class should be compact as well (or Model
+    itself), otherwise its instances inherit a ``__dict__`` anyway.
+    A compact instance can only hold attributes for the fields declared on
+    its class, so :meth:`~schemazoid.micromodels.Model.add_field` can only
+    change the conversion of a declared field, and
+    :meth:`~schemazoid.micromodels.Model.add_class_field` can only replace
+    existing fields. ::
+
+        >>> class Point(m.Model):
+        ...   compact = True
+        ...   x = m.FloatField()
+        ...   y = m.FloatField()
+        >>> point = Point(x=1, y='2.5')
+        >>> point.to_dict() == {'x': 1.0, 'y': 2.5}
+        True
+
+    Setting ``lazy = True`` on a Model subclass defers the conversion of
+    the data given to the constructor. The data is kept as it is, and each
+    field is converted the first time it is read, after which the converted
+    value is kept. This saves a lot of work when only a few fields of a wide
+    model are ever read. The option is inherited by subclasses. Conversion
+    errors are raised when the field is read, or by
+    :meth:`~schemazoid.micromodels.Model.validate`, which converts every
+    field at once. Values set later, or given to
+    :meth:`~schemazoid.micromodels.Model.update`, are converted immediately.
+    :meth:`~schemazoid.micromodels.Model.to_serial` passes values that were
+    never read straight through, when the field reports (through its
+    ``is_serial`` method) that converting and serializing them would give
+    back the same value. ::
+
+        >>> class Page(m.Model):
+        ...   lazy = True
+        ...   name = m.CharField()
+        ...   position = m.IntegerField()
+        >>> page = Page({'name': u'Home', 'position': 'first'})
+        >>> page.name == u'Home'
+        True
+        >>> page.position
+        Traceback (most recent call last):
+            ...
+        ValueError: invalid literal for int() with base 10: 'first'
+
+    Setting ``track_changes = True`` on a Model subclass caches the
+    serialized value of each field, so that
+    :meth:`~schemazoid.micromodels.Model.to_serial` only serializes again
+    the fields that have changed since it was last called. This pays off for
+    long-lived models that are serialized many times over. Changes made
+    inside a :class:`~schemazoid.micromodels.ListField` value, or to a
+    nested model of a class that also tracks changes, count as changes to
+    the field holding them, which makes building and changing these models
+    somewhat slower. Values whose changes can't be seen, such as
+    those of a :class:`~schemazoid.micromodels.DictField`, are serialized
+    every time. The dictionaries returned share the cached values, so they
+    must not be modified. The option is inherited by subclasses. ::
+
+        >>> class Counter(m.Model):
+        ...   track_changes = True
+        ...   name = m.CharField()
+        ...   counts = m.ListField(of_type=m.IntegerField())
+        >>> counter = Counter(name='clicks', counts=[1, 2])
+        >>> counter.counts.append(3)
+        >>> counter.to_serial()['counts']
+        [1, 2, 3]
+
+    Models can be pickled, compact and lazy ones included, as long as their
+    class is defined at the top level of a module. Values are restored as
+    they are, without being converted again, and a lazy model's unconverted
+    data stays unconverted. Instance fields travel with the instance, and
+    fields added with :meth:`~schemazoid.micromodels.Model.add_class_field`
+    are added to the class when unpickling in a process that lacks them.
     """
+    # Model itself has no instance __dict__, so that compact subclasses can
+    # do without one. Other subclasses get one as usual, and so do plain
+    # Model instances, which __new__ makes from _PlainModel.
+    __slots__ = ()
+    compact = False
+    lazy = False
+    track_changes = False
+    _instance_fields = None
+    # For lazy models, the data given to the constructor that has yet to be
+    # converted, keyed by name.
+    _raw = None
+    # For models with track_changes, the cached serialized values of the
+    # fields, and the owners to notify of changes, see the tracking module.
+    _serial_cache = None
+    _observers = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls is Model:
+            cls = _PlainModel
+        return super(Model, cls).__new__(cls)
+
     def __init__(self, *args, **kwargs):
         super(Model, self).__init__()
-        # an edge case, we can't call our own __setattr__ before
-        # _instance_fields is initialized, since it calls get_field()
-        super(Model, self).__setattr__('_instance_fields', {})
-        if args:
-            self.update(args[0])
-        if kwargs:
-            self.update(kwargs)
+        # Instance fields are rare, so their dictionary is only created by
+        # add_field. This also initializes the slot on compact models.
+        # We can't call our own __setattr__ before _instance_fields is
+        # set, since it reads it.
+        super(Model, self).__setattr__('_instance_fields', None)
+        if self._track_changes:
+            super(Model, self).__setattr__('_serial_cache', None)
+            super(Model, self).__setattr__('_observers', None)
+        if self._lazy:
+            raw = dict(args[0], **kwargs) if args else kwargs
+            super(Model, self).__setattr__('_raw', raw)
+        elif args or kwargs:
+            self.update(*args, **kwargs)
 
     # We override __setattr__ so that setting attributes passes through field
     # conversion/validation functions.
     def __setattr__(self, key, value):
-        field = self.get_field(key)
-        if field:
-            super(Model, self).__setattr__(key, field.to_python(value))
+        to_python = self._converter(key)
+        if to_python is not None:
+            if self._track_changes:
+                _set_tracked(self, key, to_python(value))
+            else:
+                super(Model, self).__setattr__(key, to_python(value))
+            raw = self._raw
+            if raw:
+                raw.pop(key, None)
         else:
             super(Model, self).__setattr__(key, value)
 
+    def __delattr__(self, key):
+        raw = self._raw
+        if raw and key in raw:
+            # A lazy model's field that was never read.
+            del raw[key]
+        elif self._track_changes and self.get_field(key):
+            _set_tracked(self, key, _MISSING)
+        else:
+            super(Model, self).__delattr__(key)
+
+    def __reduce_ex__(self, protocol):
+        added = self._added_fields
+        if added:
+            return (_reconstruct, (self.__class__, added),
+                    self.__getstate__())
+        return super(Model, self).__reduce_ex__(protocol)
+
+    def __getstate__(self):
+        # Read the attributes directly, so that pickling a lazy model does
+        # not convert its raw data.
+        state = dict(getattr(self, '__dict__', ()))
+        get = object.__getattribute__
+        for name in self._slot_names:
+            try:
+                state[name] = get(self, name)
+            except AttributeError:
+                pass
+        if state.get('_instance_fields', _MISSING) is None:
+            del state['_instance_fields']
+        # The owners watching this model are not pickled with it, and the
+        # cache is rebuilt as needed.
+        state.pop('_observers', None)
+        state.pop('_serial_cache', None)
+        return state
+
+    def __setstate__(self, state):
+        # The values were converted before pickling, so bypass __setattr__.
+        setter = object.__setattr__
+        setter(self, '_instance_fields', None)
+        if self._track_changes:
+            setter(self, '_serial_cache', None)
+            setter(self, '_observers', None)
+        for name, value in six.iteritems(state):
+            setter(self, name, value)
+            if self._track_changes and name in self._cached_fields:
+                if tracking.is_watchable(value):
+                    tracking.watch(value, self, name)
+
+    def _child_changed(self, name):
+        """Called when the value of the field ``name`` has changed, on
+        models with the ``track_changes`` option.
+        """
+        cache = self._serial_cache
+        if cache is not None:
+            cache.pop(name, None)
+            cache.complete = False
+        if self._observers:
+            tracking.changed(self)
+
     @classmethod
     def get_class_field(cls, name):
         """Return the Field instance for the class field of the given name.
@@ -105,24 +789,210 @@ class Model(object):
         if not isinstance(field, Field):
             msg = "Second argument to add_class_field must be a Field instance"
             raise TypeError(msg)
+        if cls._compact and name not in cls._clsfields:
+            msg = "Cannot add field %r to compact class %s" % (
+                name, cls.__name__)
+            raise TypeError(msg)
         cls._clsfields[name] = field
+        cls._added_fields[name] = field
+        cls._fields_version += 1
+        cls._compile()
+
+    @classmethod
+    def field_cache_info(cls):
+        """Report on the merged field maps returned by
+        :meth:`~schemazoid.micromodels.Model.get_all_fields` for instances
+        of this class.
+
+        Returns a named tuple of ``hits``, the number of calls answered from
+        a cached map, ``misses``, the number of calls that had to build one,
+        and ``version``, the number of times the class fields have changed.
+        """
+        stats = cls._field_cache_stats
+        return FieldCacheInfo(stats['hits'], stats['misses'],
+                              cls._fields_version)
+
+    @classmethod
+    def from_records(cls, records):
+        """Return a list of instances of this class, one for each dictionary
+        in the iterable ``records``.
+
+        The result is the same as ``[cls(record) for record in records]``,
+        but the work is done a field at a time across the whole batch, so
+        each field's converter runs over a column of values in a tight loop
+        before the instances are assembled. Classes with the ``lazy`` or
+        ``track_changes`` options, and classes that override ``__init__``,
+        ``update`` or ``__setattr__``, are constructed one record at a time
+        as usual.
+        """
+        one_at_a_time = (cls._lazy, cls._track_changes, cls._custom_setattr,
+                         cls.__init__ != Model.__init__,
+                         cls.update != Model.update)
+        if any(one_at_a_time):
+            return [cls(record) for record in records]
+
+        records = list(records)
+        new = _allocator(cls)
+        setter = object.__setattr__
+        instances = [new(cls) for record in records]
+        for instance in instances:
+            setter(instance, '_instance_fields', None)
+
+        for name, to_python in six.iteritems(cls._to_python):
+            column = [to_python(record[name]) if name in record else _MISSING
+                      for record in records]
+            for instance, value in zip(instances, column):
+                if value is not _MISSING:
+                    setter(instance, name, value)
+        return instances
+
+    @classmethod
+    def construct(cls, data, trusted=True, native=False):
+        """Return an instance of this class built from the dictionary
+        ``data``, which is known to be valid, such as the output of
+        :meth:`~schemazoid.micromodels.Model.to_serial` read back from a
+        store the application wrote itself.
+
+        Values are assigned without the checks and conversions made by
+        ``to_python``, apart from those needed to turn the serial form of a
+        value back into its native form, such as parsing dates. Nested
+        models in a :class:`~schemazoid.micromodels.ModelField` or a
+        :class:`~schemazoid.micromodels.ListField` are built the same way.
+        With ``native`` set, ``data`` is in the native form returned by
+        :meth:`~schemazoid.micromodels.Model.to_dict` instead, and values
+        are assigned as they are, though lists and nested models are
+        copied, so that changing them doesn't change the source. With
+        ``trusted`` set to False, the data is converted as usual, as by the
+        constructor.
+
+        Invalid data is not detected, and leaves the model holding values
+        of the wrong types. ``__init__`` is not called, so classes that
+        override it must not rely on it having run.
+        """
+        if not trusted:
+            return cls(data)
+        native = bool(native)
+        constructors = cls._constructors
+        construct = constructors.get(native)
+        if construct is None:
+            construct = constructors[native] = _compile_construct(cls, native)
+        return construct(data)
+
+    @classmethod
+    def parse_many(cls, records, workers=None, chunk_size=1000,
+                   serial=False, ordered=True):
+        """Build an instance of this class from each dictionary in the
+        iterable ``records`` in a pool of ``workers`` processes, and yield
+        the results.
+
+        Records are sent to the workers ``chunk_size`` at a time, where each
+        chunk is built with :meth:`~schemazoid.micromodels.Model.from_records`.
+        ``workers`` defaults to the number of CPUs. With ``workers=0`` the
+        records are built in this process instead, which is useful for
+        comparison and debugging.
+
+        With ``serial`` set, the workers return the result of
+        :meth:`~schemazoid.micromodels.Model.to_serial` for each model
+        rather than the model itself, which is cheaper to send back when
+        the models are only going to be serialized. Results are yielded in
+        the order of ``records``, unless ``ordered`` is False, in which case
+        each chunk is yielded as soon as it is done.
+
+        The class must be importable by the workers, that is, defined at the
+        top level of a module. Fields added with
+        :meth:`~schemazoid.micromodels.Model.add_class_field` are sent to
+        the workers along with the records. This requires
+        :mod:`concurrent.futures`, which on Python 2 is provided by the
+        ``futures`` package.
+        """
+        return parallel.parse_many(cls, records, workers=workers,
+                                   chunk_size=chunk_size, serial=serial,
+                                   ordered=ordered)
+
+    @classmethod
+    def iter_jsonl(cls, fileobj, batch_size=1000, skip_errors=False,
+                   errors=None):
+        """Yield an instance of this class for each line of a `JSON Lines
+        <http://jsonlines.org/>`_ file, holding one JSON object per line.
+
+        ``fileobj`` may be opened in text or binary mode. It is read in large
+        chunks, and the lines are built into models ``batch_size`` at a time
+        using :meth:`~schemazoid.micromodels.Model.from_records`, so memory
+        use stays constant however long the file is. Blank lines are ignored.
+
+        By default a line that is not a valid JSON object, or that fails
+        field conversion, raises an exception and ends the stream. With
+        ``skip_errors`` such lines are skipped instead. Passing a list as
+        ``errors`` also skips them, appending a ``LineError`` named tuple of
+        ``(line_number, line, error)`` to the list for each one. Lines
+        that fail conversion are only found when their batch is built, so
+        the list is not necessarily in line order.
+        """
+        return jsonl.iter_models(cls, fileobj, batch_size=batch_size,
+                                 skip_errors=skip_errors, errors=errors)
+
+    @classmethod
+    def dump_jsonl(cls, models, fileobj):
+        """Write each model in the iterable ``models`` to ``fileobj`` as one
+        line of a `JSON Lines <http://jsonlines.org/>`_ file, and return the
+        number of models written.
+
+        Each model is serialized with its
+        :meth:`~schemazoid.micromodels.Model.to_serial` method through a
+        single shared JSON encoder, and lines are written in large chunks
+        rather than one at a time. ``fileobj`` may be opened in text or
+        binary mode; binary output is encoded as UTF-8.
+        """
+        return jsonl.dump_models(models, fileobj)
 
     def get_field(self, name):
         """Return the Field instance for the given name on this object.
 
         This instance method searches both the instance and the class.
         """
-        field = self._instance_fields.get(name, None)
-        if not field:
-            field = self.__class__.get_class_field(name)
-        return field
+        instance_fields = self._instance_fields
+        if instance_fields:
+            field = instance_fields.get(name, None)
+            if field:
+                return field
+        return self.__class__._clsfields.get(name, None)
+
+    def _converter(self, name):
+        """Return the ``to_python`` function of the field of the given
+        name, or None if there is no such field. This is what
+        :meth:`~schemazoid.micromodels.Model.get_field` finds, but class
+        fields come from the class's compiled dictionary of converters.
+        """
+        instance_fields = self._instance_fields
+        if instance_fields:
+            field = instance_fields.get(name, None)
+            if field:
+                return profiling.converter(self.__class__, name, 'to_python',
+                                           field.to_python)
+        return self._to_python.get(name, None)
 
     def get_all_fields(self):
         """Return a dictionary of all Fields on this instance, keyed by name.
 
-        Includes both class fields and instance fields.
+        Includes both class fields and instance fields. The dictionary is
+        cached and shared, so it is read-only: instances without instance
+        fields all share one dictionary of the class fields.
         """
-        return dict(self.__class__.get_class_fields(), **self._instance_fields)
+        cls = self.__class__
+        stats = cls._field_cache_stats
+        instance_fields = self._instance_fields
+        if not instance_fields:
+            stats['hits'] += 1
+            return cls._all_fields
+        merged = instance_fields.merged
+        if merged is None or instance_fields.version != cls._fields_version:
+            stats['misses'] += 1
+            instance_fields.merged = _FieldMap(cls._clsfields,
+                                               **instance_fields)
+            instance_fields.version = cls._fields_version
+        else:
+            stats['hits'] += 1
+        return instance_fields.merged
 
     def update(self, *args, **kwargs):
         """As with the :class:`dict` method of the same name, given a
@@ -131,6 +1001,19 @@ class Model(object):
         value.
         """
         data = args[0] if args else {}
+        if not self._instance_fields and not self._custom_setattr:
+            # The common case: only class fields, so use the update
+            # function MetaModel compiled for this class. It stores values
+            # directly, so classes that override __setattr__ can't use it.
+            self._compiled_update(data, kwargs)
+            raw = self._raw
+            if raw:
+                # Those values are converted now, forget the raw ones.
+                for name in data:
+                    raw.pop(name, None)
+                for name in kwargs:
+                    raw.pop(name, None)
+            return
         for name in self.get_all_fields():
             if name in kwargs:
                 setattr(self, name, kwargs[name])
@@ -143,12 +1026,157 @@ class Model(object):
         Instance fields allow you to validate and serialize arbitrary
         attributes on a Model instance even if the class does not support them.
         """
+        if self._instance_fields is None:
+            super(Model, self).__setattr__('_instance_fields',
+                                           _InstanceFields())
         self._instance_fields[name] = field
         if hasattr(self, name):
             # Should raise exception if current value not valid
             setattr(self, name, getattr(self, name))
 
-    def to_dict(self, serial=False):
+    def diff(self, other):
+        """Return a patch that turns this model into ``other`` when given to
+        :meth:`~schemazoid.micromodels.Model.apply_patch`, describing only
+        the fields that differ. If nothing differs, the patch is empty.
+
+        ``other`` is normally a model of the same class; the fields compared
+        are those of this model. The patch is a dictionary that can be
+        serialized as JSON, mapping the name of each field that differs to a
+        dictionary describing the change:
+
+        * ``{'value': v}`` sets the field to the serialized value ``v``.
+        * ``{'unset': True}`` deletes the field from the model.
+        * ``{'fields': patch}`` patches a nested model in a
+          :class:`~schemazoid.micromodels.ModelField` with a patch of this
+          same form.
+        * For a :class:`~schemazoid.micromodels.ListField`, ``{'items':
+          {index: change}}`` changes items as above, ``'length'`` shortens
+          the list and ``'append'`` gives serialized items to add to its
+          end. When most items have changed, the whole list is set instead.
+        * For a :class:`~schemazoid.micromodels.DictField`, ``{'keys': {key:
+          change}}`` sets, unsets or patches individual keys, recursing into
+          nested dictionaries.
+        """
+        patch = {}
+        if other is self:
+            return patch
+        for name, field in six.iteritems(self.get_all_fields()):
+            old = getattr(self, name, _MISSING)
+            new = getattr(other, name, _MISSING)
+            if new is _MISSING:
+                if old is not _MISSING:
+                    patch[name] = {'unset': True}
+            elif old is _MISSING:
+                patch[name] = {'value': field.to_serial(new)}
+            else:
+                field_patch = field.diff(old, new)
+                if field_patch:
+                    patch[name] = field_patch
+        return patch
+
+    def apply_patch(self, patch):
+        """Change this model in place as described by ``patch``, as returned
+        by :meth:`~schemazoid.micromodels.Model.diff`. Values in the patch
+        are converted by the fields as when they are set, and nested models,
+        lists and dictionaries are changed in place. Names that are not
+        fields of the model are ignored.
+
+        A patch may be applied to a model other than the one it was made
+        from. Where such a model has no nested model, list or dictionary
+        to change, an empty one is built and the changes are applied to
+        it, though a change to list items that aren't there raises
+        :exc:`ValueError`.
+        """
+        for name, field_patch in six.iteritems(patch):
+            field = self.get_field(name)
+            if not field:
+                continue
+            if field_patch.get('unset'):
+                try:
+                    delattr(self, name)
+                except AttributeError:
+                    pass
+                continue
+            if 'value' in field_patch:
+                setattr(self, name, field_patch['value'])
+                continue
+            # A missing value is None to the field, which starts from an
+            # empty value.
+            value = getattr(self, name, None)
+            patched = field.apply_patch(value, field_patch)
+            if patched is not value:
+                setattr(self, name, patched)
+
+    @classmethod
+    def validate_raw(cls, data, fail_fast=False):
+        """Check whether a model of this class could be built from the
+        dictionary ``data``, without building it, and return a list of the
+        values that could not be converted. An empty list means ``data`` is
+        valid.
+
+        Each field's conversion is run on its value and the result thrown
+        away, recursing into the items of a
+        :class:`~schemazoid.micromodels.ListField` and the data of nested
+        models in a :class:`~schemazoid.micromodels.ModelField`, so no model
+        instances are created. Each error is a ``FieldError`` named tuple of
+        ``path``, a tuple of the field names and list indexes leading to the
+        value, the ``value`` itself and the ``error`` raised converting it.
+        With ``fail_fast`` set, checking stops at the first error, so the
+        list has at most one.
+
+        Unlike the constructor, lazy classes are checked in full, and
+        ``__init__`` methods are not run.
+        """
+        errors = []
+        cls.check_raw(data, (), errors, fail_fast)
+        return errors
+
+    @classmethod
+    def check_raw(cls, data, path, errors, fail_fast=False):
+        """As :meth:`~schemazoid.micromodels.Model.validate_raw`, but
+        appending errors to the list ``errors``, with their paths starting
+        with ``path``. Used by ModelField to check nested models.
+        """
+        try:
+            items = six.iteritems(data)
+        except AttributeError:
+            errors.append(FieldError(path, data, TypeError(
+                "Expected a dictionary, got %s" % type(data).__name__)))
+            return
+        get_converter = cls._raw_converters.get
+        get_check = cls._raw_checks.get
+        for name, value in items:
+            # Inlines Field.check_raw for the simple fields.
+            to_python = get_converter(name)
+            if to_python is not None:
+                try:
+                    to_python(value)
+                except CONVERSION_ERRORS as e:
+                    errors.append(FieldError(path + (name,), value, e))
+                    if fail_fast:
+                        return
+                continue
+            check = get_check(name)
+            if check is not None:
+                check(value, path + (name,), errors, fail_fast)
+                if fail_fast and errors:
+                    return
+
+    def validate(self):
+        """Converts any field values that have not been converted yet,
+        raising the exception from the first that fails.
+
+        Only lazy models have unconverted values. For other models this
+        method does nothing, since their values are converted as they are
+        set.
+        """
+        raw = self._raw
+        if raw:
+            for name in list(raw):
+                if self.get_field(name):
+                    getattr(self, name)
+
+    def to_dict(self, serial=False, include=None, exclude=None):
         """Returns a dictionary representing the data of the instance,
         containing native Python objects which might not be serializable
         (for example, :class:`~datetime.datetime` objects). To obtain a
@@ -159,23 +1187,89 @@ class Model(object):
         Note that only attributes declared as Fields will be included in the
         dictionary. Although you may set other attributes on the instance,
         those additional attributes will not be returned.
+
+        ``include`` and ``exclude`` select which fields go into the
+        dictionary, and are each a list of field names. Names may be dotted
+        paths into fields holding models, such as a
+        :class:`~schemazoid.micromodels.ModelField` or a
+        :class:`~schemazoid.micromodels.ListField` of them, to select the
+        fields of the nested models: ``include=['name', 'author.name']``
+        gives the name of the model and of its author, and nothing else.
+        Without ``include`` every field is included, apart from those
+        ``exclude`` names. Fields that are left out are not converted or
+        serialized at all. Names of fields the model doesn't have, and
+        paths into fields that don't hold models, raise :exc:`ValueError`.
+        The work of applying the paths to the fields is
+        done once and cached for each class.
         """
-        if serial:
-            return dict(
-                (key, self.get_field(key).to_serial(getattr(self, key)))
-                for key in self.get_all_fields() if hasattr(self, key))
-        else:
-            return dict((key, getattr(self, key))
-                        for key in self.get_all_fields() if hasattr(self, key))
+        if include is not None:
+            include = _paths(include)
+        if exclude is not None:
+            exclude = _paths(exclude)
+        raw = self._raw
+        if not raw and not self._instance_fields:
+            # The common case: only class fields, all converted, so use
+            # the functions compiled for this class.
+            if include is None and exclude is None:
+                if serial:
+                    return self._compiled_to_serial()
+                return self._compiled_to_dict()
+            return self._projection(serial, include, exclude)(self)
+
+        result = {}
+        plan = _plan(self.get_all_fields(), serial, include, exclude,
+                     owner=self.__class__)
+        # The values of a lazy model that have not been converted yet,
+        # which needn't be if they are serial already.
+        pending = raw if serial else None
+        for key, field, convert, projected in plan:
+            if pending and not projected and key in pending:
+                if field.is_serial(pending[key]):
+                    result[key] = pending[key]
+                    continue
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                result[key] = value if convert is None else convert(value)
+        return result
+
+    @classmethod
+    def _projection(cls, serial, include, exclude):
+        """Return the ``to_dict`` function compiled for the given options,
+        from the class's cache if possible.
+        """
+        key = (serial, include, exclude)
+        projections = cls._projections
+        projection = projections.get(key)
+        if projection is None:
+            projection = _compile_plan(
+                _plan(cls._clsfields, serial, include, exclude, owner=cls))
+            if len(projections) >= _PROJECTION_CACHE_SIZE:
+                # Only likely if the paths come from user input. Start
+                # again rather than grow without bound.
+                projections.clear()
+            projections[key] = projection
+        return projection
 
     # Fields have to_serial, for symmetry models should have it to.
-    def to_serial(self):
+    def to_serial(self, include=None, exclude=None):
         """Returns a serializable dictionary representing the data of the
         instance. It should be safe to hand this dictionary as-is to
         :func:`json.dumps`.
 
         Note that only attributes declared as Fields will be included in the
         dictionary. Although you may set other attributes on the instance,
-        those additional attributes will not be returned.
+        those additional attributes will not be returned. ``include`` and
+        ``exclude`` select fields as for
+        :meth:`~schemazoid.micromodels.Model.to_dict`.
         """
-        return self.to_dict(serial=True)
+        if include is None and exclude is None:
+            # Subclasses may override to_dict without these arguments.
+            return self.to_dict(serial=True)
+        return self.to_dict(serial=True, include=include, exclude=exclude)
+
+
+class _PlainModel(Model):
+    """The class of plain :class:`Model` instances, which, unlike Model
+    itself, gives them an instance ``__dict__`` to hold the values of
+    their instance fields and other attributes.
+    """
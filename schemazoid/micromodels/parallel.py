@@ -0,0 +1,84 @@
+"""
+Building models in a pool of worker processes.
+
+This backs the :meth:`~schemazoid.micromodels.Model.parse_many` class
+method, which is the usual way to call it.
+"""
+import collections
+import itertools
+import multiprocessing
+
+try:
+    from concurrent import futures
+except ImportError:  # Python 2 without the futures package
+    futures = None
+
+
+def chunked(records, size):
+    """Yield lists of up to ``size`` items from the iterable ``records``."""
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, size))
+        if not chunk:
+            break
+        yield chunk
+
+
+def build_chunk(cls, added, records, serial):
+    """Return the models built from a list of records, or their serialized
+    dictionaries if ``serial`` is True. Runs in the worker processes.
+
+    ``added`` holds the fields added to ``cls`` with ``add_class_field`` in
+    the parent process, which are added here too if they are missing.
+    """
+    cls._add_missing_fields(added)
+    models = cls.from_records(records)
+    if serial:
+        return [model.to_serial() for model in models]
+    return models
+
+
+def parse_many(cls, records, workers=None, chunk_size=1000, serial=False,
+               ordered=True):
+    """Yield the models built from ``records`` by a pool of processes.
+    See :meth:`~schemazoid.micromodels.Model.parse_many`.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if workers == 0:
+        for chunk in chunked(records, chunk_size):
+            for result in build_chunk(cls, {}, chunk, serial):
+                yield result
+        return
+    if futures is None:
+        raise RuntimeError("parse_many requires concurrent.futures; on "
+                           "Python 2, install the futures package")
+
+    workers = workers or multiprocessing.cpu_count()
+    # Only keep a few chunks per worker in flight, so that memory use
+    # doesn't grow with the number of records.
+    limit = 2 * workers
+    with futures.ProcessPoolExecutor(workers) as executor:
+        pending = collections.deque()
+        for chunk in chunked(records, chunk_size):
+            pending.append(executor.submit(build_chunk, cls,
+                                           cls._added_fields, chunk, serial))
+            if len(pending) >= limit:
+                for result in _finished(pending, ordered):
+                    yield result
+        while pending:
+            for result in _finished(pending, ordered):
+                yield result
+
+
+def _finished(pending, ordered):
+    """Remove a finished future from ``pending`` and return its results,
+    waiting for one to finish if need be. If ``ordered``, it is always the
+    oldest.
+    """
+    if ordered:
+        return pending.popleft().result()
+    done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+    future = done.pop()
+    pending.remove(future)
+    return future.result()
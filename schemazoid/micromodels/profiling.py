@@ -0,0 +1,176 @@
+"""
+Opt-in profiling of the field conversions done by models.
+
+While profiling is enabled, every call a model makes to the ``to_python``
+or ``to_serial`` method of one of its fields is counted and timed, along
+with the calls that raise an exception, by model class and field name::
+
+    >>> from schemazoid import micromodels as m
+    >>> from schemazoid.micromodels import profiling
+    >>> class Item(m.Model):
+    ...     count = m.IntegerField()
+    >>> with profiling.profile() as stats:
+    ...     items = [Item(count='1'), Item(count='2')]
+    >>> stats.as_dict()[Item]['count']['to_python']['calls']
+    2
+
+Models look up their fields' converters once, when the class is compiled,
+so enabling or disabling profiling compiles every model class again, with
+converters that record their calls or with the plain ones. When profiling
+is off, models run exactly as they would without this module.
+
+Times are inclusive: the time spent converting a
+:class:`~schemazoid.micromodels.ModelField` includes the time spent on the
+fields of the nested model, which are also reported under the nested class.
+Conversions of a field through a projection, see
+:meth:`~schemazoid.micromodels.Model.to_dict`, are reported as
+``projection``. Conversions by fields added to a single instance with
+:meth:`~schemazoid.micromodels.Model.add_field` are reported under the
+class of the instance.
+"""
+import contextlib
+from timeit import default_timer
+
+# The Profile recording conversions, while profiling is enabled.
+_profile = None
+
+
+class Profile(object):
+    """The calls, time and failures of the field conversions recorded while
+    profiling was enabled.
+    """
+
+    def __init__(self):
+        # (class, field name, method): [calls, seconds, failures]
+        self._stats = {}
+
+    def wrap(self, cls, name, method, func):
+        """Return a function that calls ``func``, the conversion ``method``
+        of the field ``name`` of the model class ``cls``, recording the call
+        in this profile.
+        """
+        stats = self._stats.setdefault((cls, name, method), [0, 0.0, 0])
+
+        def profiled(value):
+            start = default_timer()
+            try:
+                return func(value)
+            except Exception:
+                stats[2] += 1
+                raise
+            finally:
+                stats[0] += 1
+                stats[1] += default_timer() - start
+
+        return profiled
+
+    def reset(self):
+        """Forget the calls recorded so far."""
+        for stats in self._stats.values():
+            stats[:] = [0, 0.0, 0]
+
+    def as_dict(self):
+        """Return the recorded conversions as a dictionary, keyed by model
+        class, then field name, then method, of dictionaries of ``calls``,
+        ``seconds`` and ``failures``. Conversions that were never called are
+        left out.
+        """
+        result = {}
+        for (cls, name, method), (calls, seconds, failures) in \
+                self._stats.items():
+            if calls:
+                fields = result.setdefault(cls, {})
+                fields.setdefault(name, {})[method] = {
+                    'calls': calls, 'seconds': seconds, 'failures': failures}
+        return result
+
+    def table(self):
+        """Return the recorded conversions as a text table, slowest first.
+        Classes are given by their module and name.
+        """
+        rows = sorted(
+            ((_label(cls), name, method, calls, failures, seconds)
+             for (cls, name, method), (calls, seconds, failures)
+             in self._stats.items() if calls),
+            key=lambda row: row[-1], reverse=True)
+        lines = [('class', 'field', 'method', 'calls', 'failures',
+                  'total ms', 'us/call')]
+        for cls, name, method, calls, failures, seconds in rows:
+            lines.append((cls, name, method, str(calls), str(failures),
+                          '%.3f' % (seconds * 1e3),
+                          '%.3f' % (seconds * 1e6 / calls)))
+        widths = [max(len(line[i]) for line in lines)
+                  for i in range(len(lines[0]))]
+        lines.insert(1, tuple('-' * width for width in widths))
+        return '\n'.join(
+            '  '.join(cell.ljust(width) if i < 3 else cell.rjust(width)
+                      for i, (cell, width) in enumerate(zip(line, widths)))
+            for line in lines)
+
+
+def _label(cls):
+    """Return the name of the class ``cls``, with its module."""
+    return '%s.%s' % (cls.__module__,
+                      getattr(cls, '__qualname__', cls.__name__))
+
+
+def converter(cls, name, method, func):
+    """Return ``func``, the conversion ``method`` of the field ``name`` of
+    the model class ``cls``, wrapped to record its calls if profiling is
+    enabled.
+    """
+    if _profile is None:
+        return func
+    return _profile.wrap(cls, name, method, func)
+
+
+def _recompile():
+    from .models import Model
+    classes = [Model]
+    while classes:
+        cls = classes.pop()
+        cls._compile()
+        classes.extend(cls.__subclasses__())
+
+
+def enable(profile=None):
+    """Start recording the field conversions of all models in ``profile``,
+    or in a new :class:`Profile`, and return it.
+    """
+    global _profile
+    _profile = profile if profile is not None else Profile()
+    _recompile()
+    return _profile
+
+
+def disable():
+    """Stop recording field conversions, and return the :class:`Profile`
+    that recorded them, or None if profiling was not enabled.
+    """
+    global _profile
+    profile, _profile = _profile, None
+    _recompile()
+    return profile
+
+
+def is_enabled():
+    """Return True if field conversions are being recorded."""
+    return _profile is not None
+
+
+@contextlib.contextmanager
+def profile(profile=None):
+    """A context manager that enables profiling for the duration of the
+    ``with`` block, recording in ``profile`` or in a new :class:`Profile`,
+    which it returns. Profiling that was already enabled is resumed
+    afterwards.
+    """
+    previous = _profile
+    profile = enable(profile)
+    try:
+        yield profile
+    finally:
+        if previous is None:
+            disable()
+        else:
+            enable(previous)
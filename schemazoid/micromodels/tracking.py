@@ -0,0 +1,46 @@
+"""
+Change notification for models with the ``track_changes`` option.
+
+A watchable value, meaning a :class:`~schemazoid.micromodels.Model` with the
+``track_changes`` option or a ``TypedList``, keeps a list of observers in its
+``_observers`` attribute. Each is an ``(owner, key)`` pair, and when the
+value changes, ``owner._child_changed(key)`` is called. Models pass their
+field name as the key, so that they know which field to serialize again.
+"""
+
+
+def is_watchable(value):
+    """Return True if ``value`` can report its changes to observers."""
+    # type() rather than __class__, which a DeferredModel fakes.
+    return getattr(type(value), '_watchable', False)
+
+
+def watch(value, owner, key):
+    """Arrange for ``owner._child_changed(key)`` to be called whenever the
+    watchable ``value`` changes.
+    """
+    observers = value._observers
+    if observers is None:
+        observers = []
+        object.__setattr__(value, '_observers', observers)
+        start = getattr(value, '_start_watching', None)
+        if start is not None:
+            start()
+    observers.append((owner, key))
+
+
+def unwatch(value, owner, key):
+    """Undo a call to :func:`watch`."""
+    observers = value._observers
+    if observers:
+        for index, (observer, observed_key) in enumerate(observers):
+            # By identity, since lists compare equal by their contents.
+            if observer is owner and observed_key == key:
+                del observers[index]
+                break
+
+
+def changed(value):
+    """Tell the observers of ``value`` that it has changed."""
+    for owner, key in list(value._observers):
+        owner._child_changed(key)
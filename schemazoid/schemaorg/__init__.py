@@ -0,0 +1,79 @@
+"""
+Models of the Schema.org object types.
+
+Each type is defined in a module of its own, which is only imported the
+first time the type is used, so that importing this package costs almost
+nothing however many types it has::
+
+    >>> from schemazoid import schemaorg
+    >>> article = schemaorg.Article(headline='Lazy loading')
+    >>> print(article.headline)
+    Lazy loading
+
+Types that refer to other types, such as ``Article.author``, import those
+too. To add a type, define it in a module named after it in lower case, and
+list it in ``__all__``.
+"""
+import sys
+import types
+
+# This module MUST NOT import anything but the standard library at import
+# time, see benchmarks/imports.py. Types are loaded by __getattr__.
+__all__ = [
+    'Article',
+    'CreativeWork',
+    'Offer',
+    'Organization',
+    'Person',
+    'PostalAddress',
+    'Product',
+    'Thing',
+]
+
+_TYPES = frozenset(__all__)
+
+
+def _load(name):
+    """Import and return the type ``name``."""
+    if name not in _TYPES:
+        raise AttributeError("module %r has no attribute %r" %
+                             (__name__, name))
+    module_name = '%s.%s' % (__name__, name.lower())
+    __import__(module_name)
+    return getattr(sys.modules[module_name], name)
+
+
+def __getattr__(name):
+    # Called for names not found in the module, on Python 3.7 and later
+    # (PEP 562). Loaded types are stored, so this runs once for each.
+    value = _load(name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | _TYPES)
+
+
+class _LazyModule(types.ModuleType):
+    """Stands in for this module on Python versions without module
+    ``__getattr__``.
+    """
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        value = _load(name)
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | _TYPES)
+
+
+if sys.version_info < (3, 7):
+    _module = _LazyModule(__name__, __doc__)
+    _module.__dict__.update(globals())
+    # The functions above use this module's globals, which Python 2 clears
+    # when the module is garbage collected, so keep it alive.
+    _module._original = sys.modules[__name__]
+    sys.modules[__name__] = _module
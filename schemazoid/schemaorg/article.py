@@ -0,0 +1,12 @@
+from schemazoid import micromodels as m
+
+from .creativework import CreativeWork
+
+
+class Article(CreativeWork):
+    """An article, such as a news article or piece of investigative report.
+    http://schema.org/Article
+    """
+    articleBody = m.CharField()
+    articleSection = m.CharField(intern=True)
+    wordCount = m.IntegerField()
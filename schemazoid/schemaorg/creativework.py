@@ -0,0 +1,24 @@
+from schemazoid import micromodels as m
+
+from .organization import Organization
+from .person import Person
+from .thing import Thing
+
+
+class CreativeWork(Thing):
+    """The most generic kind of creative work, including books, movies,
+    photographs, software programs, etc. http://schema.org/CreativeWork
+
+    Where Schema.org allows a Person or an Organization, ``author`` is a
+    Person and ``publisher`` an Organization. Both are shared by ``url``
+    within a scope of :mod:`schemazoid.micromodels.identity`.
+    """
+    author = m.ModelField(Person, identity='url')
+    dateCreated = m.DateTimeField()
+    dateModified = m.DateTimeField()
+    datePublished = m.DateTimeField()
+    headline = m.CharField()
+    inLanguage = m.CharField(intern=True)
+    keywords = m.ListField(of_type=m.CharField(intern=True))
+    publisher = m.ModelField(Organization, identity='url')
+    text = m.CharField()
@@ -0,0 +1,17 @@
+from schemazoid import micromodels as m
+
+from .organization import Organization
+from .thing import Thing
+
+
+class Offer(Thing):
+    """An offer to transfer some rights to an item or to provide a service.
+    http://schema.org/Offer
+    """
+    availability = m.CharField(intern=True)
+    price = m.FloatField()
+    priceCurrency = m.CharField(intern=True)
+    seller = m.ModelField(Organization, identity='url')
+    sku = m.CharField()
+    validFrom = m.DateTimeField()
+    validThrough = m.DateTimeField()
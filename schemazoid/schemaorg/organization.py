@@ -0,0 +1,16 @@
+from schemazoid import micromodels as m
+
+from .postaladdress import PostalAddress
+from .thing import Thing
+
+
+class Organization(Thing):
+    """An organization such as a school, NGO, corporation, club, etc.
+    http://schema.org/Organization
+    """
+    address = m.ModelField(PostalAddress)
+    email = m.CharField()
+    foundingDate = m.DateField()
+    legalName = m.CharField()
+    logo = m.CharField()
+    telephone = m.CharField()
@@ -0,0 +1,20 @@
+from schemazoid import micromodels as m
+
+from .organization import Organization
+from .postaladdress import PostalAddress
+from .thing import Thing
+
+
+class Person(Thing):
+    """A person (alive, dead, undead, or fictional).
+    http://schema.org/Person
+    """
+    additionalName = m.CharField()
+    address = m.ModelField(PostalAddress)
+    birthDate = m.DateField()
+    email = m.CharField()
+    familyName = m.CharField()
+    givenName = m.CharField()
+    jobTitle = m.CharField()
+    telephone = m.CharField()
+    worksFor = m.ModelField(Organization, identity='url')
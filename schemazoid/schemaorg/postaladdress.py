@@ -0,0 +1,13 @@
+from schemazoid import micromodels as m
+
+from .thing import Thing
+
+
+class PostalAddress(Thing):
+    """The mailing address. http://schema.org/PostalAddress"""
+    addressCountry = m.CharField(intern=True)
+    addressLocality = m.CharField()
+    addressRegion = m.CharField(intern=True)
+    postOfficeBoxNumber = m.CharField()
+    postalCode = m.CharField()
+    streetAddress = m.CharField()
@@ -0,0 +1,17 @@
+from schemazoid import micromodels as m
+
+from .offer import Offer
+from .organization import Organization
+from .thing import Thing
+
+
+class Product(Thing):
+    """Any offered product or service. http://schema.org/Product"""
+    brand = m.ModelField(Organization, identity='url')
+    color = m.CharField()
+    gtin13 = m.CharField()
+    manufacturer = m.ModelField(Organization, identity='url')
+    model = m.CharField()
+    offers = m.ListField(of_type=m.ModelField(Offer))
+    productID = m.CharField()
+    sku = m.CharField()
@@ -0,0 +1,12 @@
+from schemazoid import micromodels as m
+
+
+class Thing(m.Model):
+    """The most generic type of item. http://schema.org/Thing"""
+    name = m.CharField()
+    alternateName = m.CharField()
+    description = m.CharField()
+    identifier = m.CharField()
+    image = m.CharField()
+    sameAs = m.ListField(of_type=m.CharField())
+    url = m.CharField()
@@ -27,7 +27,7 @@ with open('README.rst') as thefile:
 setup(
     name="schemazoid",
     version=__version__,
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     author="Vince Veselosky",
     author_email="vince@veselosky.com",
     description="A lightweight data modeling framework for Python",
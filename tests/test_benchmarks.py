@@ -0,0 +1,89 @@
+import json
+import os
+import shutil
+import six
+import sys
+import tempfile
+import unittest
+
+# The benchmarks are not installed with the package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import suite  # noqa: E402
+from benchmarks.__main__ import main  # noqa: E402
+
+# A quick case, for running the suite from main.
+CASE = '^list.iterate$'
+
+
+def results(us_per_op):
+    """Return suite results with the given times per operation by case."""
+    return {'meta': {}, 'results': dict(
+        (name, {'us_per_op': us, 'seconds': us / 1e6, 'ops': 1})
+        for name, us in us_per_op.items())}
+
+
+class CompareTestCase(unittest.TestCase):
+
+    def test_at_threshold(self):
+        rows, regressions = suite.compare(results({'a.case': 2.5}),
+                                          results({'a.case': 2.0}), 0.25)
+        self.assertEqual(rows, [('a.case', 2.0, 2.5, 0.25)])
+        self.assertEqual(regressions, [])
+
+    def test_over_threshold(self):
+        current = results({'a.case': 2.5, 'b.case': 1.0})
+        baseline = results({'a.case': 2.0, 'b.case': 1.0})
+        rows, regressions = suite.compare(current, baseline, 0.2)
+        self.assertEqual(regressions, ['a.case'])
+        self.assertEqual([row[0] for row in rows], ['a.case', 'b.case'])
+
+    def test_faster(self):
+        rows, regressions = suite.compare(results({'a.case': 1.0}),
+                                          results({'a.case': 2.0}), 0.0)
+        self.assertEqual(rows, [('a.case', 2.0, 1.0, -0.5)])
+        self.assertEqual(regressions, [])
+
+    def test_cases_in_one_run_only(self):
+        current = results({'a.case': 1.0, 'new.case': 9.0})
+        baseline = results({'a.case': 1.0, 'old.case': 0.1})
+        rows, regressions = suite.compare(current, baseline, 0.1)
+        self.assertEqual([row[0] for row in rows], ['a.case'])
+        self.assertEqual(regressions, [])
+
+
+class MainTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.stdout = sys.stdout
+        sys.stdout = six.StringIO()
+
+    def tearDown(self):
+        sys.stdout = self.stdout
+        shutil.rmtree(self.directory)
+
+    def run_main(self, baseline_us):
+        baseline = os.path.join(self.directory, 'baseline.json')
+        with open(baseline, 'w') as baseline_file:
+            json.dump(results({'list.iterate': baseline_us}), baseline_file)
+        output = os.path.join(self.directory, 'output.json')
+        status = main(['-k', CASE, '--repeat', '1', '--output', output,
+                       '--baseline', baseline, '--threshold', '0.1'])
+        with open(output) as output_file:
+            self.assertEqual(list(json.load(output_file)['results']),
+                             ['list.iterate'])
+        return status
+
+    def test_no_regression(self):
+        self.assertEqual(self.run_main(1e9), 0)
+        self.assertFalse('regression' in sys.stdout.getvalue())
+
+    def test_regression(self):
+        self.assertEqual(self.run_main(1e-9), 1)
+        output = sys.stdout.getvalue()
+        self.assertTrue('1 regression(s) over 10%: list.iterate' in output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,13 @@
+import copy
+import json
+import operator
+import pickle
 import unittest
-from datetime import datetime
+from datetime import date, datetime
 from pytz import utc
 
 from schemazoid import micromodels as m
+from schemazoid.micromodels import profiling
 
 # TEST Add validators to Field
 # TEST Add required and null validation args to Field.
@@ -260,5 +265,1377 @@ class ModelFieldsProtocolTestCase(unittest.TestCase):
         self.assertTrue(isinstance(fields['birthday'], m.DateField))
 
 
+class CompiledUpdateTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class Person(m.Model):
+            name = m.CharField()
+            age = m.IntegerField()
+
+        self.Person = Person
+
+    def test_conversion(self):
+        person = self.Person({'name': 7, 'age': '42', 'extra': 'ignored'})
+        self.assertEqual(person.name, '7')
+        self.assertEqual(person.age, 42)
+        self.assertFalse(hasattr(person, 'extra'))
+
+    def test_recompiled_by_add_class_field(self):
+        self.Person.add_class_field('height', m.FloatField())
+        person = self.Person({'height': '1.8'})
+        self.assertEqual(person.height, 1.8)
+
+    def test_overwritten_class_field(self):
+        self.Person.add_class_field('age', m.FloatField())
+        person = self.Person(age='42')
+        self.assertTrue(isinstance(person.age, float))
+
+    def test_instance_fields_use_generic_path(self):
+        person = self.Person()
+        person.add_field('birthday', m.DateField())
+        person.update({'birthday': '1918-05-11', 'age': '69'})
+        self.assertEqual(person.birthday, date(1918, 5, 11))
+        self.assertEqual(person.age, 69)
+
+    def test_subclass_unaffected_by_parent_add_class_field(self):
+        class Student(self.Person):
+            school = m.CharField()
+
+        self.Person.add_class_field('height', m.FloatField())
+        student = Student({'height': '1.8', 'school': 'Caltech'})
+        self.assertFalse(hasattr(student, 'height'))
+        self.assertEqual(student.school, 'Caltech')
+
+    def test_custom_setattr(self):
+        class Shouter(self.Person):
+            def __setattr__(self, name, value):
+                if name == 'name':
+                    value = value.upper()
+                super(Shouter, self).__setattr__(name, value)
+
+        class Student(Shouter):
+            school = m.CharField()
+
+        for cls in (Shouter, Student):
+            person = cls({'name': 'eric', 'age': '18'})
+            self.assertEqual(person.name, 'ERIC')
+            self.assertEqual(person.age, 18)
+        self.assertFalse(self.Person._custom_setattr)
+
+
+class CompiledToDictTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class Pet(m.Model):
+            name = m.CharField()
+
+        class Person(m.Model):
+            name = m.CharField()
+            birthday = m.DateField()
+            pets = m.ListField(of_type=m.ModelField(Pet))
+
+        self.Person = Person
+        self.data = {'name': 'Ann', 'birthday': '1918-05-11',
+                     'pets': [{'name': 'Rex'}]}
+
+    def test_to_dict(self):
+        person = self.Person(self.data)
+        result = person.to_dict()
+        self.assertEqual(result['birthday'], date(1918, 5, 11))
+        self.assertTrue(result['pets'] is person.pets)
+
+    def test_to_serial(self):
+        person = self.Person(self.data)
+        self.assertEqual(person.to_serial(), self.data)
+
+    def test_unset_fields_omitted(self):
+        person = self.Person(name='Ann')
+        self.assertEqual(person.to_serial(), {'name': u'Ann'})
+
+    def test_recompiled_by_add_class_field(self):
+        self.Person.add_class_field('birthday', m.DateTimeField())
+        self.Person.add_class_field('height', m.FloatField())
+        person = self.Person(birthday='1918-05-11', height='1.8')
+        self.assertEqual(person.to_serial(),
+                         {'birthday': '1918-05-11T00:00:00', 'height': 1.8})
+
+    def test_instance_fields_use_generic_path(self):
+        person = self.Person(name='Ann')
+        person.add_field('wedding', m.DateField())
+        person.wedding = '1940-01-01'
+        self.assertEqual(person.to_serial(),
+                         {'name': u'Ann', 'wedding': '1940-01-01'})
+
+    def test_overridden_to_dict_used_by_to_serial(self):
+        class Tagged(self.Person):
+            def to_dict(self, serial=False):
+                result = super(Tagged, self).to_dict(serial)
+                result['tag'] = True
+                return result
+
+        self.assertEqual(Tagged(name='Ann').to_serial(),
+                         {'name': u'Ann', 'tag': True})
+
+
+class ProjectionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class CountingDateField(m.DateField):
+            calls = 0
+
+            def to_serial(self, data):
+                CountingDateField.calls += 1
+                return super(CountingDateField, self).to_serial(data)
+
+        class Person(m.Model):
+            name = m.CharField()
+            email = m.CharField()
+
+        class Article(m.Model):
+            name = m.CharField()
+            url = m.CharField()
+            datePublished = CountingDateField()
+            author = m.ModelField(Person)
+            contributors = m.ListField(of_type=m.ModelField(Person))
+
+        self.Article = Article
+        self.CountingDateField = CountingDateField
+        self.article = Article({
+            'name': 'News', 'url': 'http://example.com/news',
+            'datePublished': '2014-08-09',
+            'author': {'name': 'Ann', 'email': 'ann@example.com'},
+            'contributors': [{'name': 'Bob', 'email': 'bob@example.com'}],
+        })
+
+    def test_include(self):
+        result = self.article.to_serial(include=['name', 'datePublished'])
+        self.assertEqual(result, {'name': u'News',
+                                  'datePublished': '2014-08-09'})
+
+    def test_exclude(self):
+        result = self.article.to_dict(exclude=['author', 'contributors'])
+        self.assertEqual(sorted(result), ['datePublished', 'name', 'url'])
+
+    def test_excluded_fields_not_serialized(self):
+        self.CountingDateField.calls = 0
+        self.article.to_serial(exclude=['datePublished'])
+        self.assertEqual(self.CountingDateField.calls, 0)
+
+    def test_dotted_include(self):
+        result = self.article.to_serial(
+            include=['name', 'author.name', 'contributors.email'])
+        self.assertEqual(result, {
+            'name': u'News',
+            'author': {'name': u'Ann'},
+            'contributors': [{'email': u'bob@example.com'}],
+        })
+
+    def test_dotted_exclude(self):
+        result = self.article.to_serial(
+            exclude=['url', 'datePublished', 'author.email',
+                     'contributors.email'])
+        self.assertEqual(result, {
+            'name': u'News',
+            'author': {'name': u'Ann'},
+            'contributors': [{'name': u'Bob'}],
+        })
+
+    def test_native_values(self):
+        result = self.article.to_dict(include=['author.name',
+                                               'datePublished'])
+        self.assertEqual(result, {'author': {'name': u'Ann'},
+                                  'datePublished': date(2014, 8, 9)})
+
+    def test_whole_field_wins(self):
+        result = self.article.to_serial(include=['author.name', 'author'])
+        self.assertEqual(result, {'author': {'name': u'Ann',
+                                             'email': u'ann@example.com'}})
+
+    def test_include_and_exclude(self):
+        result = self.article.to_serial(include=['name', 'author'],
+                                        exclude=['author.email'])
+        self.assertEqual(result, {'name': u'News',
+                                  'author': {'name': u'Ann'}})
+
+    def test_single_string(self):
+        self.assertEqual(self.article.to_serial(include='name'),
+                         {'name': u'News'})
+
+    def test_unknown_names(self):
+        self.assertRaises(ValueError, self.article.to_serial,
+                          include=['name', 'nothing.here'])
+        self.assertRaises(ValueError, self.article.to_dict,
+                          exclude=['nmae'])
+        self.assertRaises(ValueError, self.article.to_serial,
+                          include=['contributors.nmae'])
+        article = self.Article(name='News')
+        article.author = None
+        self.assertRaises(ValueError, article.to_serial,
+                          exclude=['author.nmae'])
+        self.article.add_field('wordCount', m.IntegerField())
+        self.assertRaises(ValueError, self.article.to_serial,
+                          include=['wordCuont'])
+
+    def test_path_into_simple_field(self):
+        self.assertRaises(ValueError, self.article.to_serial,
+                          include=['name.first'])
+
+    def test_missing_nested_model(self):
+        article = self.Article(name='News')
+        article.author = None
+        self.assertEqual(article.to_serial(include=['author.name']),
+                         {'author': None})
+
+    def test_projection_cached(self):
+        include = frozenset(['name'])
+        first = self.Article._projection(True, include, None)
+        self.assertTrue(self.Article._projection(True, include, None)
+                        is first)
+        self.assertEqual(len(self.Article._projections), 1)
+
+    def test_cache_invalidated_by_add_class_field(self):
+        self.assertFalse('tags' in self.article.to_dict(exclude=['url']))
+        self.Article.add_class_field('tags', m.ListField())
+        self.article.tags = ['x']
+        self.assertEqual(self.article.to_dict(exclude=['url'])['tags'],
+                         ['x'])
+
+    def test_instance_fields(self):
+        self.article.add_field('wordCount', m.IntegerField())
+        self.article.wordCount = '300'
+        result = self.article.to_serial(include=['wordCount', 'author.name'])
+        self.assertEqual(result, {'wordCount': 300,
+                                  'author': {'name': u'Ann'}})
+
+    def test_lazy(self):
+        class LazyArticle(self.Article):
+            lazy = True
+
+        article = LazyArticle(name=u'News', url='http://example.com',
+                              author={'name': 'Ann', 'email': 'a@b.c'})
+        result = article.to_serial(include=['name', 'author.name'])
+        self.assertEqual(result, {'name': u'News',
+                                  'author': {'name': u'Ann'}})
+        self.assertTrue('name' in article._raw)
+
+    def test_deferred(self):
+        class Review(m.Model):
+            name = m.CharField()
+            author = m.ModelField(self.Article.get_class_field(
+                'author')._wrapped_class, deferred=True)
+
+        review = Review(name='Good',
+                        author={'name': 'Ann', 'email': 'a@b.c'})
+        self.assertEqual(review.to_serial(exclude=['author.email']),
+                         {'name': u'Good', 'author': {'name': u'Ann'}})
+        self.assertEqual(review.to_serial()['author']['email'], 'a@b.c')
+
+
+class TrackChangesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class CountingDateField(m.DateField):
+            calls = 0
+
+            def to_serial(self, data):
+                CountingDateField.calls += 1
+                return super(CountingDateField, self).to_serial(data)
+
+        class Person(m.Model):
+            track_changes = True
+            name = m.CharField()
+            birthday = CountingDateField()
+
+        class Team(m.Model):
+            track_changes = True
+            name = m.CharField()
+            founded = CountingDateField()
+            captain = m.ModelField(Person)
+            members = m.ListField(of_type=m.ModelField(Person))
+            scores = m.ListField(of_type=m.IntegerField())
+            extra = m.DictField()
+
+        self.CountingDateField = CountingDateField
+        self.Person = Person
+        self.Team = Team
+        self.team = Team({
+            'name': 'Reds', 'founded': '1900-01-01',
+            'captain': {'name': 'Ann', 'birthday': '1980-01-01'},
+            'members': [{'name': 'Bob', 'birthday': '1981-01-01'}],
+            'scores': [1, 2],
+            'extra': {'colour': 'red'},
+        })
+        self.expected = self.team.to_serial()
+        CountingDateField.calls = 0
+
+    def test_cached(self):
+        self.assertEqual(self.team.to_serial(), self.expected)
+        self.assertEqual(self.CountingDateField.calls, 0)
+
+    def test_set_field(self):
+        self.team.founded = '1901-01-01'
+        self.assertEqual(self.team.to_serial()['founded'], '1901-01-01')
+        self.assertEqual(self.CountingDateField.calls, 1)
+
+    def test_update(self):
+        self.team.update(name='Blues', founded='1902-02-02')
+        serial = self.team.to_serial()
+        self.assertEqual(serial['name'], u'Blues')
+        self.assertEqual(serial['founded'], '1902-02-02')
+
+    def test_list_changes(self):
+        scores = self.team.scores
+        scores.append('3')
+        self.assertEqual(self.team.to_serial()['scores'], [1, 2, 3])
+        scores[0] = 5
+        del scores[1]
+        scores.insert(0, 4)
+        self.assertEqual(self.team.to_serial()['scores'], [4, 5, 3])
+        scores[1:] = [6]
+        self.assertEqual(self.team.to_serial()['scores'], [4, 6])
+
+    def test_nested_model_changes(self):
+        self.team.captain.birthday = '1979-01-01'
+        serial = self.team.to_serial()
+        self.assertEqual(serial['captain']['birthday'], '1979-01-01')
+        # Only the captain's birthday was serialized again.
+        self.assertEqual(self.CountingDateField.calls, 1)
+
+    def test_models_in_list(self):
+        self.team.members[0].name = 'Rob'
+        self.assertEqual(self.team.to_serial()['members'][0]['name'],
+                         u'Rob')
+        self.team.members.append({'name': 'Cy'})
+        self.team.to_serial()
+        self.team.members[1].name = 'Cyd'
+        self.assertEqual(self.team.to_serial()['members'][1]['name'],
+                         u'Cyd')
+
+    def test_replaced_values_not_watched(self):
+        old_captain = self.team.captain
+        self.team.captain = {'name': 'Dee'}
+        self.assertEqual(old_captain._observers, [])
+        removed = self.team.members[0]
+        del self.team.members[0]
+        self.assertEqual(removed._observers, [])
+
+    def test_untracked_values_serialized_every_time(self):
+        self.team.extra['colour'] = 'blue'
+        self.assertEqual(self.team.to_serial()['extra'],
+                         {'colour': 'blue'})
+
+    def test_untracked_nested_class_not_cached(self):
+        class Plain(m.Model):
+            name = m.CharField()
+
+        class Holder(m.Model):
+            track_changes = True
+            plain = m.ModelField(Plain)
+
+        holder = Holder(plain={'name': 'a'})
+        holder.to_serial()
+        holder.plain.name = 'b'
+        self.assertEqual(holder.to_serial(), {'plain': {'name': u'b'}})
+
+    def test_add_class_field_discards_cache(self):
+        self.Team.add_class_field('founded', m.DateField(serial_format='%Y'))
+        self.assertEqual(self.team.to_serial()['founded'], '1900')
+
+    def test_compact(self):
+        class CompactPerson(self.Person):
+            compact = True
+
+        person = CompactPerson(name='Ann')
+        self.assertEqual(person.to_serial(), {'name': u'Ann'})
+        person.name = 'Bea'
+        self.assertEqual(person.to_serial(), {'name': u'Bea'})
+
+    def test_lazy(self):
+        class LazyTeam(self.Team):
+            lazy = True
+
+        team = LazyTeam(name='Reds', scores=[1])
+        self.assertEqual(team.to_serial(), {'name': u'Reds', 'scores': [1]})
+        team.scores.append(2)
+        self.assertEqual(team.to_serial()['scores'], [1, 2])
+
+    def test_untracked_models_unaffected(self):
+        class Plain(m.Model):
+            scores = m.ListField(of_type=m.IntegerField())
+
+        plain = Plain(scores=[1])
+        plain.scores.append(2)
+        self.assertTrue(plain._serial_cache is None)
+        self.assertTrue(plain.scores._observers is None)
+
+
+class DiffPatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class Person(m.Model):
+            name = m.CharField()
+            birthday = m.DateField()
+
+        class Team(m.Model):
+            name = m.CharField()
+            founded = m.DateField()
+            captain = m.ModelField(Person)
+            members = m.ListField(of_type=m.ModelField(Person))
+            scores = m.ListField(of_type=m.IntegerField())
+            extra = m.DictField()
+
+        self.Person = Person
+        self.Team = Team
+        self.data = {
+            'name': 'Reds', 'founded': '1900-01-01',
+            'captain': {'name': 'Ann', 'birthday': '1980-01-01'},
+            'members': [{'name': 'Bob'}, {'name': 'Cy'}, {'name': 'Di'}],
+            'scores': [1, 2, 3],
+            'extra': {'colour': 'red', 'kit': {'home': 'red'}},
+        }
+
+    def check(self, old, new):
+        """Patch a copy of old with its diff to new, check it matches new,
+        and return the patch after a trip through JSON.
+        """
+        patch = json.loads(json.dumps(old.diff(new)))
+        copy = self.Team(old.to_serial())
+        copy.apply_patch(patch)
+        self.assertEqual(copy.to_serial(), new.to_serial())
+        return patch
+
+    def test_no_changes(self):
+        old = self.Team(self.data)
+        self.assertEqual(old.diff(self.Team(self.data)), {})
+        self.assertEqual(old.diff(old), {})
+
+    def test_simple_field(self):
+        new = self.Team(self.data, founded='1901-02-03')
+        patch = self.check(self.Team(self.data), new)
+        self.assertEqual(patch, {'founded': {'value': '1901-02-03'}})
+
+    def test_set_and_unset(self):
+        old = self.Team(self.data)
+        new = self.Team(self.data)
+        del new.founded
+        del old.extra
+        patch = self.check(old, new)
+        self.assertEqual(patch['founded'], {'unset': True})
+        self.assertEqual(patch['extra'], {'value': self.data['extra']})
+
+    def test_nested_model(self):
+        new = self.Team(self.data)
+        new.captain.birthday = '1979-01-01'
+        patch = self.check(self.Team(self.data), new)
+        self.assertEqual(patch, {'captain': {'fields': {
+            'birthday': {'value': '1979-01-01'}}}})
+
+    def test_list_items(self):
+        new = self.Team(self.data)
+        new.members[1].name = 'Cyd'
+        new.scores.append(4)
+        patch = self.check(self.Team(self.data), new)
+        self.assertEqual(patch, {
+            'members': {'items': {'1': {'fields': {
+                'name': {'value': u'Cyd'}}}}},
+            'scores': {'append': [4]},
+        })
+
+    def test_list_shortened(self):
+        new = self.Team(self.data)
+        del new.scores[1:]
+        patch = self.check(self.Team(self.data), new)
+        self.assertEqual(patch, {'scores': {'length': 1}})
+
+    def test_list_mostly_changed(self):
+        new = self.Team(self.data)
+        new.scores.insert(0, 0)
+        patch = self.check(self.Team(self.data), new)
+        self.assertEqual(patch, {'scores': {'value': [0, 1, 2, 3]}})
+
+    def test_dict(self):
+        # DictField copies only the outer dictionary.
+        new = self.Team(copy.deepcopy(self.data))
+        new.extra['colour'] = 'blue'
+        new.extra['kit']['away'] = 'white'
+        new.extra['motto'] = 'Go'
+        del new.extra['kit']['home']
+        patch = self.check(self.Team(self.data), new)
+        self.assertEqual(patch, {'extra': {'keys': {
+            'colour': {'value': 'blue'},
+            'motto': {'value': 'Go'},
+            'kit': {'keys': {'away': {'value': 'white'},
+                             'home': {'unset': True}}},
+        }}})
+
+    def test_patched_in_place(self):
+        old = self.Team(self.data)
+        new = self.Team(self.data)
+        new.members[0].name = 'Rob'
+        members = old.members
+        first = old.members[0]
+        old.apply_patch(old.diff(new))
+        self.assertTrue(old.members is members)
+        self.assertTrue(old.members[0] is first)
+        self.assertEqual(first.name, u'Rob')
+
+    def test_values_converted(self):
+        team = self.Team(self.data)
+        team.apply_patch({'founded': {'value': '1999-12-31'},
+                          'captain': {'value': {'name': 'Eve'}},
+                          'unknown': {'value': 1}})
+        self.assertEqual(team.founded, date(1999, 12, 31))
+        self.assertTrue(isinstance(team.captain, self.Person))
+        self.assertFalse(hasattr(team, 'unknown'))
+
+    def test_invalid_patch(self):
+        team = self.Team(self.data)
+        self.assertRaises(ValueError, team.apply_patch,
+                          {'founded': {'fields': {}}})
+
+    def test_nested_patch_to_empty_target(self):
+        old = self.Team(self.data)
+        new = self.Team(copy.deepcopy(self.data))
+        new.captain.name = 'Ann B.'
+        new.scores.append(4)
+        new.extra['kit']['away'] = 'white'
+        patch = json.loads(json.dumps(old.diff(new)))
+        team = self.Team()
+        team.apply_patch(patch)
+        self.assertTrue(isinstance(team.captain, self.Person))
+        self.assertEqual(team.to_serial(), {
+            'captain': {'name': u'Ann B.'},
+            'scores': [4],
+            'extra': {'kit': {'away': 'white'}},
+        })
+        team = self.Team(captain=None)
+        team.apply_patch(patch)
+        self.assertEqual(team.captain.to_serial(), {'name': u'Ann B.'})
+
+    def test_list_items_missing(self):
+        new = self.Team(self.data)
+        new.members[1].name = 'Cyd'
+        patch = self.Team(self.data).diff(new)
+        self.assertRaises(ValueError, self.Team().apply_patch, patch)
+
+    def test_tracked_model(self):
+        class TrackedTeam(self.Team):
+            track_changes = True
+
+        team = TrackedTeam(self.data)
+        team.to_serial()
+        team.apply_patch({'scores': {'append': [4]},
+                          'founded': {'unset': True}})
+        serial = team.to_serial()
+        self.assertEqual(serial['scores'], [1, 2, 3, 4])
+        self.assertFalse('founded' in serial)
+
+    def test_lazy_model(self):
+        class LazyTeam(self.Team):
+            lazy = True
+
+        team = LazyTeam(self.data)
+        team.apply_patch({'founded': {'unset': True}})
+        self.assertFalse('founded' in team.to_serial())
+
+
+class FieldCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class Person(m.Model):
+            name = m.CharField()
+            birthday = m.DateTimeField()
+
+        self.Person = Person
+
+    def test_shared_by_instances_without_instance_fields(self):
+        first, second = self.Person(), self.Person()
+        self.assertTrue(first.get_all_fields() is second.get_all_fields())
+        info = self.Person.field_cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 0))
+
+    def test_instance_fields_cached(self):
+        person = self.Person()
+        person.add_field('age', m.IntegerField())
+        fields = person.get_all_fields()
+        self.assertTrue(person.get_all_fields() is fields)
+        self.assertTrue(isinstance(fields['age'], m.IntegerField))
+        info = self.Person.field_cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_add_field_invalidates(self):
+        person = self.Person()
+        person.add_field('age', m.IntegerField())
+        person.get_all_fields()
+        person.add_field('birthday', m.DateField())
+        self.assertTrue(isinstance(person.get_all_fields()['birthday'],
+                                   m.DateField))
+        self.assertEqual(self.Person.field_cache_info().misses, 2)
+
+    def test_add_class_field_invalidates(self):
+        person = self.Person()
+        person.add_field('age', m.IntegerField())
+        person.get_all_fields()
+        self.Person.add_class_field('height', m.FloatField())
+        self.assertTrue('height' in person.get_all_fields())
+        info = self.Person.field_cache_info()
+        self.assertEqual((info.misses, info.version), (2, 1))
+
+    def test_read_only(self):
+        person = self.Person()
+        fields = person.get_all_fields()
+        self.assertRaises(TypeError, fields.__setitem__, 'age',
+                          m.IntegerField())
+        self.assertRaises(TypeError, fields.pop, 'name')
+        self.assertRaises(TypeError, fields.update, {})
+        self.assertEqual(sorted(self.Person.get_class_fields()),
+                         ['birthday', 'name'])
+        person.add_field('age', m.IntegerField())
+        self.assertRaises(TypeError, person.get_all_fields().clear)
+        copy = dict(person.get_all_fields())
+        copy['height'] = m.FloatField()
+        self.assertFalse('height' in person.get_all_fields())
+
+
+class CompactModelTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class Person(m.Model):
+            compact = True
+            name = m.CharField()
+            birthday = m.DateTimeField()
+
+        class Student(Person):
+            school = m.CharField()
+
+        self.Person = Person
+        self.Student = Student
+        self.data = {'name': 'Eric', 'birthday': '1995-08-09T12:21:00Z',
+                     'school': 'no way dude'}
+
+    def test_no_instance_dict(self):
+        person = self.Person(self.data)
+        self.assertFalse(hasattr(person, '__dict__'))
+        self.assertEqual(person.name, 'Eric')
+        self.assertTrue(isinstance(person.birthday, datetime))
+
+    def test_subclass_is_compact(self):
+        student = self.Student(self.data)
+        self.assertFalse(hasattr(student, '__dict__'))
+        self.assertEqual(student.school, 'no way dude')
+
+    def test_unset_fields_omitted(self):
+        person = self.Person(name='Eric')
+        self.assertFalse(hasattr(person, 'birthday'))
+        self.assertEqual(person.to_dict(), {'name': 'Eric'})
+
+    def test_to_serial(self):
+        serial = self.Person(self.data).to_serial()
+        self.assertEqual(serial, {'name': 'Eric',
+                                  'birthday': '1995-08-09T12:21:00+00:00'})
+
+    def test_update(self):
+        person = self.Person(self.data)
+        person.update(name='Graham')
+        self.assertEqual(person.name, 'Graham')
+
+    def test_undeclared_attribute(self):
+        person = self.Person()
+        self.assertRaises(AttributeError, setattr, person, 'age', 18)
+
+    def test_add_field_on_declared_name(self):
+        person = self.Person(self.data)
+        person.add_field('birthday', m.DateField())
+        person.birthday = '1995-08-09'
+        self.assertEqual(person.birthday, date(1995, 8, 9))
+
+    def test_add_class_field(self):
+        self.Person.add_class_field('name', m.IntegerField())
+        self.assertEqual(self.Person(name='12').name, 12)
+        self.assertRaises(TypeError, self.Person.add_class_field, 'age',
+                          m.IntegerField())
+
+    def test_plain_model(self):
+        # Model itself has no __dict__, but its instances still do.
+        x = m.Model()
+        x.add_field('a', m.CharField())
+        x.a = 5
+        x.other = 'anything'
+        self.assertEqual(x.to_dict(), {'a': '5'})
+        self.assertTrue(isinstance(x, m.Model))
+        copy = pickle.loads(pickle.dumps(x, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(copy.to_dict(), {'a': '5'})
+        self.assertEqual(copy.other, 'anything')
+        self.assertEqual(m.Model(a=1).to_dict(), {})
+
+    def test_fields_named_like_options(self):
+        class Settings(m.Model):
+            compact = m.CharField()
+            lazy = m.BooleanField()
+            track_changes = m.IntegerField()
+
+        self.assertEqual(
+            (Settings._compact, Settings._lazy, Settings._track_changes),
+            (False, False, False))
+        settings = Settings(compact='yes', lazy='true', track_changes='1')
+        self.assertTrue(hasattr(settings, '__dict__'))
+        self.assertEqual(settings.to_dict(), {
+            'compact': 'yes', 'lazy': True, 'track_changes': 1})
+
+        class CompactSettings(m.Model):
+            compact = True
+            lazy = m.BooleanField()
+
+        settings = CompactSettings(lazy='true')
+        self.assertFalse(hasattr(settings, '__dict__'))
+        self.assertFalse(CompactSettings._lazy)
+        self.assertEqual(settings.lazy, True)
+
+
+class FromRecordsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class Event(m.Model):
+            name = m.CharField()
+            attendees = m.IntegerField()
+            startDate = m.DateField()
+
+        self.Event = Event
+        self.records = [
+            {'name': 'Launch', 'attendees': '12', 'startDate': '2014-08-09'},
+            {'name': 'Party', 'other': 'ignored'},
+            {},
+        ]
+
+    def assertSameModels(self, result, expected):
+        self.assertEqual(len(result), len(expected))
+        for got, want in zip(result, expected):
+            self.assertTrue(type(got) is type(want))
+            self.assertEqual(got.to_dict(), want.to_dict())
+
+    def test_same_as_constructor(self):
+        result = self.Event.from_records(self.records)
+        expected = [self.Event(record) for record in self.records]
+        self.assertSameModels(result, expected)
+        self.assertEqual(result[0].startDate, date(2014, 8, 9))
+        self.assertFalse(hasattr(result[1], 'attendees'))
+
+    def test_iterable(self):
+        result = self.Event.from_records(iter(self.records))
+        self.assertEqual(len(result), 3)
+
+    def test_compact(self):
+        class CompactEvent(m.Model):
+            compact = True
+            name = m.CharField()
+            attendees = m.IntegerField()
+
+        result = CompactEvent.from_records(self.records)
+        self.assertEqual(result[0].to_dict(), {'name': 'Launch',
+                                               'attendees': 12})
+        self.assertEqual(result[2].to_dict(), {})
+
+    def test_instances_usable(self):
+        event = self.Event.from_records(self.records)[0]
+        event.add_field('venue', m.CharField())
+        event.venue = 42
+        self.assertEqual(event.venue, '42')
+
+    def test_custom_init(self):
+        class Meeting(self.Event):
+            def __init__(self, *args, **kwargs):
+                super(Meeting, self).__init__(*args, **kwargs)
+                self.seen = True
+
+        result = Meeting.from_records(self.records)
+        self.assertTrue(all(meeting.seen for meeting in result))
+
+    def test_custom_update(self):
+        class Meeting(self.Event):
+            def update(self, *args, **kwargs):
+                super(Meeting, self).update(*args, **kwargs)
+                self.seen = True
+
+        result = Meeting.from_records(self.records)
+        self.assertTrue(all(meeting.seen for meeting in result))
+
+    def test_custom_setattr(self):
+        class Meeting(self.Event):
+            def __setattr__(self, name, value):
+                if name == 'name':
+                    value = value.upper()
+                super(Meeting, self).__setattr__(name, value)
+
+        result = Meeting.from_records(self.records)
+        self.assertEqual([meeting.to_dict().get('name') for meeting in result],
+                         ['LAUNCH', 'PARTY', None])
+
+    def test_invalid_value(self):
+        records = [{'attendees': 'many'}]
+        self.assertRaises(ValueError, self.Event.from_records, records)
+
+
+class LazyModelTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class Person(m.Model):
+            lazy = True
+            name = m.CharField()
+            age = m.IntegerField()
+            birthday = m.DateField()
+            tags = m.ListField()
+
+        self.Person = Person
+        self.data = {'name': u'Eric', 'age': '18', 'birthday': '1995-08-09',
+                     'tags': ['student'], 'other': 'ignored'}
+
+    def test_converted_on_access(self):
+        person = self.Person(self.data)
+        self.assertFalse('age' in vars(person))
+        self.assertEqual(person.age, 18)
+        self.assertEqual(vars(person)['age'], 18)
+        self.assertEqual(person.birthday, date(1995, 8, 9))
+        self.assertFalse(hasattr(person, 'other'))
+        self.assertRaises(AttributeError, getattr, person, 'missing')
+
+    def test_input_not_modified(self):
+        person = self.Person(self.data, name='Graham')
+        person.age
+        self.assertEqual(self.data['age'], '18')
+        self.assertEqual(person.name, 'Graham')
+
+    def test_errors_on_access(self):
+        person = self.Person(age='eighteen')
+        self.assertRaises(ValueError, getattr, person, 'age')
+        self.assertRaises(ValueError, person.validate)
+        self.assertRaises(ValueError, person.to_dict)
+
+    def test_validate(self):
+        person = self.Person(self.data)
+        person.validate()
+        self.assertEqual(vars(person)['birthday'], date(1995, 8, 9))
+
+    def test_set_replaces_raw(self):
+        person = self.Person(self.data)
+        person.age = 19.5
+        self.assertEqual(person.age, 19)
+        person.update(birthday='1995-08-10')
+        self.assertEqual(person.birthday, date(1995, 8, 10))
+        self.assertEqual(person.to_serial()['birthday'], '1995-08-10')
+
+    def test_to_dict(self):
+        person = self.Person(self.data)
+        self.assertEqual(person.to_dict(), {
+            'name': 'Eric', 'age': 18, 'birthday': date(1995, 8, 9),
+            'tags': ['student']})
+
+    def test_to_serial_passes_through(self):
+        person = self.Person(self.data)
+        serial = person.to_serial()
+        self.assertEqual(serial, {'name': 'Eric', 'age': 18,
+                                  'birthday': '1995-08-09',
+                                  'tags': ['student']})
+        # Values already in serial form are not converted, others are.
+        self.assertFalse('name' in vars(person))
+        self.assertFalse('tags' in vars(person))
+        self.assertTrue('age' in vars(person))
+
+    def test_add_field_uses_raw_value(self):
+        person = self.Person(self.data)
+        person.add_field('other', m.CharField())
+        self.assertEqual(person.other, 'ignored')
+
+    def test_compact(self):
+        class CompactPerson(m.Model):
+            compact = True
+            lazy = True
+            name = m.CharField()
+            age = m.IntegerField()
+
+        person = CompactPerson(self.data)
+        self.assertFalse(hasattr(person, '__dict__'))
+        self.assertEqual(person.age, 18)
+        self.assertEqual(person.to_serial(), {'name': 'Eric', 'age': 18})
+
+    def test_from_records(self):
+        people = self.Person.from_records([self.data])
+        self.assertEqual(people[0].age, 18)
+
+
+# Pickling and parse_many need classes defined at the top level of a module.
+class PickledModel(m.Model):
+    name = m.CharField()
+    count = m.IntegerField()
+    when = m.DateField()
+
+
+class CompactPickledModel(m.Model):
+    compact = True
+    name = m.CharField()
+    count = m.IntegerField()
+
+
+class LazyPickledModel(m.Model):
+    lazy = True
+    name = m.CharField()
+    count = m.IntegerField()
+
+
+class ExtendedPickledModel(m.Model):
+    name = m.CharField()
+
+
+class TrackedChildModel(m.Model):
+    track_changes = True
+    name = m.CharField()
+
+
+class TrackedPickledModel(m.Model):
+    track_changes = True
+    name = m.CharField()
+    children = m.ListField(of_type=m.ModelField(TrackedChildModel))
+
+
+class PicklingTestCase(unittest.TestCase):
+
+    def round_trip(self, obj):
+        return pickle.loads(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+
+    def test_model(self):
+        model = PickledModel(name='a', count='2', when='2010-07-13')
+        copy = self.round_trip(model)
+        self.assertTrue(type(copy) is PickledModel)
+        self.assertEqual(copy.to_dict(), model.to_dict())
+
+    def test_compact(self):
+        model = CompactPickledModel(name='a')
+        copy = self.round_trip(model)
+        self.assertEqual(copy.to_dict(), {'name': u'a'})
+        self.assertFalse(hasattr(copy, 'count'))
+
+    def test_values_not_converted_again(self):
+        model = PickledModel(count=2)
+        state = model.__getstate__()
+        self.assertEqual(state, {'count': 2})
+
+    def test_lazy_stays_lazy(self):
+        model = LazyPickledModel(name='a', count='x')
+        copy = self.round_trip(model)
+        self.assertEqual(copy.name, u'a')
+        self.assertRaises(ValueError, getattr, copy, 'count')
+
+    def test_instance_fields(self):
+        model = CompactPickledModel(count=2)
+        model.add_field('count', m.FloatField())
+        copy = self.round_trip(model)
+        self.assertTrue(isinstance(copy.get_field('count'), m.FloatField))
+        copy.count = '1.5'
+        self.assertEqual(copy.count, 1.5)
+
+    def test_class_fields_added_on_unpickling(self):
+        ExtendedPickledModel.add_class_field('extra', m.IntegerField())
+        data = pickle.dumps(ExtendedPickledModel(name='a', extra='3'))
+        # As if unpickled in a process where the field was never added.
+        del ExtendedPickledModel._clsfields['extra']
+        del ExtendedPickledModel._added_fields['extra']
+        copy = pickle.loads(data)
+        self.assertTrue(ExtendedPickledModel.get_class_field('extra'))
+        self.assertEqual(copy.to_dict(), {'name': u'a', 'extra': 3})
+
+    def test_tracked_model(self):
+        model = TrackedPickledModel(name='a', children=[{'name': 'b'}])
+        model.to_serial()
+        copy = self.round_trip(model)
+        self.assertTrue(copy._serial_cache is None)
+        self.assertEqual(copy.to_serial(), model.to_serial())
+        copy.children.append({'name': 'c'})
+        self.assertEqual(len(copy.to_serial()['children']), 2)
+        copy.children[0].name = 'd'
+        self.assertEqual(copy.to_serial()['children'][0]['name'], u'd')
+
+    def test_field_with_cache(self):
+        field = m.DateTimeField(cache=10)
+        field.to_python('2010-07-13')
+        copy = self.round_trip(field)
+        self.assertEqual(copy.cache.maxsize, 10)
+        self.assertEqual(len(copy.cache), 0)
+
+
+class ParseManyTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [{'name': 'n%d' % i, 'count': str(i)}
+                        for i in range(10)]
+        self.expected = [{'name': u'n%d' % i, 'count': i} for i in range(10)]
+
+    def test_in_process(self):
+        result = PickledModel.parse_many(self.records, workers=0,
+                                         chunk_size=3)
+        self.assertEqual([model.to_dict() for model in result],
+                         self.expected)
+
+    def test_workers(self):
+        result = list(CompactPickledModel.parse_many(
+            iter(self.records), workers=2, chunk_size=3))
+        self.assertTrue(all(type(model) is CompactPickledModel
+                            for model in result))
+        self.assertEqual([model.to_dict() for model in result],
+                         self.expected)
+
+    def test_serial_unordered(self):
+        result = list(PickledModel.parse_many(
+            self.records, workers=2, chunk_size=2, serial=True,
+            ordered=False))
+        self.assertEqual(sorted(result, key=operator.itemgetter('count')),
+                         self.expected)
+
+    def test_errors_raised(self):
+        records = self.records + [{'count': 'x'}]
+        result = PickledModel.parse_many(records, workers=2, chunk_size=3)
+        self.assertRaises(ValueError, list, result)
+
+    def test_invalid_chunk_size(self):
+        result = PickledModel.parse_many(self.records, chunk_size=0)
+        self.assertRaises(ValueError, list, result)
+
+
+class ProfilingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class Child(m.Model):
+            name = m.CharField()
+
+        class Parent(m.Model):
+            count = m.IntegerField()
+            when = m.DateField()
+            child = m.ModelField(Child)
+        self.Child = Child
+        self.Parent = Parent
+        self.data = {'count': '3', 'when': '2014-08-09',
+                     'child': {'name': 'a'}}
+
+    def tearDown(self):
+        profiling.disable()
+
+    def test_construct_and_serialize(self):
+        with profiling.profile() as stats:
+            parent = self.Parent(self.data)
+            parent.count = '4'
+            parent.to_serial()
+        report = stats.as_dict()
+        self.assertEqual(report[self.Parent]['count']['to_python']['calls'], 2)
+        self.assertEqual(report[self.Parent]['when']['to_serial']['calls'], 1)
+        self.assertEqual(report[self.Child]['name']['to_python']['calls'], 1)
+        self.assertEqual(report[self.Parent]['child']['to_serial']['failures'],
+                         0)
+        child = report[self.Parent]['child']['to_python']
+        name = report[self.Child]['name']['to_python']
+        self.assertTrue(child['seconds'] >= name['seconds'])
+        # Fields without conversions to serialize are copied, not called.
+        self.assertFalse('to_serial' in report[self.Parent]['count'])
+
+    def test_failures(self):
+        with profiling.profile() as stats:
+            self.assertRaises(ValueError, self.Parent, count='x')
+        count = stats.as_dict()[self.Parent]['count']['to_python']
+        self.assertEqual((count['calls'], count['failures']), (1, 1))
+
+    def test_from_records_and_projection(self):
+        with profiling.profile() as stats:
+            parents = self.Parent.from_records([self.data] * 3)
+            parents[0].to_serial(include=['child.name'])
+        report = stats.as_dict()[self.Parent]
+        self.assertEqual(report['when']['to_python']['calls'], 3)
+        self.assertEqual(report['child']['projection']['calls'], 1)
+
+    def test_lazy(self):
+        class Lazy(m.Model):
+            lazy = True
+            count = m.IntegerField()
+        with profiling.profile() as stats:
+            Lazy(count='1').count
+        self.assertEqual(
+            stats.as_dict()[Lazy]['count']['to_python']['calls'], 1)
+
+    def test_same_class_names(self):
+        first = self.Child
+
+        class Child(m.Model):
+            name = m.CharField()
+        with profiling.profile() as stats:
+            first(name='a')
+            Child(name='b')
+            Child(name='c')
+        report = stats.as_dict()
+        self.assertEqual(report[first]['name']['to_python']['calls'], 1)
+        self.assertEqual(report[Child]['name']['to_python']['calls'], 2)
+        self.assertEqual(len(stats.table().splitlines()), 4)
+
+    def test_instance_fields(self):
+        with profiling.profile() as stats:
+            parent = self.Parent(count='1')
+            parent.add_field('extra', m.IntegerField())
+            parent.extra = '2'
+            parent.update(extra='3', count='4')
+        report = stats.as_dict()[self.Parent]
+        self.assertEqual(report['extra']['to_python']['calls'], 2)
+        self.assertEqual(report['count']['to_python']['calls'], 2)
+
+    def test_off_by_default(self):
+        self.assertFalse(profiling.is_enabled())
+        with profiling.profile() as stats:
+            self.assertTrue(profiling.is_enabled())
+        self.assertFalse(profiling.is_enabled())
+        self.Parent(self.data)
+        self.assertEqual(stats.as_dict(), {})
+        to_python = self.Parent._to_python['count']
+        self.assertEqual(to_python, self.Parent.get_class_field('count')
+                         .to_python)
+
+    def test_nested_and_global(self):
+        outer = profiling.enable()
+        with profiling.profile() as inner:
+            self.Parent(count='1')
+        self.Parent(count='2')
+        self.assertTrue(profiling.disable() is outer)
+        self.assertEqual(
+            inner.as_dict()[self.Parent]['count']['to_python']['calls'], 1)
+        self.assertEqual(
+            outer.as_dict()[self.Parent]['count']['to_python']['calls'], 1)
+
+    def test_class_created_while_enabled(self):
+        with profiling.profile() as stats:
+            class Late(m.Model):
+                name = m.CharField()
+            Late(name='a')
+        self.assertEqual(
+            stats.as_dict()[Late]['name']['to_python']['calls'], 1)
+
+    def test_reset_and_table(self):
+        with profiling.profile() as stats:
+            self.Parent(self.data)
+            table = stats.table()
+            stats.reset()
+        self.assertEqual(table.splitlines()[0].split(),
+                         ['class', 'field', 'method', 'calls', 'failures',
+                          'total', 'ms', 'us/call'])
+        self.assertEqual(len(table.splitlines()), 6)
+        self.assertEqual(stats.as_dict(), {})
+
+
+class ConstructTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class Person(m.Model):
+            name = m.CharField()
+            birthday = m.DateField(serial_format='%d/%m/%Y')
+
+        class Team(m.Model):
+            name = m.CharField()
+            size = m.IntegerField()
+            active = m.BooleanField()
+            founded = m.DateTimeField()
+            captain = m.ModelField(Person)
+            members = m.ListField(of_type=m.ModelField(Person))
+            scores = m.ListField(of_type=m.IntegerField())
+            tags = m.ListField()
+            extra = m.DictField()
+
+        self.Person = Person
+        self.Team = Team
+        self.team = Team(
+            name='Stooges', size='3', active='true',
+            founded='1934-05-05T00:00:00', captain={'name': 'Moe',
+                                                    'birthday': '1897-06-19'},
+            members=[{'name': 'Larry', 'birthday': '1902-10-05'},
+                     {'name': 'Curly'}],
+            scores=['1', 2], tags=['a'], extra={'k': [1]})
+
+    def test_trusted_serial(self):
+        serial = self.team.to_serial()
+        team = self.Team.construct(serial)
+        self.assertEqual(team.to_serial(), serial)
+        self.assertEqual(team.to_dict().keys(), self.team.to_dict().keys())
+        self.assertEqual(team.founded, self.team.founded)
+        self.assertEqual(team.captain.birthday, date(1897, 6, 19))
+        self.assertTrue(isinstance(team.members[0], self.Person))
+        self.assertEqual(team.members[0].birthday, date(1902, 10, 5))
+        self.assertTrue(isinstance(team.scores, m.fields.complex.TypedList))
+        team.scores.append('3')
+        self.assertEqual(team.scores[-1], 3)
+
+    def test_native(self):
+        native = self.team.to_dict()
+        native_serial = self.team.to_serial()
+        team = self.Team.construct(native, native=True)
+        self.assertEqual(team.to_serial(), self.team.to_serial())
+        self.assertEqual(team.founded, self.team.founded)
+        self.assertFalse(team.captain is self.team.captain)
+        self.assertFalse(team.members[0] is self.team.members[0])
+        self.assertFalse(team.members is self.team.members)
+        team.captain.name = 'Someone else'
+        team.members[0].name = 'Someone else'
+        self.assertEqual(self.team.to_serial(), native_serial)
+        self.assertTrue(isinstance(team.members, m.fields.complex.TypedList))
+        nested = self.Team.construct(
+            dict(native, captain=self.team.captain.to_dict()), native=True)
+        self.assertEqual(nested.captain.birthday, date(1897, 6, 19))
+
+    def test_skips_conversion(self):
+        team = self.Team.construct({'size': '3', 'unknown': 1})
+        self.assertEqual(team.size, '3')
+        self.assertFalse(hasattr(team, 'unknown'))
+        self.assertRaises(ValueError, self.Team.construct, {'size': 'x'},
+                          trusted=False)
+        self.assertEqual(self.Team.construct({'size': '3'},
+                                             trusted=False).size, 3)
+
+    def test_empty_and_none(self):
+        team = self.Team.construct({'captain': None, 'members': None})
+        self.assertTrue(team.captain is None)
+        self.assertEqual(team.members, [])
+        self.assertEqual(team.to_dict(), {'captain': None, 'members': []})
+
+    def test_class_options(self):
+        class Compact(m.Model):
+            compact = True
+            lazy = True
+            name = m.CharField()
+
+        class Tracked(m.Model):
+            track_changes = True
+            name = m.CharField()
+            children = m.ListField(of_type=m.ModelField(TrackedChildModel))
+
+        compact = Compact.construct({'name': u'a'})
+        self.assertEqual(compact.to_dict(), {'name': u'a'})
+        compact.name = 'b'
+        self.assertEqual(compact.to_serial(), {'name': u'b'})
+
+        tracked = Tracked.construct({'name': u'a',
+                                     'children': [{'name': u'b'}]})
+        self.assertEqual(tracked.to_serial()['children'], [{'name': u'b'}])
+        tracked.children[0].name = 'c'
+        tracked.children.append({'name': 'd'})
+        self.assertEqual(tracked.to_serial()['children'],
+                         [{'name': u'c'}, {'name': u'd'}])
+
+    def test_add_class_field(self):
+        self.Person.construct({'name': u'a'})
+        self.Person.add_class_field('age', m.IntegerField())
+        self.assertEqual(self.Person.construct({'age': 3}).age, 3)
+
+    def test_deferred(self):
+        class Holder(m.Model):
+            person = m.ModelField(self.Person, deferred=True)
+
+        holder = Holder.construct({'person': {'name': u'a'}})
+        deferred = m.fields.complex.DeferredModel
+        self.assertTrue(isinstance(holder.person, deferred))
+        self.assertEqual(holder.person.name, u'a')
+
+    def test_profiled(self):
+        with profiling.profile() as stats:
+            self.Team.construct(self.team.to_serial())
+        report = stats.as_dict()[self.Team]
+        self.assertEqual(report['members']['construct']['calls'], 1)
+        self.assertFalse('name' in report)
+
+
+class ValidateRawTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class Person(m.Model):
+            name = m.CharField()
+            birthday = m.DateField()
+
+        class Team(m.Model):
+            name = m.CharField()
+            size = m.IntegerField()
+            captain = m.ModelField(Person)
+            reserve = m.ModelField(Person, deferred=True)
+            members = m.ListField(of_type=m.ModelField(Person))
+            scores = m.ListField(of_type=m.IntegerField(), lazy=True)
+            tags = m.ListField()
+            extra = m.DictField()
+
+        self.Team = Team
+        self.valid = {
+            'name': 'Stooges', 'size': '3',
+            'captain': {'name': 'Moe', 'birthday': '1897-06-19'},
+            'reserve': {'birthday': '1903-10-22'},
+            'members': [{'name': 'Larry'}, {'birthday': '1902-10-05'}],
+            'scores': ['1', 2], 'tags': 'a', 'extra': {'k': 1},
+            'unknown': object()}
+
+    def test_valid(self):
+        self.assertEqual(self.Team.validate_raw(self.valid), [])
+        self.assertEqual(self.Team.validate_raw({}), [])
+
+    def test_errors(self):
+        data = dict(self.valid, size='x', reserve={'birthday': 'never'},
+                    members=[{'name': 'Larry'}, 'Curly',
+                             {'birthday': '1902-13-05'}],
+                    scores=['1', 'two', 'three'], extra=3)
+        errors = self.Team.validate_raw(data)
+        paths = sorted(error.path for error in errors)
+        self.assertEqual(paths, sorted([
+            ('size',), ('reserve', 'birthday'), ('members', 1),
+            ('members', 2, 'birthday'), ('scores', 1), ('scores', 2),
+            ('extra',)]))
+        for error in errors:
+            self.assertTrue(isinstance(error.error, (TypeError, ValueError)))
+        size = [error for error in errors if error.path == ('size',)][0]
+        self.assertEqual(size.value, 'x')
+        self.assertRaises(type(size.error), self.Team, size='x')
+
+    def test_overflow(self):
+        class Count(m.Model):
+            n = m.IntegerField()
+            ns = m.ListField(of_type=m.IntegerField())
+
+        errors = Count.validate_raw({'n': float('inf'),
+                                     'ns': [1, float('inf')]})
+        self.assertEqual([error.path for error in errors],
+                         [('n',), ('ns', 1)])
+        for error in errors:
+            self.assertTrue(isinstance(error.error, OverflowError))
+        errors = []
+        m.IntegerField().check_raw(float('inf'), ('n',), errors)
+        self.assertEqual(len(errors), 1)
+
+    def test_fail_fast(self):
+        data = dict(self.valid, size='x', scores=['a', 'b'])
+        self.assertEqual(len(self.Team.validate_raw(data, fail_fast=True)),
+                         1)
+        data = dict(self.valid, scores=['a', 'b'])
+        errors = self.Team.validate_raw(data, fail_fast=True)
+        self.assertEqual([error.path for error in errors], [('scores', 0)])
+
+    def test_not_a_dictionary(self):
+        errors = self.Team.validate_raw(['name'])
+        self.assertEqual(errors[0].path, ())
+        self.assertTrue(isinstance(errors[0].error, TypeError))
+
+    def test_no_models_built(self):
+        built = []
+
+        class Counted(m.Model):
+            name = m.CharField()
+
+            def __init__(self, *args, **kwargs):
+                built.append(self)
+                super(Counted, self).__init__(*args, **kwargs)
+
+        class Holder(m.Model):
+            lazy = True
+            counted = m.ModelField(Counted)
+            many = m.ListField(of_type=m.ModelField(Counted))
+
+        data = {'counted': {'name': 'a'}, 'many': [{'name': 'b'}]}
+        self.assertEqual(Holder.validate_raw(data), [])
+        self.assertEqual(built, [])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,108 @@
+import pickle
+import sys
+import unittest
+
+from schemazoid import micromodels as m
+
+
+class LRUCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = m.LRUCache(maxsize=3)
+        for key in 'abc':
+            self.cache.put(key, key.upper())
+
+    def test_get(self):
+        self.assertEqual(self.cache.get('a'), 'A')
+        self.assertEqual(self.cache.get('z'), None)
+        self.assertEqual(self.cache.get('z', 'missing'), 'missing')
+        info = self.cache.info()
+        self.assertEqual((info.hits, info.misses), (1, 2))
+
+    def test_evicts_least_recently_used(self):
+        self.cache.get('a')
+        self.cache.put('d', 'D')
+        self.assertFalse('b' in self.cache)
+        self.assertTrue('a' in self.cache)
+        self.cache.put('e', 'E')
+        self.assertFalse('c' in self.cache)
+        info = self.cache.info()
+        self.assertEqual((info.evictions, info.currsize), (2, 3))
+
+    def test_put_existing(self):
+        self.cache.put('a', 'a')
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(self.cache.get('a'), 'a')
+
+    def test_clear(self):
+        self.cache.get('a')
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.info(), (0, 0, 0, 3, 0))
+        self.cache.put('a', 'A')
+        self.assertEqual(self.cache.get('a'), 'A')
+
+    def test_hit_rate(self):
+        self.assertEqual(self.cache.hit_rate(), 0.0)
+        self.cache.get('a')
+        self.cache.get('a')
+        self.cache.get('z')
+        self.assertEqual(self.cache.hit_rate(), 2 / 3.0)
+
+    def test_maxsize(self):
+        self.assertRaises(ValueError, m.LRUCache, 0)
+
+
+def make_string(text):
+    """Return a new string object equal to ``text``."""
+    return ''.join(list(text))
+
+
+class StringPoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = m.StringPool(maxsize=2)
+
+    def test_intern(self):
+        first = self.pool.intern(make_string('en'))
+        second = make_string('en')
+        self.assertFalse(second is first)
+        self.assertTrue(self.pool.intern(second) is first)
+        self.assertTrue('en' in self.pool)
+        info = self.pool.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+        self.assertEqual(info.bytes_saved, sys.getsizeof(second))
+
+    def test_intern_pooled(self):
+        first = self.pool.intern(make_string('en'))
+        self.assertTrue(self.pool.intern(first) is first)
+        info = self.pool.info()
+        self.assertEqual((info.hits, info.bytes_saved), (1, 0))
+
+    def test_full(self):
+        self.pool.intern('a')
+        self.pool.intern('b')
+        value = make_string('cc')
+        self.assertTrue(self.pool.intern(value) is value)
+        self.assertFalse('cc' in self.pool)
+        self.assertEqual(len(self.pool), 2)
+        self.assertEqual(self.pool.info().misses, 3)
+
+    def test_clear(self):
+        self.pool.intern('a')
+        self.pool.intern('a')
+        self.pool.clear()
+        self.assertEqual(self.pool.info(), (0, 0, 0, 2, 0))
+
+    def test_pickle(self):
+        self.pool.intern('a')
+        copy = pickle.loads(pickle.dumps(self.pool))
+        self.assertEqual(copy.maxsize, 2)
+        self.assertEqual(len(copy), 0)
+
+    def test_maxsize(self):
+        self.assertRaises(ValueError, m.StringPool, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,11 @@
 import pytz  # sigh dateutil.tz lib not portable py2-py3 as of 2.2
 import unittest
 
-from datetime import date, time, datetime
+from datetime import date, time, datetime, timedelta
+from dateutil.parser import parse
 
 from schemazoid import micromodels as m
+from schemazoid.micromodels.fields import iso8601
 
 
 class FieldTestCase(unittest.TestCase):
@@ -18,11 +20,71 @@ class FieldTestCase(unittest.TestCase):
         self.assertEqual(self.field.to_serial('somestring'), 'somestring')
 
 
+class IsSerialTestCase(unittest.TestCase):
+
+    def test_field(self):
+        self.assertTrue(m.Field().is_serial(object()))
+
+    def test_subclass_overriding_conversion(self):
+        class UpperField(m.Field):
+            def to_python(self, data):
+                return data.upper()
+
+        self.assertFalse(UpperField().is_serial('a'))
+
+    def test_basic_fields(self):
+        self.assertTrue(m.CharField().is_serial(u'a'))
+        self.assertFalse(m.CharField().is_serial(1))
+        self.assertTrue(m.IntegerField().is_serial(1))
+        self.assertFalse(m.IntegerField().is_serial(True))
+        self.assertFalse(m.IntegerField().is_serial('1'))
+        self.assertTrue(m.FloatField().is_serial(1.5))
+        self.assertFalse(m.FloatField().is_serial(1))
+        self.assertTrue(m.BooleanField().is_serial(False))
+        self.assertFalse(m.BooleanField().is_serial('false'))
+        self.assertFalse(m.DateField().is_serial('2014-01-01'))
+
+
 class CharFieldTestCase(unittest.TestCase):
 
     def setUp(self):
         self.field = m.CharField()
 
+    def tearDown(self):
+        m.CharField.default_pool = m.StringPool()
+
+    def test_not_interned_by_default(self):
+        self.assertTrue(self.field.pool is None)
+        self.assertFalse(self.field.to_python(''.join(['e', 'n'])) is
+                         self.field.to_python(''.join(['e', 'n'])))
+
+    def test_intern(self):
+        field = m.CharField(intern=True)
+        self.assertTrue(field.pool is m.CharField.default_pool)
+        first = field.to_python(''.join(['e', 'n']))
+        self.assertTrue(field.to_python(''.join(['e', 'n'])) is first)
+        self.assertTrue(m.CharField(intern=True).to_python('en') is first)
+        self.assertEqual(field.to_python(date(2010, 7, 13)), '2010-07-13')
+        self.assertEqual(field.pool.info().hits, 2)
+        self.assertTrue(field.pool.info().bytes_saved > 0)
+
+    def test_own_pool(self):
+        pool = m.StringPool()
+        field = m.CharField(intern=pool)
+        first = field.to_python(''.join(['e', 'n']))
+        self.assertTrue(field.to_python(''.join(['e', 'n'])) is first)
+        self.assertEqual(len(pool), 1)
+        self.assertEqual(len(m.CharField.default_pool), 0)
+        self.assertRaises(TypeError, m.CharField, intern='yes')
+
+    def test_trusted_converter_interns(self):
+        field = m.CharField(intern=True)
+        convert = field.trusted_converter(False)
+        first = convert(''.join(['e', 'n']))
+        self.assertTrue(convert(''.join(['e', 'n'])) is first)
+        self.assertTrue(field.trusted_converter(True) is None)
+        self.assertTrue(self.field.trusted_converter(False) is None)
+
     def test_string_conversion(self):
         self.assertEqual(self.field.to_python('somestring'), 'somestring')
 
@@ -180,6 +242,148 @@ class DateTimeFieldTestCase(unittest.TestCase):
         expected = 'Tue Jul 13 14:01:00 +0000 2010'
         self.assertEqual(field.to_serial(when), expected)
 
+    def test_trusted_converter(self):
+        convert = self.field.trusted_converter(False)
+        self.assertEqual(convert('2010-07-13T14:01:00'),
+                         datetime(2010, 7, 13, 14, 1))
+        self.assertTrue(self.field.trusted_converter(True) is None)
+        # Serial data is parsed with the serial format.
+        field = m.DateTimeField(format='%Y%m%d', serial_format='%d/%m/%Y')
+        convert = field.trusted_converter(False)
+        self.assertEqual(convert(field.to_serial(datetime(2010, 7, 13))),
+                         datetime(2010, 7, 13))
+        self.assertEqual(field.to_python('20100713'), datetime(2010, 7, 13))
+
+    def test_trusted_date_and_time(self):
+        for field, value in [(m.DateField(), date(2010, 7, 13)),
+                             (m.DateField(format='%Y%m%d'), date(2010, 7, 13)),
+                             (m.TimeField(), time(9, 33, 30, 5)),
+                             (m.DateTimeField(), datetime(2010, 7, 13, 14, 1)),
+                             (m.DateTimeField(),
+                              self.field.to_python('2010-07-13T14:01-05:00')),
+                             (m.DateTimeField(),
+                              self.field.to_python('2010-07-13T14:01Z'))]:
+            convert = field.trusted_converter(False)
+            result = convert(field.to_serial(value))
+            self.assertEqual(result, value)
+            self.assertEqual(getattr(result, 'tzinfo', None),
+                             getattr(value, 'tzinfo', None))
+        # A datetime held by a DateField serializes as one.
+        field = m.DateField()
+        convert = field.trusted_converter(False)
+        self.assertEqual(convert('2010-07-13T14:01:00'), date(2010, 7, 13))
+
+
+class Iso8601TestCase(unittest.TestCase):
+
+    def assertSameAsDateutil(self, value):
+        result = iso8601.parse_datetime(value)
+        expected = parse(value)
+        self.assertEqual(result, expected)
+        self.assertEqual(result.utcoffset(), expected.utcoffset())
+        self.assertEqual(result.isoformat(), expected.isoformat())
+
+    def test_formats(self):
+        for value in ['2010-07-13', '20100713', '2010-07-13T14:01',
+                      '2010-07-13 14:01:00', '2010-07-13T14:01:00.25',
+                      '2010-07-13T14:01:00,123456789', '20100713T140102',
+                      '2010-07-13T14:01:00-05:00', '2010-07-13T14:01:00+0530',
+                      '2010-07-13T14:01:00-03', '20100713T1402-05:00']:
+            self.assertSameAsDateutil(value)
+
+    def test_utc(self):
+        for value in ['2010-07-13T14:01:00Z', '2010-07-13T14:01:00+00:00']:
+            result = iso8601.parse_datetime(value)
+            self.assertEqual(result, datetime(2010, 7, 13, 14, 1,
+                                              tzinfo=pytz.utc))
+            self.assertEqual(result.isoformat(), '2010-07-13T14:01:00+00:00')
+
+    def test_unhandled(self):
+        for value in ['Tue Mar 21 20:50:14 +0000 2006', '2010-07-13T14',
+                      '2010-0713', '2010-13-01', ' 2010-07-13',
+                      '2010-07-13\n', '', 20100713, None]:
+            self.assertEqual(iso8601.parse_datetime(value), None)
+
+    def test_time_formats(self):
+        for value, expected in [('09:33', time(9, 33)),
+                                ('T09:33:30', time(9, 33, 30)),
+                                ('0933', time(9, 33)),
+                                ('093330.5', time(9, 33, 30, 500000)),
+                                ('09:33:30,1234567', time(9, 33, 30, 123456)),
+                                ('09:33:30Z', time(9, 33, 30)),
+                                ('09:33:30-05:00', time(9, 33, 30))]:
+            self.assertEqual(iso8601.parse_time(value), expected)
+
+    def test_time_unhandled(self):
+        for value in ['9:33', '09:3330', '25:00', '09:33 PM', '', 933, None]:
+            self.assertEqual(iso8601.parse_time(value), None)
+
+    def test_field_falls_back_to_dateutil(self):
+        field = m.DateTimeField()
+        result = field.to_python('Tue Mar 21 20:50:14 +0000 2006')
+        self.assertEqual(result, datetime(2006, 3, 21, 20, 50, 14,
+                                          tzinfo=pytz.utc))
+        self.assertRaises(ValueError, field.to_python, '2010-13-01')
+
+
+class TemporalCacheTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        m.DateTimeField.default_cache = None
+
+    def test_no_cache_by_default(self):
+        self.assertEqual(m.DateTimeField().cache, None)
+
+    def test_field_cache(self):
+        field = m.DateTimeField(cache=True)
+        first = field.to_python('2010-07-13T14:02:00-05:00')
+        second = field.to_python('2010-07-13T14:02:00-05:00')
+        self.assertTrue(first is second)
+        self.assertEqual(second.utcoffset(), timedelta(hours=-5))
+        info = field.cache.info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_cache_size(self):
+        field = m.DateField(cache=2)
+        for value in ['2014-01-01', '2014-01-02', '2014-01-03']:
+            field.to_python(value)
+        info = field.cache.info()
+        self.assertEqual((info.evictions, info.maxsize, info.currsize),
+                         (1, 2, 2))
+
+    def test_shared_cache(self):
+        cache = m.LRUCache()
+        datetime_field = m.DateTimeField(cache=cache)
+        date_field = m.DateField(cache=cache)
+        time_field = m.TimeField(cache=cache)
+        self.assertEqual(datetime_field.to_python('2014-01-01T10:00:00'),
+                         datetime(2014, 1, 1, 10))
+        self.assertEqual(date_field.to_python('2014-01-01T10:00:00'),
+                         date(2014, 1, 1))
+        self.assertEqual(time_field.to_python('10:00:00'), time(10))
+        self.assertEqual(cache.info().currsize, 3)
+
+    def test_format_in_key(self):
+        cache = m.LRUCache()
+        day_first = m.DateField(format='%d/%m/%Y', cache=cache)
+        month_first = m.DateField(format='%m/%d/%Y', cache=cache)
+        self.assertEqual(day_first.to_python('02/01/2014'), date(2014, 1, 2))
+        self.assertEqual(month_first.to_python('02/01/2014'),
+                         date(2014, 2, 1))
+
+    def test_default_cache(self):
+        m.DateTimeField.default_cache = m.LRUCache()
+        field = m.DateField()
+        field.to_python('2014-01-01')
+        field.to_python('2014-01-01')
+        self.assertEqual(field.cache.info().hits, 1)
+        self.assertEqual(m.DateField(cache=False).cache, None)
+
+    def test_errors_not_cached(self):
+        field = m.DateField(cache=True)
+        self.assertRaises(ValueError, field.to_python, '2014-13-01')
+        self.assertEqual(field.cache.info().currsize, 0)
+
 
 class DateFieldTestCase(unittest.TestCase):
 
@@ -247,6 +451,9 @@ class TimeFieldTestCase(unittest.TestCase):
         expected = time(9, 33, 31)
         self.assertEqual(expected, result)
 
+    def test_dateutil_fallback(self):
+        self.assertEqual(self.field.to_python('9:33 PM'), time(21, 33))
+
     def test_handles_datetime(self):
         result = self.field.to_python(datetime(2010, 7, 21, 16, 44, 0))
         expected = time(16, 44, 0)
@@ -1,8 +1,15 @@
+import pickle
 import pytest
 import unittest
 from datetime import date
 
 from schemazoid import micromodels as m
+from schemazoid.micromodels import identity
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class ListFieldTestCase(unittest.TestCase):
@@ -61,6 +68,13 @@ class ListFieldTestCase(unittest.TestCase):
         expected = ['2014-01-01', '2014-12-12']
         self.assertEqual(field.to_serial(self.date_list), expected)
 
+    def test_is_serial(self):
+        self.assertTrue(self.listfield.is_serial(self.mixed_list))
+        self.assertFalse(self.listfield.is_serial((1, 2)))
+        field = m.ListField(of_type=m.IntegerField())
+        self.assertTrue(field.is_serial(self.integer_list))
+        self.assertFalse(field.is_serial(self.float_list))
+
     def test_constrained_type_mutability(self):
         field = m.ListField(of_type=m.DateField())
         result = field.to_python(['2014-01-01', '2014-12-12'])
@@ -69,6 +83,227 @@ class ListFieldTestCase(unittest.TestCase):
         self.assertEqual(result, expected)
 
 
+class CountingDateField(m.DateField):
+
+    def __init__(self, *args, **kwargs):
+        super(CountingDateField, self).__init__(*args, **kwargs)
+        self.calls = 0
+
+    def to_python(self, data):
+        self.calls += 1
+        return super(CountingDateField, self).to_python(data)
+
+
+class TypedListPicklingTestCase(unittest.TestCase):
+
+    def round_trip(self, obj):
+        return pickle.loads(pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+
+    def test_typed_list(self):
+        result = m.ListField(of_type=m.DateField()).to_python(['2014-01-01'])
+        copy = self.round_trip(result)
+        self.assertEqual(copy, [date(2014, 1, 1)])
+        copy.append('2014-06-06')
+        self.assertEqual(copy[1], date(2014, 6, 6))
+
+    def test_lazy_list_keeps_pending_items(self):
+        field = m.ListField(of_type=m.IntegerField(), lazy=True)
+        result = field.to_python(['1', 'x'])
+        copy = self.round_trip(result)
+        self.assertEqual(copy[0], 1)
+        self.assertRaises(ValueError, copy.__getitem__, 1)
+
+    def test_array_list(self):
+        field = m.ListField(of_type=m.FloatField(), storage='array')
+        copy = self.round_trip(field.to_python([1, 2]))
+        self.assertEqual(copy, [1.0, 2.0])
+        self.assertEqual(copy.array.typecode, 'd')
+
+    @pytest.mark.skipif(numpy is None, reason="NumPy is not installed")
+    def test_numpy_list(self):
+        field = m.ListField(of_type=m.IntegerField(), storage='numpy')
+        copy = self.round_trip(field.to_python([1, 2]))
+        self.assertEqual(copy, [1, 2])
+        self.assertTrue(isinstance(copy.array, numpy.ndarray))
+
+
+class LazyListTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.itemfield = CountingDateField()
+        self.field = m.ListField(of_type=self.itemfield, lazy=True)
+        self.strings = ['2014-01-01', '2014-06-06', '2014-12-12']
+        self.dates = [date(2014, 1, 1), date(2014, 6, 6), date(2014, 12, 12)]
+
+    def test_no_conversion_up_front(self):
+        result = self.field.to_python(self.strings)
+        self.assertEqual(len(result), 3)
+        self.assertEqual(self.itemfield.calls, 0)
+
+    def test_converted_once_on_access(self):
+        result = self.field.to_python(self.strings)
+        self.assertEqual(result[1], date(2014, 6, 6))
+        self.assertEqual(result[-2], date(2014, 6, 6))
+        self.assertEqual(self.itemfield.calls, 1)
+
+    def test_slice(self):
+        result = self.field.to_python(self.strings)
+        self.assertEqual(result[1:], self.dates[1:])
+        self.assertEqual(self.itemfield.calls, 2)
+        self.assertEqual(result[::2], self.dates[::2])
+        self.assertEqual(self.itemfield.calls, 3)
+
+    def test_iteration_and_comparison(self):
+        result = self.field.to_python(iter(self.strings))
+        self.assertEqual(list(result), self.dates)
+        self.assertEqual(result, self.dates)
+        self.assertEqual(repr(result), repr(self.dates))
+        self.assertEqual(self.itemfield.calls, 3)
+
+    def test_input_not_modified(self):
+        result = self.field.to_python(self.strings)
+        result[0]
+        self.assertEqual(self.strings[0], '2014-01-01')
+
+    def test_mutation(self):
+        result = self.field.to_python(self.strings)
+        result.insert(0, '2013-01-01')
+        result.append('2015-01-01')
+        del result[1]
+        result[1:2] = ['2014-07-07', '2014-08-08']
+        self.assertEqual(result, [date(2013, 1, 1), date(2014, 7, 7),
+                                  date(2014, 8, 8), date(2014, 12, 12),
+                                  date(2015, 1, 1)])
+
+    def test_errors_on_access(self):
+        result = self.field.to_python(['2014-01-01', 'never'])
+        self.assertEqual(result[0], date(2014, 1, 1))
+        self.assertRaises(ValueError, result.__getitem__, 1)
+
+    def test_to_serial(self):
+        result = self.field.to_python(self.strings)
+        self.assertEqual(self.field.to_serial(result), self.strings)
+
+
+class ArrayStorageTestCase(unittest.TestCase):
+
+    storage = 'array'
+
+    def setUp(self):
+        self.field = m.ListField(of_type=m.IntegerField(),
+                                 storage=self.storage)
+        self.floats = m.ListField(of_type=m.FloatField(),
+                                  storage=self.storage)
+
+    def test_conversion(self):
+        result = self.field.to_python(['1', 2.5, 3])
+        self.assertEqual(result, [1, 2, 3])
+        self.assertEqual(self.floats.to_python(['1.5', 2]), [1.5, 2.0])
+        self.assertEqual(self.field.to_python(7), [7])
+        self.assertEqual(self.field.to_python(None), [])
+        self.assertRaises(ValueError, self.field.to_python, ['x'])
+
+    def test_check_raw(self):
+        errors = []
+        self.field.check_raw([1, 2 ** 70], ('n',), errors)
+        self.field.check_raw(['x'], ('x',), errors)
+        self.field.check_raw(['1', 2], ('ok',), errors)
+        self.assertEqual([error.path for error in errors], [('n',), ('x',)])
+        self.assertTrue(isinstance(errors[0].error, OverflowError))
+
+    def test_items_are_python_numbers(self):
+        result = self.field.to_python([1, 2, 3])
+        self.assertTrue(type(result[0]) is int)
+        self.assertTrue(all(type(item) is int for item in result))
+        self.assertTrue(type(self.floats.to_python([1])[0]) is float)
+        self.assertEqual(result[1:], [2, 3])
+
+    def test_mutable_sequence(self):
+        result = self.field.to_python([1, 2, 3])
+        result.append('4')
+        result.insert(0, 0)
+        result.insert(-1, 9)
+        result.insert(100, 10)
+        result[1] = '11'
+        del result[2]
+        self.assertEqual(result, [0, 11, 3, 9, 4, 10])
+        result[1:3] = [5, 6, 7]
+        del result[::2]
+        self.assertEqual(result, [5, 7, 4])
+        result.extend([1, 2])
+        result.remove(7)
+        self.assertEqual(result.pop(), 2)
+        self.assertEqual(len(result), 3)
+        self.assertTrue(4 in result)
+        self.assertEqual(repr(result), '[5, 4, 1]')
+
+    def test_to_serial(self):
+        result = self.floats.to_python([1.5, 2])
+        serial = self.floats.to_serial(result)
+        self.assertEqual(serial, [1.5, 2.0])
+        self.assertTrue(type(serial) is list)
+        self.assertTrue(type(serial[0]) is float)
+
+    def test_in_model(self):
+        class Series(m.Model):
+            values = m.ListField(of_type=m.FloatField(),
+                                 storage=self.storage)
+
+        series = Series(values=[1, 2, 3])
+        self.assertEqual(len(series.values.array), 3)
+        self.assertEqual(series.to_serial(), {'values': [1.0, 2.0, 3.0]})
+
+    def test_invalid_options(self):
+        self.assertRaises(ValueError, m.ListField, of_type=m.DateField(),
+                          storage=self.storage)
+        self.assertRaises(ValueError, m.ListField, of_type=m.IntegerField(),
+                          storage=self.storage, lazy=True)
+        self.assertRaises(ValueError, m.ListField, of_type=m.IntegerField(),
+                          storage='tuple')
+
+    def test_numpy_missing(self):
+        complex_fields = m.fields.complex
+        installed, complex_fields.numpy = complex_fields.numpy, None
+        try:
+            self.assertRaises(ImportError, m.ListField,
+                              of_type=m.IntegerField(), storage='numpy')
+        finally:
+            complex_fields.numpy = installed
+
+
+@pytest.mark.skipif(numpy is None, reason="NumPy is not installed")
+class NumpyStorageTestCase(ArrayStorageTestCase):
+
+    storage = 'numpy'
+
+    def test_numpy_array(self):
+        result = self.floats.to_python([1.5, 2.5])
+        self.assertTrue(isinstance(result.array, numpy.ndarray))
+        self.assertEqual(result.array.sum(), 4.0)
+
+
+class InternedListTestCase(unittest.TestCase):
+
+    def test_items_interned(self):
+        pool = m.StringPool()
+        field = m.ListField(of_type=m.CharField(intern=pool))
+        items = field.to_python([''.join(['e', 'n']) for i in range(3)])
+        items.append(''.join(['e', 'n']))
+        items.insert(0, 'fr')
+        self.assertTrue(all(item is items[1] for item in items[2:]))
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(pool.info().hits, 3)
+
+    def test_lazy_and_trusted(self):
+        pool = m.StringPool()
+        lazy = m.ListField(of_type=m.CharField(intern=pool), lazy=True)
+        items = lazy.to_python([''.join(['e', 'n']) for i in range(2)])
+        self.assertTrue(items[0] is items[1])
+        trusted = m.ListField(of_type=m.CharField(intern=pool))
+        items = trusted.trusted_converter(False)([''.join(['e', 'n'])])
+        self.assertTrue(items[0] is lazy.to_python(['en'])[0])
+
+
 class DictFieldTestCase(unittest.TestCase):
 
     def setUp(self):
@@ -81,6 +316,10 @@ class DictFieldTestCase(unittest.TestCase):
     def test_none_conversion(self):
         self.assertEqual(self.dictfield.to_python(None), {})
 
+    def test_is_serial(self):
+        self.assertTrue(self.dictfield.is_serial({'a': 1}))
+        self.assertFalse(self.dictfield.is_serial([('a', 1)]))
+
     def test_list_conversion(self):
         self.assertRaises(TypeError, self.dictfield.to_python, [1, 2, 3, 4])
 
@@ -116,7 +355,138 @@ class ModelFieldTestCase(unittest.TestCase):
         person = field.to_python(self.data)
         self.assertEqual(person.to_serial(), self.data)
 
+    def test_deferred(self):
+        field = m.ModelField(self.Person, deferred=True)
+        person = field.to_python(self.data)
+        self.assertTrue(type(person) is m.fields.complex.DeferredModel)
+        self.assertTrue(isinstance(person, self.Person))
+        self.assertTrue(field.to_python(person) is person)
+        self.assertEqual(person._deferred_model, None)
+        self.assertEqual(person.name, self.data['name'])
+        self.assertTrue(type(person._deferred_model) is self.Person)
+
+    def test_deferred_to_serial_unused(self):
+        data = dict(self.data, extra='kept')
+        field = m.ModelField(self.Person, deferred=True)
+        person = field.to_python(data)
+        # Shared rather than copied, which is documented.
+        self.assertTrue(field.to_serial(person) is data)
+        self.assertEqual(person._deferred_model, None)
+
+    def test_deferred_to_serial_used(self):
+        field = m.ModelField(self.Person, deferred=True)
+        person = field.to_python(self.data)
+        person.email = 'richard@feynman.com'
+        self.assertEqual(field.to_serial(person),
+                         dict(self.data, email='richard@feynman.com'))
+
+    def test_deferred_errors(self):
+        class Counted(m.Model):
+            count = m.IntegerField()
+
+        field = m.ModelField(Counted, deferred=True)
+        counted = field.to_python({'count': 'many'})
+        self.assertRaises(ValueError, getattr, counted, 'count')
+
+    def test_deferred_in_model(self):
+        class Atom(m.Model):
+            author = m.ModelField(self.Person, deferred=True)
+
+        atom = Atom(author=self.data)
+        self.assertEqual(atom.to_serial(), {'author': self.data})
+        self.assertEqual(atom.author.uri, self.data['uri'])
+
     @pytest.mark.skipif(True, reason="TODO")
     def test_failing_modelfield(self):
         """TODO Test when model in the field fails validation"""
         pass
+
+
+class IdentityMapTestCase(unittest.TestCase):
+
+    def setUp(self):
+        class Publisher(m.Model):
+            url = m.CharField()
+            name = m.CharField()
+
+        class Author(m.Model):
+            url = m.CharField()
+
+        class Article(m.Model):
+            publisher = m.ModelField(Publisher, identity='url')
+            author = m.ModelField(Author, identity='url')
+            sources = m.ListField(
+                of_type=m.ModelField(Publisher, identity='url'))
+
+        self.Publisher = Publisher
+        self.Article = Article
+        self.data = {'publisher': {'url': 'http://a/', 'name': 'A'},
+                     'author': {'url': 'http://a/'},
+                     'sources': [{'url': 'http://a/', 'name': 'other'},
+                                 {'url': 'http://b/'}]}
+
+    def test_no_sharing_outside_scope(self):
+        self.assertTrue(identity.current() is None)
+        first, second = self.Article(self.data), self.Article(self.data)
+        self.assertFalse(first.publisher is second.publisher)
+
+    def test_scope(self):
+        with identity.scope() as identity_map:
+            self.assertTrue(identity.current() is identity_map)
+            first, second = self.Article(self.data), self.Article(self.data)
+        self.assertTrue(identity.current() is None)
+        self.assertTrue(first.publisher is second.publisher)
+        # The first dictionary for each identity is the one built.
+        self.assertTrue(first.sources[0] is first.publisher)
+        self.assertEqual(first.sources[0].name, u'A')
+        self.assertFalse(first.sources[1] is first.publisher)
+        # Other classes with the same identity are other models.
+        self.assertTrue(isinstance(first.author, self.Article.get_class_field(
+            'author')._wrapped_class))
+        self.assertTrue(first.author is second.author)
+        info = identity_map.info()
+        self.assertEqual((info.hits, info.misses), (5, 3))
+        self.assertEqual(identity_map.hit_rate(), 5 / 8.0)
+
+    def test_nested_scopes(self):
+        with identity.scope() as outer:
+            first = self.Article(self.data)
+            with identity.scope(maxsize=1) as inner:
+                second = self.Article(self.data)
+                self.assertEqual(inner.info().evictions, 3)
+            self.assertTrue(identity.current() is outer)
+            third = self.Article(self.data)
+        self.assertFalse(first.publisher is second.publisher)
+        self.assertTrue(first.publisher is third.publisher)
+
+    def test_without_identity(self):
+        field = m.ModelField(self.Publisher, identity='url')
+        with identity.scope():
+            self.assertFalse(field.to_python({'name': 'A'}) is
+                             field.to_python({'name': 'A'}))
+            self.assertFalse(field.to_python({'url': ['a']}) is
+                             field.to_python({'url': ['a']}))
+            self.assertEqual(field.to_python(None), None)
+
+    def test_identity_map_argument(self):
+        cache = m.LRUCache(10)
+        field = m.ModelField(self.Publisher, identity='url',
+                             identity_map=cache)
+        first = field.to_python({'url': 'http://a/'})
+        self.assertTrue(field.to_python({'url': 'http://a/'}) is first)
+        self.assertEqual(len(cache), 1)
+
+    def test_deferred(self):
+        field = m.ModelField(self.Publisher, identity='url', deferred=True)
+        with identity.scope():
+            first = field.to_python({'url': 'http://a/'})
+            self.assertTrue(field.to_python({'url': 'http://a/'}) is first)
+        self.assertTrue(type(first) is m.fields.complex.DeferredModel)
+
+    def test_trusted_construct(self):
+        serial = self.Article(self.data).to_serial()
+        with identity.scope():
+            first = self.Article.construct(serial)
+            second = self.Article.construct(serial)
+        self.assertTrue(first.publisher is second.publisher)
+        self.assertTrue(first.sources[0] is first.publisher)
@@ -0,0 +1,141 @@
+import io
+import unittest
+from datetime import date
+
+from schemazoid import micromodels as m
+from schemazoid.micromodels import jsonl
+
+
+class Book(m.Model):
+    name = m.CharField()
+    numberOfPages = m.IntegerField()
+    datePublished = m.DateField()
+
+
+LINES = [
+    '{"name": "Surely You\'re Joking", "numberOfPages": "350"}',
+    '',
+    '{"name": "QED", "datePublished": "1985-01-01"}',
+    'this is not json',
+    '{"name": "Broken", "numberOfPages": "many"}',
+    '["not", "an", "object"]',
+    '{"name": "The Meaning of It All"}',
+]
+
+
+class IterLinesTestCase(unittest.TestCase):
+
+    def test_small_chunks(self):
+        text = u'first\n\nsecond line\nthird'
+        lines = list(jsonl.iter_lines(io.StringIO(text), chunk_size=3))
+        self.assertEqual(lines, [(1, u'first'), (3, u'second line'),
+                                 (4, u'third')])
+
+    def test_binary(self):
+        data = b'first\r\nsecond\n'
+        lines = list(jsonl.iter_lines(io.BytesIO(data), chunk_size=4))
+        self.assertEqual(lines, [(1, b'first\r'), (2, b'second')])
+
+
+class IterJsonlTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.good = '\n'.join(LINES[:3] + LINES[6:]) + '\n'
+        self.bad = '\n'.join(LINES)
+
+    def test_iter_models(self):
+        books = list(Book.iter_jsonl(io.StringIO(self.good)))
+        self.assertEqual(len(books), 3)
+        self.assertTrue(all(isinstance(book, Book) for book in books))
+        self.assertEqual(books[0].numberOfPages, 350)
+        self.assertEqual(books[1].datePublished, date(1985, 1, 1))
+        self.assertEqual(books[2].name, 'The Meaning of It All')
+
+    def test_binary_file(self):
+        fileobj = io.BytesIO(self.good.encode('utf-8'))
+        books = list(Book.iter_jsonl(fileobj))
+        self.assertEqual(books[0].name, "Surely You're Joking")
+
+    def test_small_batches(self):
+        books = list(Book.iter_jsonl(io.StringIO(self.good), batch_size=2))
+        self.assertEqual([book.name for book in books],
+                         ["Surely You're Joking", 'QED',
+                          'The Meaning of It All'])
+
+    def test_is_lazy(self):
+        books = Book.iter_jsonl(io.StringIO(self.bad), batch_size=1)
+        self.assertEqual(next(books).numberOfPages, 350)
+        self.assertEqual(next(books).name, 'QED')
+        self.assertRaises(ValueError, next, books)
+
+    def test_bad_line_raises(self):
+        books = Book.iter_jsonl(io.StringIO(self.bad))
+        self.assertRaises(ValueError, list, books)
+
+    def test_skip_errors(self):
+        books = Book.iter_jsonl(io.StringIO(self.bad), skip_errors=True)
+        self.assertEqual([book.name for book in books],
+                         ["Surely You're Joking", 'QED',
+                          'The Meaning of It All'])
+
+    def test_collect_errors(self):
+        errors = []
+        books = list(Book.iter_jsonl(io.StringIO(self.bad), errors=errors))
+        self.assertEqual(len(books), 3)
+        errors = dict((error.line_number, error) for error in errors)
+        self.assertEqual(sorted(errors), [4, 5, 6])
+        self.assertEqual(errors[5].line, LINES[4])
+        self.assertTrue(isinstance(errors[5].error, ValueError))
+        self.assertTrue(isinstance(errors[6].error, TypeError))
+
+
+class CountingFile(io.StringIO):
+
+    writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super(CountingFile, self).write(text)
+
+
+class DumpJsonlTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.books = [
+            Book(name='QED', numberOfPages=158, datePublished='1985-01-01'),
+            Book(name='Six Easy Pieces'),
+        ]
+
+    def test_round_trip(self):
+        fileobj = io.StringIO()
+        self.assertEqual(Book.dump_jsonl(self.books, fileobj), 2)
+        fileobj.seek(0)
+        books = list(Book.iter_jsonl(fileobj))
+        self.assertEqual([book.to_serial() for book in books],
+                         [book.to_serial() for book in self.books])
+
+    def test_one_line_per_model(self):
+        fileobj = io.StringIO()
+        Book.dump_jsonl(iter(self.books), fileobj)
+        lines = fileobj.getvalue().split(u'\n')
+        self.assertEqual(lines[1], u'{"name":"Six Easy Pieces"}')
+        self.assertEqual(lines[2], u'')
+
+    def test_binary_file(self):
+        fileobj = io.BytesIO()
+        Book.dump_jsonl(self.books, fileobj)
+        self.assertTrue(fileobj.getvalue().endswith(b'Pieces"}\n'))
+
+    def test_buffered_writes(self):
+        fileobj = CountingFile()
+        jsonl.dump_models(self.books * 50, fileobj)
+        self.assertEqual(fileobj.writes, 1)
+
+        fileobj = CountingFile()
+        jsonl.dump_models(self.books * 50, fileobj, buffer_size=100)
+        self.assertTrue(1 < fileobj.writes < 100)
+        self.assertEqual(len(fileobj.getvalue().splitlines()), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from schemazoid import micromodels as m
+from schemazoid import schemaorg
+from schemazoid.micromodels import identity
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LazyLoadingTestCase(unittest.TestCase):
+
+    def run_python(self, code):
+        output = subprocess.check_output([sys.executable, '-c', code],
+                                         cwd=ROOT)
+        return output.decode('ascii').split()
+
+    def test_import_is_lazy(self):
+        modules = self.run_python(
+            'import sys\n'
+            'import schemazoid.schemaorg as s\n'
+            'prefix = "schemazoid."\n'
+            'before = [k for k in sys.modules if k.startswith(prefix)]\n'
+            's.Thing\n'
+            'after = [k for k in sys.modules if k.startswith(prefix)]\n'
+            'print(" ".join(sorted(before)) + " |")\n'
+            'print(" ".join(sorted(set(after) - set(before))))\n')
+        split = modules.index('|')
+        self.assertEqual(modules[:split], ['schemazoid.schemaorg'])
+        loaded = modules[split + 1:]
+        self.assertTrue('schemazoid.schemaorg.thing' in loaded)
+        self.assertTrue('schemazoid.micromodels' in loaded)
+        self.assertFalse('schemazoid.schemaorg.article' in loaded)
+
+    def test_types(self):
+        for name in schemaorg.__all__:
+            cls = getattr(schemaorg, name)
+            self.assertTrue(issubclass(cls, schemaorg.Thing))
+            self.assertEqual(cls.__name__, name)
+            self.assertTrue(getattr(schemaorg, name) is cls)
+        self.assertTrue(issubclass(schemaorg.Thing, m.Model))
+
+    def test_from_import(self):
+        from schemazoid.schemaorg import Article
+        self.assertTrue(Article is schemaorg.Article)
+
+    def test_unknown(self):
+        self.assertRaises(AttributeError, getattr, schemaorg, 'Nothing')
+        self.assertFalse(hasattr(schemaorg, 'thing_type'))
+
+    def test_dir(self):
+        names = dir(schemaorg)
+        for name in schemaorg.__all__:
+            self.assertTrue(name in names)
+
+    def test_fallback_module(self):
+        # Used on Python versions without module __getattr__.
+        module = schemaorg._LazyModule('lazy')
+        module.__dict__.update(vars(sys.modules['schemazoid.schemaorg']))
+        module.__dict__.pop('Offer', None)
+        # Which older versions would not call.
+        del module.__dict__['__getattr__']
+        self.assertTrue(module.Offer is schemaorg.Offer)
+        self.assertTrue('Offer' in module.__dict__)
+        self.assertTrue('Product' in dir(module))
+        self.assertRaises(AttributeError, getattr, module, 'Nothing')
+        self.assertRaises(AttributeError, getattr, module, '__wrapped__')
+
+
+class TypesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.data = {
+            'headline': 'Lazy loading',
+            'datePublished': '2014-08-09T12:21:00Z',
+            'inLanguage': 'en',
+            'keywords': ['python', 'schema.org'],
+            'wordCount': '300',
+            'author': {'name': 'Vince', 'url': 'http://example.com/vince',
+                       'worksFor': {'name': 'Example',
+                                    'url': 'http://example.com/'}},
+            'publisher': {'name': 'Example', 'url': 'http://example.com/',
+                          'address': {'addressCountry': 'US'}},
+        }
+
+    def test_article(self):
+        article = schemaorg.Article(self.data)
+        self.assertEqual(article.wordCount, 300)
+        self.assertTrue(isinstance(article.author, schemaorg.Person))
+        self.assertTrue(isinstance(article.author.worksFor,
+                                   schemaorg.Organization))
+        self.assertEqual(article.publisher.address.addressCountry, u'US')
+        serial = article.to_serial()
+        self.assertEqual(serial['datePublished'], '2014-08-09T12:21:00+00:00')
+        self.assertEqual(schemaorg.Article.construct(serial).to_serial(),
+                         serial)
+
+    def test_shared_by_url(self):
+        with identity.scope():
+            article = schemaorg.Article(self.data)
+        self.assertTrue(article.author.worksFor is article.publisher)
+
+    def test_product(self):
+        product = schemaorg.Product(
+            name='Widget', offers=[{'price': '9.99', 'priceCurrency': 'USD'}])
+        self.assertEqual(product.offers[0].price, 9.99)